@@ -0,0 +1,117 @@
+"""
+Parity and speed comparison of the GEC inference backends (see polishcore/inference_backends.py).
+
+Every backend polishes the same sample corpus through the variant's generate_batch():
+  * parity     - how many outputs differ from the PyTorch fp32 reference (with examples)
+  * latency    - per-sentence generate latency (batch of one), p50/p95 in milliseconds
+  * throughput - sentences/sec when the whole corpus is generated in batches
+
+Usage:
+    python benchmarks/compare_backends.py --backends torch,torch-int8,onnx --output backends.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus', 'sentences.txt')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_backend(text_polish, backend, sentences, batch_size):
+    from polishcore.inference_backends import load_model
+
+    start = time.perf_counter()
+    text_polish.registry.override("model", load_model(text_polish.model_id, backend))
+    load_seconds = time.perf_counter() - start
+
+    text_polish.generate_batch(sentences[:1])  # first call pays graph/session set-up
+
+    latencies = []
+    for sentence in sentences:
+        start = time.perf_counter()
+        text_polish.generate_batch([sentence])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    outputs = text_polish.generate_batch(sentences, batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    return outputs, {
+        'backend': backend,
+        'load_seconds': round(load_seconds, 3),
+        'latency_ms_p50': round(percentile(latencies, 50), 2),
+        'latency_ms_p95': round(percentile(latencies, 95), 2),
+        'latency_ms_mean': round(statistics.mean(latencies), 2),
+        'throughput_sentences_per_sec': round(len(sentences) / batch_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variant', default='tpprithvifinal', choices=['tpprithvifinal', 'grammarapp'],
+                        help='app directory whose text_polish.py is benchmarked')
+    parser.add_argument('--backends', default='torch,torch-int8,onnx')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='one sentence per line')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)  # polishcore
+    sys.path.insert(0, os.path.join(ROOT, args.variant))
+    import text_polish
+
+    with open(args.corpus, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    if 'torch' not in backends:
+        backends.insert(0, 'torch')  # fp32 is the parity reference
+
+    report = {'corpus': args.corpus, 'sentences': len(sentences), 'batch_size': args.batch_size, 'backends': []}
+    reference = None
+
+    for backend in backends:
+        try:
+            outputs, stats = run_backend(text_polish, backend, sentences, args.batch_size)
+        except (RuntimeError, ImportError) as e:
+            report['backends'].append({'backend': backend, 'error': str(e)})
+            print(f"⚠️ Skipping {backend}: {e}", file=sys.stderr)
+            continue
+
+        if backend == 'torch':
+            reference = outputs
+        if reference is None:
+            stats['parity'] = None  # fp32 reference failed to load
+            report['backends'].append(stats)
+            continue
+        differing = [i for i, (ref, out) in enumerate(zip(reference, outputs)) if ref != out]
+        stats['parity'] = {
+            'differing_outputs': len(differing),
+            'differing_rate': round(len(differing) / len(sentences), 4),
+            'examples': [{'input': sentences[i], 'fp32': reference[i], backend: outputs[i]} for i in differing[:5]],
+        }
+        report['backends'].append(stats)
+
+    fp32 = next((b for b in report['backends'] if b['backend'] == 'torch' and 'error' not in b), None)
+    for stats in report['backends']:
+        if fp32 and 'error' not in stats:
+            stats['speedup_vs_fp32'] = round(fp32['latency_ms_p50'] / stats['latency_ms_p50'], 2)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark corpora of several sizes, built deterministically from corpus/sentences.txt.
+Documents are plain text; .docx versions are written on demand with python-docx so no
+binary fixtures need to be kept in the repository.
+"""
+import os
+import random
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+SIZES = {'small': 10, 'medium': 100, 'large': 1000}  # sentences per document
+SENTENCES_PER_PARAGRAPH = 4
+SEED = 1234
+
+
+def load_sentences(path=os.path.join(CORPUS_DIR, 'sentences.txt')):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def build_sentences(size):
+    base = load_sentences()
+    rng = random.Random(SEED)
+    sentences = []
+    while len(sentences) < SIZES[size]:
+        batch = base[:]
+        rng.shuffle(batch)
+        sentences.extend(batch)
+    return sentences[:SIZES[size]]
+
+
+def build_text(size):
+    return ' '.join(build_sentences(size))
+
+
+def build_paragraphs(size):
+    # Every fifth paragraph is empty, like the spacing paragraphs of real documents
+    sentences = build_sentences(size)
+    paragraphs = []
+    for start in range(0, len(sentences), SENTENCES_PER_PARAGRAPH):
+        paragraphs.append(' '.join(sentences[start:start + SENTENCES_PER_PARAGRAPH]))
+        if len(paragraphs) % 5 == 4:
+            paragraphs.append('')
+    return paragraphs
+
+
+def write_docx(size, path):
+    from docx import Document
+
+    doc = Document()
+    for paragraph in build_paragraphs(size):
+        doc.add_paragraph(paragraph)
+    doc.save(path)
+    return path
@@ -0,0 +1,151 @@
+"""
+Memory and serialization cost of the issues in a polish_full_text() result (see polishcore/issues.py).
+
+A document of --sentences sentences (the sample corpus, repeated) gets --issues-per-sentence
+issues per sentence, shaped like LanguageTool matches (message, offset, length, one to three
+replacements). The result is built twice the way polish_full_text() builds it:
+  * dicts   - the previous issue dicts of strings, with the document's "issues" list copying
+              every sentence's issues next to the per-sentence "details"
+  * records - issues.Issue records, with "issues" an IssueChain over the sentences' own lists
+The report gives the bytes allocated for each result (tracemalloc, sentence texts excluded) and,
+per serializer, the time to render the whole result as one JSON response and every detail as one
+SSE event, and the response size. "json" is the standard library, "orjson" is only measured
+when it is installed.
+
+Usage:
+    python benchmarks/issue_records.py --sentences 10000 --output issue_records.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus', 'sentences.txt')
+MESSAGES = [
+    "Possible spelling mistake found.",
+    "Use a comma before 'and' if it connects two independent clauses.",
+    "The verb form does not agree with the subject.",
+    "This word is normally spelled with a hyphen.",
+]
+
+
+def synthetic_issues(sentence, count, rng):
+    # (message, offset, length, replacements) at word boundaries of the sentence
+    words = sentence.split()
+    issues = []
+    for _ in range(count):
+        k = rng.randrange(len(words))
+        offset = len(" ".join(words[:k])) + (1 if k else 0)
+        replacements = tuple(words[k].lower() + suffix for suffix in ("", "s", "ed")[:rng.randint(1, 3)])
+        issues.append((rng.choice(MESSAGES), offset, len(words[k]), replacements))
+    return issues
+
+
+def build_dicts(sentences, found):
+    all_issues = []
+    details = []
+    for idx, (sentence, issues) in enumerate(zip(sentences, found), 1):
+        sentence_issues = [{
+            'message': message,
+            'offset': str(offset),
+            'length': str(length),
+            'replacements': ', '.join(replacements),
+            'is_pos_issue': 'False'
+        } for message, offset, length, replacements in issues]
+        all_issues.extend(sentence_issues)
+        details.append({"sentence_number": idx, "original": sentence, "polished": sentence,
+                        "issues": sentence_issues, "token_count": 0, "tier": "generation"})
+    return {"polished_text": "", "details": details, "total_tokens": 0,
+            "total_sentences": len(details), "issues": all_issues}
+
+
+def build_records(sentences, found, issues_module):
+    Issue, IssueChain = issues_module.Issue, issues_module.IssueChain
+    all_issues = IssueChain()
+    details = []
+    for idx, (sentence, issues) in enumerate(zip(sentences, found), 1):
+        sentence_issues = [Issue(message, offset, length, replacements)
+                           for message, offset, length, replacements in issues]
+        all_issues.add(sentence_issues)
+        details.append({"sentence_number": idx, "original": sentence, "polished": sentence,
+                        "issues": sentence_issues, "token_count": 0, "tier": "generation"})
+    return {"polished_text": "", "details": details, "total_tokens": 0,
+            "total_sentences": len(details), "issues": all_issues}
+
+
+def allocated(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def time_serializer(dumps, result, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = dumps(result)
+    response_seconds = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for detail in result['details']:
+            f"data: {dumps(detail)}\n\n"
+    sse_seconds = (time.perf_counter() - start) / repeat
+    return {'response_ms': round(response_seconds * 1000, 2), 'sse_ms': round(sse_seconds * 1000, 2),
+            'response_bytes': len(body.encode('utf-8'))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sentences', type=int, default=10_000)
+    parser.add_argument('--issues-per-sentence', type=int, default=2)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='one sentence per line')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from polishcore import issues as issues_module
+
+    with open(args.corpus, encoding='utf-8') as f:
+        corpus = [line.strip() for line in f if line.strip()]
+    sentences = [corpus[i % len(corpus)] for i in range(args.sentences)]
+    rng = random.Random(args.seed)
+    found = [synthetic_issues(sentence, args.issues_per_sentence, rng) for sentence in sentences]
+
+    dicts, dict_bytes = allocated(lambda: build_dicts(sentences, found))
+    records, record_bytes = allocated(lambda: build_records(sentences, found, issues_module))
+
+    serializers = {'json': {
+        'dicts': time_serializer(json.dumps, dicts, args.repeat),
+        'records': None,
+    }}
+    fast = issues_module.orjson
+    issues_module.orjson = None  # the standard-library path of issues.dumps
+    serializers['json']['records'] = time_serializer(issues_module.dumps, records, args.repeat)
+    issues_module.orjson = fast
+    if fast is not None:
+        serializers['orjson'] = {'records': time_serializer(issues_module.dumps, records, args.repeat)}
+
+    report = {
+        'sentences': args.sentences,
+        'issues': args.sentences * args.issues_per_sentence,
+        'memory_bytes': {'dicts': dict_bytes, 'records': record_bytes,
+                         'ratio': round(record_bytes / dict_bytes, 3)},
+        'serialization': serializers,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Concurrent-load benchmark for the generation micro-batcher (polishcore/batch_scheduler.py).
+
+N client threads each polish M sentences through text_polish.polish_text, first with batching
+off and then with every requested batching window. Reported per configuration: throughput,
+p50/p95 request latency and the batcher's mean batch size.
+
+With --stub the model is replaced by a fake whose generate() costs a fixed overhead per call
+plus a small amount per sequence (--batch-cost-ms / --item-cost-ms), which is the shape that
+makes batching pay off on a real CPU/GPU model.
+
+Usage:
+    python benchmarks/micro_batching.py --stub --clients 16 --windows 0,5,10,20
+"""
+import argparse
+import json
+import threading
+import time
+
+import corpus
+import stubs
+from run_benchmarks import disable_result_cache, load_app_module, percentile
+
+
+def run_config(window_ms, args, sentences):
+    module = load_app_module('lv_seshbuffpol', 'text_polish')
+    if args.stub:
+        stubs.install_stub_backends(module)
+        module.registry.override('model', stubs.StubModel(args.batch_cost_ms / 1000, args.item_cost_ms / 1000))
+    else:
+        module.registry.warm_up()
+    disable_result_cache(module)
+    if window_ms > 0:
+        module.enable_micro_batching(window_ms=window_ms, max_batch=args.max_batch)
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client(index):
+        for k in range(args.requests):
+            sentence = sentences[(index * args.requests + k) % len(sentences)]
+            start = time.perf_counter()
+            module.polish_text(sentence)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    return {
+        'window_ms': window_ms,
+        'batching': window_ms > 0,
+        'max_batch': args.max_batch if window_ms > 0 else 1,
+        'requests': len(latencies),
+        'throughput_per_sec': round(len(latencies) / wall, 2),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+        },
+        'batcher': module.batching_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stub', action='store_true', help='use fake backends with a simulated generate cost')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent request threads')
+    parser.add_argument('--requests', type=int, default=8, help='sentences per client')
+    parser.add_argument('--windows', default='0,5,10,20', help='batching windows in ms (0 = batching off)')
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--batch-cost-ms', type=float, default=40.0, help='stub: fixed cost per generate call')
+    parser.add_argument('--item-cost-ms', type=float, default=2.0, help='stub: extra cost per sequence')
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    shimmed = stubs.install_import_shims() if args.stub else []
+    sentences = corpus.build_sentences('medium')
+    report = {
+        'mode': 'stub' if args.stub else 'real',
+        'shimmed_modules': shimmed,
+        'clients': args.clients,
+        'requests_per_client': args.requests,
+        'results': [run_config(float(w), args, sentences) for w in args.windows.split(',') if w.strip()],
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-token cost of txtpolishwithpos's POS agreement rules as the rule count grows (see pos_rules.py).
+
+The five shipped rules are padded with synthetic lexical rules (keyed on LOWER or LEMMA, the way
+agreement exceptions for irregular words are written) up to each --rule-counts entry, and the
+sample corpus is run through RuleSet.apply() twice per count:
+  * indexed - a token only evaluates the rules filed under its own tag/dep/lemma/text
+  * linear  - every rule is evaluated on every token (the old hand-written loop's behaviour)
+The report lists µs per token and rule evaluations per token for both, and checks that the
+synthetic rules didn't change the output of the shipped ones.
+
+spaCy isn't needed: the corpus is tagged by the heuristic tagger from stubs.py.
+
+Usage:
+    python benchmarks/pos_rules_scaling.py --rule-counts 5,50,200,500 --output pos_rules.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus', 'sentences.txt')
+CONTEXTS = ('past', 'present', 'future', 'unknown')
+
+
+def synthetic_rules(count):
+    # Never fire on the corpus (the trigger words don't occur), but are indexed like real rules
+    rules = []
+    for k in range(count):
+        attribute = 'LOWER' if k % 2 else 'LEMMA'
+        rules.append({
+            'name': f'synthetic-{k}',
+            'pattern': [{attribute: f'word{k}'}, {'TAG': {'IN': ['VBP', 'VB']}}],
+            'action': {'INFLECT': 'VBZ', 'TARGET': 1},
+            'message': "'{0} {1}' → '{0} {new}'",
+        })
+    return rules
+
+
+def measure(rule_set, docs, repeat):
+    evaluations = 0
+    for doc, context in docs:
+        evaluations += sum(len(rule_set.candidates(token, context)) for token in doc)
+    tokens = sum(len(doc) for doc, _ in docs)
+    outputs = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [rule_set.apply(doc, context) for doc, context in docs]
+    seconds = time.perf_counter() - start
+    return {
+        'us_per_token': round(seconds * 1e6 / (tokens * repeat), 3),
+        'rule_evaluations_per_token': round(evaluations / tokens, 2),
+    }, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rule-counts', default='5,50,200,500', help='total rules per run, comma separated')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='one sentence per line')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)  # polishcore
+    sys.path.insert(0, os.path.join(ROOT, 'txtpolishwithpos'))
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    from pos_rules import POS_RULES, RuleSet
+    from stubs import StubDoc
+
+    with open(args.corpus, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+    # Every sentence under every temporal context, so the context-specific rules take part too
+    docs = [(StubDoc(sentence), context) for sentence in sentences for context in CONTEXTS]
+    baseline = [RuleSet(POS_RULES).apply(doc, context) for doc, context in docs]
+
+    runs = []
+    for count in (int(value) for value in args.rule_counts.split(',')):
+        definitions = POS_RULES + synthetic_rules(max(0, count - len(POS_RULES)))
+        run = {'rules': len(definitions)}
+        for mode, indexed in (('indexed', True), ('linear', False)):
+            run[mode], outputs = measure(RuleSet(definitions, indexed=indexed), docs, args.repeat)
+            run[mode]['same_output'] = outputs == baseline
+        run['speedup'] = round(run['linear']['us_per_token'] / run['indexed']['us_per_token'], 2)
+        runs.append(run)
+
+    report = {
+        'corpus': args.corpus,
+        'sentences': len(sentences),
+        'tokens': sum(len(doc) for doc, _ in docs),
+        'runs': runs,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
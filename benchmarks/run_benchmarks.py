@@ -0,0 +1,342 @@
+"""
+Per-stage benchmark suite for the polishing entry points.
+
+Suites (app directory in brackets):
+  polish_text              [tpprithvifinal]    one call per sentence
+  polish_full_text         [tpprithvifinal]    one call per document
+  stream_polish_sentences  [livepolishing]     document streamed through the pipelined executor
+  analyze_pos_agreement    [txtpolishwithpos]  one call per sentence
+  process_docx_paragraphs  [docpolish]         generated .docx in, corrected .docx out
+
+Each backend component is wrapped in a timing proxy, so every run reports time spent in
+LanguageTool, spaCy, generation, tokenization, clean_spacing, diff/highlight and docx I/O next
+to throughput, p50/p95 latency and peak RSS. Result caches are disabled while measuring.
+
+--stub swaps in the deterministic fakes from stubs.py, which needs no model weights, JVM or
+network and isolates the orchestration overhead. The JSON report is meant to be diffed between runs.
+
+Usage:
+    python benchmarks/run_benchmarks.py --stub --sizes small,medium --output bench.json
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+APPS = ['grammarapp', 'tpprithvifinal', 'livepolishing', 'lv_seshbuffpol', 'txtpolishwithpos', 'docpolish']
+APP_DIRS = {os.path.join(ROOT, app) for app in APPS}
+SHARED_PACKAGE = 'polishcore'
+
+sys.path.insert(0, ROOT)  # polishcore, without needing `pip install -e .`
+sys.path.insert(0, BENCH_DIR)
+import corpus  # noqa: E402
+import stubs  # noqa: E402
+
+COMPONENT_STAGES = {
+    'languagetool': 'languagetool',
+    'nlp': 'spacy',
+    'model': 'generation',
+    'tokenizer': 'tokenization',
+}
+
+
+# === Timing ===
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            with self.time(stage):
+                return fn(*args, **kwargs)
+        return timed
+
+    def summary(self, wall_seconds):
+        # Shares can add up to more than 1.0 when stages overlap (pipelined streaming)
+        report = {}
+        for stage, samples in sorted(self.samples.items()):
+            total = sum(samples)
+            report[stage] = {
+                'calls': len(samples),
+                'total_ms': round(total * 1000, 3),
+                'p50_ms': round(percentile(samples, 50) * 1000, 4),
+                'p95_ms': round(percentile(samples, 95) * 1000, 4),
+                'share_of_wall': round(total / wall_seconds, 4) if wall_seconds else 0.0,
+            }
+        return report
+
+
+class TimedProxy:
+    """Forwards everything to the wrapped backend, timing calls, check(), generate() and pipe()."""
+
+    def __init__(self, target, stage, timer):
+        self._target = target
+        self._stage = stage
+        self._timer = timer
+
+    def __call__(self, *args, **kwargs):
+        with self._timer.time(self._stage):
+            return self._target(*args, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in ('check', 'generate'):
+            return self._timer.wrap(self._stage, attr)
+        if name == 'pipe':
+            return self._timed_pipe
+        return attr
+
+    def _timed_pipe(self, *args, **kwargs):
+        iterator = iter(self._target.pipe(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self._timer.record(self._stage, time.perf_counter() - start)
+            yield item
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+# === Loading an app module in isolation (every app has its own text_polish/app/...) ===
+def forget_loaded_modules():
+    # Also polishcore: its modules read their settings from the environment at import time
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        shared = name == SHARED_PACKAGE or name.startswith(SHARED_PACKAGE + '.')
+        if shared or (path and os.path.dirname(os.path.abspath(path)) in APP_DIRS):
+            del sys.modules[name]
+
+
+def load_shared_module(module_name):
+    forget_loaded_modules()
+    return importlib.import_module(f'{SHARED_PACKAGE}.{module_name}')
+
+
+def load_app_module(app, module_name):
+    forget_loaded_modules()
+    directory = os.path.join(ROOT, app)
+    sys.path.insert(0, directory)
+    try:
+        return importlib.import_module(module_name)
+    finally:
+        sys.path.remove(directory)
+
+
+def instrument(module, timer, use_stubs):
+    if use_stubs:
+        stubs.install_stub_backends(module)
+    else:
+        module.registry.warm_up()
+
+    for name in module.registry.status():
+        if name in COMPONENT_STAGES:
+            module.registry.override(name, TimedProxy(module.registry.get(name), COMPONENT_STAGES[name], timer))
+
+    # The text_polish variants keep clean_spacing and the cache on their engine (polishcore/polish_engine.py)
+    owner = getattr(module, 'engine', module)
+    if hasattr(owner, 'clean_spacing'):
+        owner.clean_spacing = timer.wrap('clean_spacing', owner.clean_spacing)
+    disable_result_cache(module)
+
+
+def disable_result_cache(module):
+    engine = getattr(module, 'engine', None)
+    if engine is not None:
+        engine.cache = type(engine.cache)('benchmark', 'benchmark', 'benchmark', max_entries=0, db_path=None)
+    elif hasattr(module, '_cache'):
+        module._cache = module.ResultCache('benchmark', 'benchmark', 'benchmark', max_entries=0, db_path=None)
+
+
+# === Suites: each returns (work_units, unit, per-call latencies in seconds) ===
+def suite_polish_text(module, size, repeat):
+    sentences = corpus.build_sentences(size)
+    latencies = []
+    for _ in range(repeat):
+        for sentence in sentences:
+            start = time.perf_counter()
+            module.polish_text(sentence)
+            latencies.append(time.perf_counter() - start)
+    return len(sentences) * repeat, 'sentences', latencies
+
+
+def suite_polish_full_text(module, size, repeat):
+    text = corpus.build_text(size)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        module.polish_full_text(text)
+        latencies.append(time.perf_counter() - start)
+    return len(corpus.build_sentences(size)) * repeat, 'sentences', latencies
+
+
+def suite_stream(module, size, repeat):
+    # Latency here is the gap between consecutive streamed sentences (the first one is time-to-first-result)
+    text = corpus.build_text(size)
+    latencies = []
+    produced = 0
+    for _ in range(repeat):
+        last = time.perf_counter()
+        for _detail in module.stream_polish_sentences(text):
+            now = time.perf_counter()
+            latencies.append(now - last)
+            last = now
+            produced += 1
+    return produced, 'sentences', latencies
+
+
+def suite_pos_agreement(module, size, repeat):
+    sentences = corpus.build_sentences(size)
+    latencies = []
+    for _ in range(repeat):
+        for sentence in sentences:
+            start = time.perf_counter()
+            module.analyze_pos_agreement(sentence)
+            latencies.append(time.perf_counter() - start)
+    return len(sentences) * repeat, 'sentences', latencies
+
+
+def suite_docx(module, size, repeat, timer):
+    real_document = module.Document
+
+    def timed_document(*args, **kwargs):
+        with timer.time('docx_io'):
+            doc = real_document(*args, **kwargs)
+        real_save = doc.save
+
+        def save(path):
+            with timer.time('docx_io'):
+                real_save(path)
+
+        doc.save = save
+        return doc
+
+    module.Document = timed_document
+    module.highlight_differences = timer.wrap('diff_highlight', module.highlight_differences)
+
+    latencies = []
+    paragraphs = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = corpus.write_docx(size, os.path.join(workdir, f'{size}.docx'))
+        output_path = os.path.join(workdir, f'corrected_{size}.docx')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stats = module.process_docx_paragraphs(input_path, output_path)
+            latencies.append(time.perf_counter() - start)
+            paragraphs += stats['paragraphs']
+    return paragraphs, 'paragraphs', latencies
+
+
+SUITES = {
+    'polish_text': ('tpprithvifinal', 'text_polish', suite_polish_text),
+    'polish_full_text': ('tpprithvifinal', 'text_polish', suite_polish_full_text),
+    'stream_polish_sentences': ('livepolishing', 'text_polish', suite_stream),
+    'analyze_pos_agreement': ('txtpolishwithpos', 'text_processor', suite_pos_agreement),
+    'process_docx_paragraphs': ('docpolish', 'checker', suite_docx),
+}
+
+
+def run_suite(name, size, repeat, use_stubs):
+    app, module_name, suite = SUITES[name]
+    timer = StageTimer()
+    module = load_app_module(app, module_name)
+    instrument(module, timer, use_stubs)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if suite is suite_docx:
+            units, unit, latencies = suite(module, size, repeat, timer)
+        else:
+            units, unit, latencies = suite(module, size, repeat)
+    wall = time.perf_counter() - start
+
+    return {
+        'suite': name,
+        'app': app,
+        'size': size,
+        'repeat': repeat,
+        'work_units': units,
+        'unit': unit,
+        'wall_seconds': round(wall, 4),
+        'throughput_per_sec': round(units / wall, 2) if wall else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+        },
+        'stages': timer.summary(wall),
+        'peak_rss_mb': peak_rss_mb(),  # process-wide high-water mark so far
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stub', action='store_true', help='use deterministic fake backends (no models needed)')
+    parser.add_argument('--suites', default=','.join(SUITES), help='comma-separated suite names')
+    parser.add_argument('--sizes', default='small,medium', help=f"comma-separated from {', '.join(corpus.SIZES)}")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    shimmed = stubs.install_import_shims() if args.stub else []
+    report = {
+        'mode': 'stub' if args.stub else 'real',
+        'shimmed_modules': shimmed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [],
+    }
+
+    for name in [s.strip() for s in args.suites.split(',') if s.strip()]:
+        for size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+            try:
+                report['results'].append(run_suite(name, size, args.repeat, args.stub))
+            except ImportError as e:
+                report['results'].append({'suite': name, 'size': size, 'skipped': f"missing dependency: {e}"})
+                print(f"⚠️ Skipping {name}/{size}: {e}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
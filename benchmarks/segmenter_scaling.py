@@ -0,0 +1,115 @@
+"""
+Keystroke cost of the keylogger's sentence detection, and document splitting (see polishcore/segmenter.py).
+
+keystrokes: an unterminated paragraph of each --buffer-sizes length is typed one character at a
+time (terminated sentences in between are cleared as they complete). The report gives µs per key
+over the last --tail keys, for
+  * rescan      - the previous keylogger code: two regexes over the whole buffer on every key
+  * incremental - IncrementalSegmenter.append(), which scans only the new character
+splitting: the sample corpus, repeated up to --document-chars, is split by the previous
+whitespace-after-punctuation regex and by segmenter.sentence_spans(); the report gives MB/s and
+how many sentences each produced (the difference is abbreviations and initials no longer split).
+
+Usage:
+    python benchmarks/segmenter_scaling.py --buffer-sizes 500,1000,2000 --output segmenter.json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus', 'sentences.txt')
+LEGACY_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+class RescanBuffer:
+    # grammarapp/keylogging.py before the incremental segmenter
+    def __init__(self):
+        self.buffer = ""
+
+    def append(self, char):
+        self.buffer += char
+        sentences = re.findall(r'[^.!?]*[.!?]', self.buffer)
+        self.buffer = re.sub(r'[^.!?]*[.!?]', '', self.buffer)
+        return [s.strip() for s in sentences if len(s.strip()) > 5]
+
+
+def paragraph(words, length):
+    # Text without sentence punctuation, as typed in one long run-on paragraph
+    text, i = [], 0
+    while sum(map(len, text)) + len(text) < length:
+        text.append(words[i % len(words)])
+        i += 1
+    return " ".join(text)[:length]
+
+
+def time_keys(segmenter, text, tail):
+    latencies = []
+    for char in text:
+        start = time.perf_counter()
+        segmenter.append(char)
+        latencies.append(time.perf_counter() - start)
+    last = latencies[-tail:]
+    return {
+        'us_per_key_tail': round(sum(last) * 1e6 / len(last), 3),
+        'seconds_total': round(sum(latencies), 4),
+    }
+
+
+def time_split(split, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        count = len(split(text))
+    seconds = (time.perf_counter() - start) / repeat
+    return {'mb_per_sec': round(len(text.encode('utf-8')) / seconds / 1e6, 2), 'sentences': count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--buffer-sizes', default='500,1000,2000')
+    parser.add_argument('--tail', type=int, default=1000, help='keys averaged at the end of each buffer')
+    parser.add_argument('--document-chars', type=int, default=2_000_000)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='one sentence per line')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from polishcore.segmenter import IncrementalSegmenter, sentence_spans
+
+    with open(args.corpus, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+    words = [word.strip('.!?') for sentence in sentences for word in sentence.split()]
+
+    keystrokes = []
+    for size in (int(value) for value in args.buffer_sizes.split(',')):
+        text = paragraph(words, size)
+        tail = min(args.tail, size)
+        keystrokes.append({
+            'buffer_chars': size,
+            'rescan': time_keys(RescanBuffer(), text, tail),
+            'incremental': time_keys(IncrementalSegmenter(), text, tail),
+        })
+
+    document = " ".join(sentences)
+    document = (document + " ") * max(1, args.document_chars // (len(document) + 1))
+    legacy = lambda text: [s for s in LEGACY_BOUNDARY.split(text) if s.strip()]
+    splitting = {
+        'document_chars': len(document),
+        'legacy_regex': time_split(legacy, document, args.repeat),
+        'segmenter': time_split(sentence_spans, document, args.repeat),
+    }
+
+    report = {'keystrokes': keystrokes, 'splitting': splitting}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Greedy generate() vs input-guided (prompt-lookup) speculative decoding (see polishcore/speculative.py).
+
+Every sentence of the sample corpus is decoded one at a time, with the same length cap, by:
+  * greedy      - model.generate(), the current path with a batch of one
+  * speculative - prompt_lookup_decode(), drafting from the source ids
+and the report lists, per mode, tokens/sec, per-sentence latency p50/p95 and decoder forward
+passes per generated token, plus draft acceptance and the number of outputs that differ from
+greedy (expected: 0).
+
+Usage:
+    python benchmarks/speculative_decoding.py --backend torch --output speculative.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus', 'sentences.txt')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(mode, outputs, latencies, forward_passes):
+    tokens = sum(len(ids) - 1 for ids in outputs)  # without the decoder start token
+    seconds = sum(latencies) / 1000
+    return {
+        'mode': mode,
+        'generated_tokens': tokens,
+        'tokens_per_sec': round(tokens / seconds, 2),
+        'latency_ms_p50': round(percentile(latencies, 50), 2),
+        'latency_ms_p95': round(percentile(latencies, 95), 2),
+        'forward_passes_per_token': round(forward_passes / tokens, 3) if tokens else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variant', default='tpprithvifinal',
+                        choices=['tpprithvifinal', 'grammarapp', 'livepolishing', 'lv_seshbuffpol'],
+                        help='app directory whose modules are benchmarked')
+    parser.add_argument('--backend', default='torch', choices=['torch', 'torch-int8'])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='one sentence per line')
+    parser.add_argument('--draft-tokens', type=int, default=None)
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)  # polishcore
+    sys.path.insert(0, os.path.join(ROOT, args.variant))
+    import torch
+    import text_polish
+    from polishcore.inference_backends import load_model
+    from polishcore.speculative import DRAFT_TOKENS, length_cap, prompt_lookup_decode, supports_prompt_lookup
+
+    with open(args.corpus, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+
+    tokenizer = text_polish.registry.get("tokenizer")
+    model = load_model(text_polish.model_id, args.backend)
+    if not supports_prompt_lookup(model):
+        sys.exit("The model's generation config is not plain greedy; speculative decoding would not match it")
+    draft_tokens = args.draft_tokens or DRAFT_TOKENS
+    budget = text_polish.token_budget()
+    sources = [tokenizer.build_inputs_with_special_tokens(tokenizer(s, add_special_tokens=False)['input_ids'][:budget])
+               for s in sentences]
+
+    def greedy(source):
+        with torch.no_grad():
+            generated = model.generate(input_ids=torch.tensor([source]),
+                                       max_new_tokens=length_cap(len(source), text_polish.max_tokens()))
+        return generated[0].tolist()
+
+    stats = {}
+
+    def speculative(source):
+        return prompt_lookup_decode(model, source, length_cap(len(source), text_polish.max_tokens()),
+                                    draft_tokens=draft_tokens, stats=stats)
+
+    greedy(sources[0])  # warm-up
+    speculative(sources[0])
+    stats.clear()
+
+    results = {}
+    for mode, decode in (('greedy', greedy), ('speculative', speculative)):
+        outputs, latencies = [], []
+        for source in sources:
+            start = time.perf_counter()
+            outputs.append(decode(source))
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[mode] = (outputs, latencies)
+
+    greedy_outputs, greedy_latencies = results['greedy']
+    spec_outputs, spec_latencies = results['speculative']
+    # generate() emits one forward pass per token (the last one produces EOS)
+    greedy_stats = summarize('greedy', greedy_outputs, greedy_latencies, sum(len(ids) - 1 for ids in greedy_outputs))
+    spec_stats = summarize('speculative', spec_outputs, spec_latencies, stats['forward_passes'])
+    spec_stats['draft_tokens'] = draft_tokens
+    spec_stats['draft_acceptance'] = round(stats['accepted'] / stats['drafted'], 4) if stats['drafted'] else None
+    spec_stats['speedup_vs_greedy'] = round(spec_stats['tokens_per_sec'] / greedy_stats['tokens_per_sec'], 2)
+
+    # Compare ids up to EOS: generate() may pad, prompt_lookup_decode() stops at EOS
+    differing = [i for i, (ref, out) in enumerate(zip(greedy_outputs, spec_outputs))
+                 if ref[:len(out)] != out or any(t != tokenizer.pad_token_id for t in ref[len(out):])]
+
+    report = {
+        'variant': args.variant,
+        'backend': args.backend,
+        'corpus': args.corpus,
+        'sentences': len(sentences),
+        'modes': [greedy_stats, spec_stats],
+        'parity': {
+            'differing_outputs': len(differing),
+            'examples': [{'input': sentences[i],
+                          'greedy': tokenizer.decode(greedy_outputs[i], skip_special_tokens=True),
+                          'speculative': tokenizer.decode(spec_outputs[i], skip_special_tokens=True)}
+                         for i in differing[:5]],
+        },
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
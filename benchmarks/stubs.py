@@ -0,0 +1,261 @@
+"""
+Deterministic stand-ins for the heavy backends, so the orchestration code (splitting, caching,
+batching, pipelining, rule evaluation, docx I/O) can be benchmarked without model weights,
+a JVM or network access. Outputs are cheap and repeatable, not linguistically meaningful.
+"""
+import importlib
+import re
+import sys
+import threading
+import time
+import types
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+PRONOUNS = {"i", "you", "he", "she", "it", "we", "they"}
+MODALS = {"can", "could", "will", "would", "shall", "should", "may", "might", "must"}
+BE_FORMS = {"is": "VBZ", "are": "VBP", "am": "VBP", "was": "VBD", "were": "VBD", "be": "VB"}
+DETERMINERS = {"the", "a", "an", "this", "that", "these", "those", "my", "our", "their", "each"}
+
+
+# === Import shims (only installed when the real package is missing) ===
+def _correct(text, matches):
+    ltext = list(text)
+    shift = 0
+    for match in matches:
+        if not match.replacements:
+            continue
+        start = match.offset + shift
+        replacement = match.replacements[0]
+        ltext[start:start + match.errorLength] = list(replacement)
+        shift += len(replacement) - match.errorLength
+    return ''.join(ltext)
+
+
+def install_import_shims():
+    """Registers minimal torch / language_tool_python modules if they can't be imported."""
+    shimmed = []
+
+    try:
+        importlib.import_module('language_tool_python.utils')
+    except ImportError:
+        package = types.ModuleType('language_tool_python')
+        utils = types.ModuleType('language_tool_python.utils')
+        utils.correct = _correct
+        package.utils = utils
+        sys.modules['language_tool_python'] = package
+        sys.modules['language_tool_python.utils'] = utils
+        shimmed.append('language_tool_python')
+
+    try:
+        importlib.import_module('torch')
+    except ImportError:
+        import contextlib
+        torch = types.ModuleType('torch')
+        torch.no_grad = contextlib.nullcontext
+        sys.modules['torch'] = torch
+        shimmed.append('torch')
+
+    return shimmed
+
+
+# === Tokenizer + model: the model echoes its input, so "polished" text equals the source ===
+class StubTokenizer:
+    model_max_length = 512
+    pad_token_id = 0
+
+    def __init__(self):
+        self._vocab = {}
+        self._words = {}
+        self._lock = threading.Lock()
+
+    def _id(self, word):
+        token_id = self._vocab.get(word)
+        if token_id is None:
+            with self._lock:
+                token_id = self._vocab.setdefault(word, len(self._vocab) + 10)
+                self._words[token_id] = word
+        return token_id
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False, verbose=True):
+        matches = list(WORD_RE.finditer(text))
+        encoding = {'input_ids': [self._id(m.group()) for m in matches]}
+        if add_special_tokens:
+            encoding['input_ids'] = self.build_inputs_with_special_tokens(encoding['input_ids'])
+        if return_offsets_mapping:
+            encoding['offset_mapping'] = [(m.start(), m.end()) for m in matches]
+        return encoding
+
+    def tokenize(self, text):
+        return WORD_RE.findall(text)
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 1
+
+    def build_inputs_with_special_tokens(self, ids):
+        return list(ids) + [1]
+
+    def pad(self, features, return_tensors=None):
+        longest = max(len(ids) for ids in features['input_ids'])
+        return {
+            'input_ids': [ids + [0] * (longest - len(ids)) for ids in features['input_ids']],
+            'attention_mask': [[1] * len(ids) + [0] * (longest - len(ids)) for ids in features['input_ids']],
+        }
+
+    def batch_decode(self, sequences, skip_special_tokens=True, clean_up_tokenization_spaces=False):
+        return [' '.join(self._words[i] for i in sequence if i >= 10) for sequence in sequences]
+
+
+class StubIds(list):
+    # Just enough of the tensor API for the token counting done after generate()
+    def ne(self, value):
+        return StubIds([[int(i != value) for i in row] for row in self])
+
+    def sum(self, dim=None):
+        if dim == 1:
+            return StubIds([sum(row) for row in self])
+        return sum(sum(row) for row in self)
+
+    def tolist(self):
+        return list(self)
+
+
+class StubModel:
+    def __init__(self, batch_seconds=0.0, item_seconds=0.0):
+        # Optional simulated cost: a fixed per-call overhead plus a per-sequence cost. Calls are
+        # serialized like on a real device, where concurrent generate calls contend for the same cores.
+        self.batch_seconds = batch_seconds
+        self.item_seconds = item_seconds
+        self._device = threading.Lock()
+
+    def generate(self, input_ids=None, attention_mask=None, **kwargs):
+        if self.batch_seconds or self.item_seconds:
+            with self._device:
+                time.sleep(self.batch_seconds + self.item_seconds * len(input_ids))
+        return StubIds(input_ids)
+
+
+# === LanguageTool: flags a few mechanical patterns with a fixed suggestion ===
+class StubMatch:
+    def __init__(self, offset, length, replacement, message):
+        self.offset = offset
+        self.errorLength = length
+        self.replacements = [replacement]
+        self.message = message
+
+
+class StubLanguageTool:
+    PATTERNS = [
+        (re.compile(r"\bi\b"), lambda m: "I", "Use a capital 'I'."),
+        (re.compile(r"\b(\w+) \1\b"), lambda m: m.group(1), "Repeated word."),
+        (re.compile(r" {2,}"), lambda m: " ", "Extra whitespace."),
+        (re.compile(r"\bdont\b"), lambda m: "don't", "Missing apostrophe."),
+    ]
+
+    def check(self, text):
+        matches = []
+        for pattern, replacement, message in self.PATTERNS:
+            for m in pattern.finditer(text):
+                matches.append(StubMatch(m.start(), m.end() - m.start(), replacement(m), message))
+        return sorted(matches, key=lambda match: match.offset)
+
+
+# === spaCy: a heuristic tagger producing Doc/Token objects with the attributes the rules read ===
+class _Inflector:
+    def __init__(self, token):
+        self._token = token
+
+    def inflect(self, tag):
+        lemma = self._token.lemma_
+        return {"VBZ": lemma + "s", "VBD": lemma + "ed", "VB": lemma, "VBP": lemma}.get(tag, self._token.text)
+
+
+class StubToken:
+    def __init__(self, doc, text, idx, i):
+        self.doc = doc
+        self.text = text
+        self.idx = idx
+        self.i = i
+        self.children = []
+        self.ent_type_ = ""
+        lowered = self.lower_ = text.lower()
+        self.lemma_ = "be" if lowered in BE_FORMS else re.sub(r"(ed|s)$", "", lowered) or lowered
+
+        if not text[0].isalnum():
+            self.pos_, self.tag_, self.dep_ = "PUNCT", ".", "punct"
+        elif lowered in PRONOUNS:
+            self.pos_, self.tag_, self.dep_ = "PRON", "PRP", "nsubj"
+        elif lowered in MODALS:
+            self.pos_, self.tag_, self.dep_ = "AUX", "MD", "aux"
+        elif lowered in BE_FORMS:
+            self.pos_, self.tag_, self.dep_ = "AUX", BE_FORMS[lowered], "ROOT"
+        elif lowered in DETERMINERS:
+            self.pos_, self.tag_, self.dep_ = "DET", "DT", "det"
+        elif lowered.endswith("ed"):
+            self.pos_, self.tag_, self.dep_ = "VERB", "VBD", "ROOT"
+        elif text[0].isupper() and i > 0:
+            self.pos_, self.tag_, self.dep_ = "PROPN", "NNP", "nsubj"
+            self.ent_type_ = "ORG"
+        elif lowered.endswith("s"):
+            self.pos_, self.tag_, self.dep_ = "NOUN", "NNS", "attr"
+        else:
+            self.pos_, self.tag_, self.dep_ = "NOUN", "NN", "dobj"
+        self._ = _Inflector(self)
+
+    def __len__(self):
+        return len(self.text)
+
+
+class StubDoc:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = [StubToken(self, m.group(), m.start(), i) for i, m in enumerate(WORD_RE.finditer(text))]
+        # Attach every token to the nearest preceding ROOT so children-based rules have something to walk
+        root = None
+        for token in self.tokens:
+            if token.dep_ == "ROOT":
+                root = token
+            elif root is not None:
+                root.children.append(token)
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, index):
+        return self.tokens[index]
+
+    @property
+    def sents(self):
+        return [self]
+
+
+class StubNLP:
+    pipe_names = ["stub_tagger"]
+
+    def __call__(self, text):
+        return StubDoc(text)
+
+    def pipe(self, texts, batch_size=1, n_process=1):
+        for text in texts:
+            yield StubDoc(text)
+
+
+STUB_COMPONENTS = {
+    "tokenizer": StubTokenizer,
+    "model": StubModel,
+    "languagetool": StubLanguageTool,
+    "nlp": StubNLP,
+}
+
+
+def install_stub_backends(module):
+    """Overrides every stubbable component registered on module.registry."""
+    installed = []
+    for name, factory in STUB_COMPONENTS.items():
+        if name in module.registry.status():
+            module.registry.override(name, factory())
+            installed.append(name)
+    return installed
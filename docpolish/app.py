@@ -1,53 +1,139 @@
-from flask import Flask, request, render_template, send_file
+from flask import Flask, request, render_template, send_file, jsonify, url_for, Response
 import os
-from checker import process_docx_paragraphs
+import shutil
+import tempfile
+from jobs import JobManager
+from polishcore.metrics import instrument_flask, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
 from werkzeug.utils import secure_filename
-import io
 
 app = Flask(__name__)
 
-UPLOAD_FOLDER = 'uploads'
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+checker = load_pipeline("checker")
+registry = checker.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm.
+# Under the debug reloader the file-watcher process imports this module too, so only the serving
+# process (or a WSGI server importing the app) starts the warm-up.
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    registry.start_warmup()
+instrument_flask(app)
+
+UPLOAD_FOLDER = os.path.abspath('uploads')  # absolute: a model host may run from another directory
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# === Background job mode: bounded worker pool, per-job temp dirs, results kept for JOB_TTL_SECONDS ===
+JOB_WORKERS = 2
+JOB_MAX_PENDING = 16
+JOB_TTL_SECONDS = 3600
+
+jobs = JobManager(
+    lambda input_path, output_path, progress: checker.process_docx_paragraphs(input_path, output_path, progress=progress),
+    root=UPLOAD_FOLDER,
+    max_workers=JOB_WORKERS,
+    max_pending=JOB_MAX_PENDING,
+    ttl_seconds=JOB_TTL_SECONDS
+)
+
+
+def get_docx_upload():
+    # Returns (uploaded_file, filename, None) or (None, None, error_response)
+    if 'file' not in request.files:
+        return None, None, ("❌ No file part", 400)
+
+    uploaded_file = request.files['file']
+
+    if uploaded_file.filename == '':
+        return None, None, ("❌ No selected file", 400)
+
+    if not uploaded_file.filename.endswith('.docx'):
+        return None, None, ("❌ Invalid file type. Only .docx allowed.", 400)
+
+    return uploaded_file, secure_filename(uploaded_file.filename), None
+
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        if 'file' not in request.files:
-            return "❌ No file part", 400
+        uploaded_file, filename, error = get_docx_upload()
+        if error:
+            return error
 
-        uploaded_file = request.files['file']
+        # Synchronous mode: per-request temp dir, result streamed from disk and removed afterwards
+        workdir = tempfile.mkdtemp(prefix="request_", dir=app.config['UPLOAD_FOLDER'])
+        input_path = os.path.join(workdir, filename)
+        output_path = os.path.join(workdir, f"corrected_{filename}")
 
-        if uploaded_file.filename == '':
-            return "❌ No selected file", 400
+        try:
+            uploaded_file.save(input_path)
+            checker.process_docx_paragraphs(input_path, output_path)
+            response = send_file(output_path, download_name=f"corrected_{filename}", as_attachment=True)
+        except Exception:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
 
-        if uploaded_file and uploaded_file.filename.endswith('.docx'):
-            filename = secure_filename(uploaded_file.filename)
-            input_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            output_path = os.path.join(app.config['UPLOAD_FOLDER'], f"corrected_{filename}")
+        response.call_on_close(lambda: shutil.rmtree(workdir, ignore_errors=True))
+        return response
 
-            uploaded_file.save(input_path)
-            process_docx_paragraphs(input_path, output_path)
+    return render_template('index.html')
 
-            # Stream file to client then remove both files
-            def cleanup_and_stream():
-                with open(output_path, 'rb') as f:
-                    data = f.read()
-                os.remove(input_path)
-                os.remove(output_path)
-                return data
 
-            return send_file(
-                io.BytesIO(cleanup_and_stream()),
-                download_name=f"corrected_{filename}",
-                as_attachment=True
-            )
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    uploaded_file, filename, error = get_docx_upload()
+    if error:
+        message, status = error
+        return jsonify({"error": message}), status
 
-        return "❌ Invalid file type. Only .docx allowed.", 400
+    job = jobs.submit(uploaded_file, filename)
+    if job is None:
+        return jsonify({"error": "Too many documents in progress, try again later."}), 503
 
-    return render_template('index.html')
+    body = job.to_dict()
+    body['status_url'] = url_for('job_status', job_id=job.id)
+    body['result_url'] = url_for('job_result', job_id=job.id)
+    return jsonify(body), 202, {'Location': body['status_url']}
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 409
+
+    # Streamed from the job's temp file; the janitor removes it once the TTL has passed
+    return send_file(job.output_path, download_name=f"corrected_{job.filename}", as_attachment=True)
+
+
+@app.route('/host-stats')
+def host_stats_route():
+    return jsonify(host_stats(checker))
+
+
+@app.route('/metrics')
+def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
 
+@app.route('/readyz')
+def readyz():
+    ready = registry.is_ready()
+    return jsonify({"ready": ready, "components": registry.status()}), (200 if ready else 503)
 
 if __name__ == '__main__':
     # Makes the server available to other machines on the same network
@@ -1,13 +1,26 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from docx import Document
 from docx.shared import RGBColor
 import language_tool_python
 import difflib
+from polishcore.components import ComponentRegistry, WARMUP_SENTENCE
+from polishcore.lt_pool import LanguageToolPool, LT_CHECK_THREADS, LT_POOL_SIZE
+from polishcore.metrics import StageTrace
 
-# === Initialize Tools ===
-print("⏳ Loading grammar tool...")
-tool = language_tool_python.LanguageTool('en-US')
-print("✅ Tool loaded successfully.")
+# === Initialize Tools (lazily, warmed in the background) ===
+def _load_tool():
+    print(f"⏳ Loading grammar tool ({LT_POOL_SIZE} server(s) x {LT_CHECK_THREADS} check threads)...")
+    tool = LanguageToolPool('en-US')
+    print("✅ Tool loaded successfully.")
+    return tool
+
+registry = ComponentRegistry()
+registry.register("languagetool", _load_tool, lambda tool: tool.check(WARMUP_SENTENCE))
+
+# Checks run inside the LanguageTool servers, so threads are enough to keep their check threads busy
+WORKERS = min(8, max(os.cpu_count() or 1, LT_POOL_SIZE * LT_CHECK_THREADS))
 
 # === Highlight differences between original and corrected ===
 def highlight_differences(original, corrected):
@@ -24,7 +37,12 @@ def highlight_differences(original, corrected):
 
 # === Correct entire paragraph ===
 def correct_paragraph(paragraph):
-    matches = tool.check(paragraph)
+    trace = StageTrace()
+    trace.count("sentences")
+
+    # Empty/whitespace-only paragraphs (spacing between sections) never need a server round trip
+    with trace.stage("languagetool"):
+        matches = registry.get("languagetool").check(paragraph) if paragraph.strip() else []
     if not matches:
         return {
             'original': paragraph,
@@ -34,7 +52,8 @@ def correct_paragraph(paragraph):
         }
 
     corrected = language_tool_python.utils.correct(paragraph, matches)
-    highlighted = highlight_differences(paragraph, corrected)
+    with trace.stage("diff_highlight"):
+        highlighted = highlight_differences(paragraph, corrected)
     return {
         'original': paragraph,
         'corrected': corrected,
@@ -42,14 +61,37 @@ def correct_paragraph(paragraph):
         'needs_correction': True
     }
 
+# === Check paragraphs, fanned out over a thread pool; results come back in document order ===
+def correct_paragraphs(paragraphs, workers=WORKERS, progress=None):
+    results = []
+    if workers <= 1 or len(paragraphs) <= 1:
+        checked = (correct_paragraph(paragraph) for paragraph in paragraphs)
+        pool = None
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        checked = pool.map(correct_paragraph, paragraphs)
+
+    try:
+        for result in checked:
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(paragraphs))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return results
+
 # === Process DOCX paragraph-wise ===
-def process_docx_paragraphs(input_path, output_path):
+def process_docx_paragraphs(input_path, output_path, workers=WORKERS, progress=None):
     print(f"🔍 Processing document paragraph-wise: {input_path}")
-    doc = Document(input_path)
+    start = time.perf_counter()
+    trace = StageTrace()
+    with trace.stage("docx_io"):
+        doc = Document(input_path)
     new_doc = Document()
 
-    for para in doc.paragraphs:
-        result = correct_paragraph(para.text)
+    paragraphs = [para.text for para in doc.paragraphs]
+    for result in correct_paragraphs(paragraphs, workers, progress):
         new_para = new_doc.add_paragraph()
 
         if result['needs_correction']:
@@ -64,11 +106,23 @@ def process_docx_paragraphs(input_path, output_path):
         else:
             new_para.add_run(result['original'])
 
-    new_doc.save(output_path)
+    with trace.stage("docx_io"):
+        new_doc.save(output_path)
+    elapsed = time.perf_counter() - start
     print(f"✅ Polished document saved: {output_path}")
 
+    return {
+        'paragraphs': len(paragraphs),
+        'seconds': elapsed,
+        'paragraphs_per_sec': len(paragraphs) / elapsed if elapsed else 0.0,
+        'workers': workers
+    }
+
 # === Run ===
 if __name__ == "__main__":
     input_path = input("📥 Enter the full path to the input .docx file: ").strip()
     output_path = input("📤 Enter the desired path to save the polished .docx file: ").strip()
-    process_docx_paragraphs(input_path, output_path)
+    workers = input(f"🧵 Number of parallel workers [{WORKERS}]: ").strip()
+    stats = process_docx_paragraphs(input_path, output_path, int(workers) if workers else WORKERS)
+    print(f"⏱️ {stats['paragraphs']} paragraphs in {stats['seconds']:.2f}s "
+          f"({stats['paragraphs_per_sec']:.1f} paragraphs/sec, {stats['workers']} workers)")
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# === Background jobs for document polishing ===
+# Each job gets its own temp directory (so identical upload names never collide), runs on a
+# bounded worker pool, reports paragraphs done/total, and is deleted TTL seconds after it finishes.
+
+
+class Job:
+    def __init__(self, job_id, filename, workdir):
+        self.id = job_id
+        self.filename = filename
+        self.workdir = workdir
+        self.input_path = os.path.join(workdir, filename)
+        self.output_path = os.path.join(workdir, f"corrected_{filename}")
+        self.status = 'queued'
+        self.done = 0
+        self.total = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'paragraphs_done': self.done,
+            'paragraphs_total': self.total,
+            'error': self.error
+        }
+
+
+class JobManager:
+    def __init__(self, process, root, max_workers=2, max_pending=16, ttl_seconds=3600):
+        # process(input_path, output_path, progress) where progress(done, total) is called as paragraphs finish
+        self._process = process
+        self.root = root
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docpolish-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._janitor, name="docpolish-job-janitor", daemon=True).start()
+
+    def submit(self, uploaded_file, filename):
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status in ('queued', 'running'))
+            if pending >= self.max_pending:
+                return None
+
+            job_id = uuid.uuid4().hex
+            job = Job(job_id, filename, tempfile.mkdtemp(prefix=f"job_{job_id}_", dir=self.root))
+            self._jobs[job_id] = job
+
+        try:
+            uploaded_file.save(job.input_path)
+            self._pool.submit(self._run, job)
+        except BaseException:
+            # Never leave a job 'queued' that no worker will run (it would hold a pending slot forever)
+            with self._lock:
+                del self._jobs[job_id]
+            shutil.rmtree(job.workdir, ignore_errors=True)
+            raise
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job.status = 'running'
+
+        def progress(done, total):
+            job.done, job.total = done, total
+
+        try:
+            self._process(job.input_path, job.output_path, progress)
+            job.status = 'done'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            if os.path.exists(job.input_path):
+                os.remove(job.input_path)
+
+    def cleanup_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished is not None and now - job.finished > self.ttl_seconds]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.workdir, ignore_errors=True)
+
+    def _janitor(self):
+        while True:
+            time.sleep(min(60, self.ttl_seconds))
+            self.cleanup_expired()
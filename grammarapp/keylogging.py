@@ -1,59 +1,190 @@
 import os
-import re
+import queue
 import threading
 import tkinter as tk
 from tkinter import scrolledtext
 from pynput import keyboard
-from text_polish import polish_full_text
+from polishcore.segmenter import IncrementalSegmenter
+from text_polish import polish_full_text, registry
 
 # === Global Variables ===
-SENTENCE_BUFFER = ""
+# Typed text not yet part of a finished sentence; boundaries are found incrementally (polishcore/segmenter.py)
+segmenter = IncrementalSegmenter()
+MIN_SENTENCE_LENGTH = 6
 LOG_FILE = os.path.expanduser('~/.corporate_keylog.txt')
 lock = threading.Lock()
 listener = None
 listener_running = False
 
-# === Extract complete sentences ===
-def extract_complete_sentences(text):
-    sentences = re.findall(r'[^.!?]*[.!?]', text)
-    remaining = re.sub(r'[^.!?]*[.!?]', '', text)
-    return [s.strip() for s in sentences if len(s.strip()) > 5], remaining
+# === Polishing off the key listener thread ===
+# Key presses only buffer text and queue finished sentences; one worker thread polishes them.
+# The worker waits until no new sentence has arrived for DEBOUNCE_SECONDS (or MAX_COALESCE are
+# waiting) and polishes them in one polish_full_text call, so a burst of typing costs one batched
+# generate pass. If the model falls behind by QUEUE_MAX sentences the oldest are dropped rather
+# than blocking key capture. Results reach the Tk widget through ui_queue, drained on the Tk
+# thread every UI_POLL_MS; the widget keeps the last OUTPUT_MAX_LINES lines.
+# Every queued sentence carries the session it was typed in. Stop starts a new session, so a batch
+# still being polished when Stop is pressed writes neither to the cleared log nor to the window.
+QUEUE_MAX = 64
+DEBOUNCE_SECONDS = 0.4
+MAX_COALESCE = 16
+UI_POLL_MS = 100
+OUTPUT_MAX_LINES = 2000
+# Original sentences are appended to LOG_FILE in batches of LOG_BATCH or every LOG_FLUSH_SECONDS
+LOG_BATCH = 32
+LOG_FLUSH_SECONDS = 2.0
+
+sentence_queue = queue.Queue(maxsize=QUEUE_MAX)
+ui_queue = queue.SimpleQueue()
+dropped_sentences = 0
+dropped_lock = threading.Lock()
+session = 0  # bumped by stop_keylogger, under log_lock
+log_buffer = []
+log_lock = threading.Lock()
+
+# === Queue a sentence without ever blocking the listener ===
+def enqueue_sentence(sentence):
+    global dropped_sentences
+    item = (session, sentence)
+    while True:
+        try:
+            sentence_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                sentence_queue.get_nowait()
+                with dropped_lock:
+                    dropped_sentences += 1
+            except queue.Empty:
+                pass
+
+def take_dropped_count():
+    global dropped_sentences
+    with dropped_lock:
+        count, dropped_sentences = dropped_sentences, 0
+    return count
+
+def discard_pending_sentences():
+    while True:
+        try:
+            sentence_queue.get_nowait()
+        except queue.Empty:
+            return
+
+# === Background polishing worker ===
+def next_batch():
+    # Blocks for the first sentence (flushing the log while idle), then debounces
+    while True:
+        try:
+            batch = [sentence_queue.get(timeout=LOG_FLUSH_SECONDS)]
+            break
+        except queue.Empty:
+            flush_log()
+    while len(batch) < MAX_COALESCE:
+        try:
+            batch.append(sentence_queue.get(timeout=DEBOUNCE_SECONDS))
+        except queue.Empty:
+            break
+    return batch
+
+def polish_worker():
+    while True:
+        items = next_batch()
+        generation = session
+        # Sentences typed before the last Stop belong to the cleared session
+        batch = [sentence for typed_in, sentence in items if typed_in == generation]
+        if not batch:
+            continue
+        messages = []
+        dropped = take_dropped_count()
+        if dropped:
+            messages.append(f"\n[…] {dropped} sentence(s) skipped, polishing fell behind typing.\n")
+        try:
+            result = polish_full_text(" ".join(batch))
+            messages.extend(format_sentence(detail) for detail in result['details'])
+        except Exception as e:
+            # The originals are still logged; only the polished display is missing
+            messages.append(f"\n[!] Polishing failed: {e}\n")
+        publish(generation, batch, messages)
+
+def start_worker():
+    threading.Thread(target=polish_worker, name="polish-worker", daemon=True).start()
 
 # === Log and display polished output ===
-def process_sentence(sentence, output_widget):
-    result = polish_full_text(sentence)
-    polished = result['polished_text']
-    write_to_log(sentence)
+def format_sentence(detail):
+    return f"\n[Original]: {detail['original']}\n[Polished]: {detail['polished']}\n"
+
+def publish(generation, sentences, messages):
+    # Runs on the worker thread: the text is handed to the Tk thread, never inserted from here.
+    # Checked and written under log_lock, so a Stop either comes before (nothing written) or after.
+    with log_lock:
+        if generation != session:
+            return
+        log_buffer.extend(sentence + '\n' for sentence in sentences)
+        full = len(log_buffer) >= LOG_BATCH
+        for message in messages:
+            ui_queue.put(message)
+    if full:
+        flush_log()
 
-    output = f"\n[Original]: {sentence}\n[Polished]: {polished}\n"
-    output_widget.insert(tk.END, output)
+def append_output(output_widget, text):
+    output_widget.insert(tk.END, text)
+    # Keep only the newest OUTPUT_MAX_LINES lines so long sessions don't grow without bound
+    excess = int(output_widget.index('end-1c').split('.')[0]) - OUTPUT_MAX_LINES
+    if excess > 0:
+        output_widget.delete('1.0', f'{excess + 1}.0')
     output_widget.see(tk.END)
 
-# === Write original sentence to file ===
-def write_to_log(text):
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(text + '\n')
+def show_pending_output(output_widget):
+    # Tk thread only
+    while True:
+        try:
+            text = ui_queue.get_nowait()
+        except queue.Empty:
+            return
+        append_output(output_widget, text)
+
+def drain_ui_queue(window, output_widget):
+    # Runs on the Tk thread via after(); reschedules itself
+    show_pending_output(output_widget)
+    window.after(UI_POLL_MS, drain_ui_queue, window, output_widget)
+
+# === Write original sentences to file (buffered) ===
+def flush_log():
+    with log_lock:
+        if not log_buffer:
+            return
+        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+            f.writelines(log_buffer)
+        log_buffer.clear()
 
 # === Key press handler ===
 def on_key_press(key, output_widget):
-    global SENTENCE_BUFFER
+    typed = None
     try:
         if key == keyboard.Key.space:
-            SENTENCE_BUFFER += ' '
+            typed = ' '
         elif key == keyboard.Key.enter:
-            SENTENCE_BUFFER += '\n'
+            typed = '\n'
         elif key == keyboard.Key.backspace:
-            SENTENCE_BUFFER = SENTENCE_BUFFER[:-1]
+            typed = ''
         elif hasattr(key, 'char') and key.char is not None:
-            SENTENCE_BUFFER += key.char
+            typed = key.char
     except:
         pass
+    if typed is None:
+        return
 
+    # Only the new character is scanned; a sentence is complete once whitespace follows its end
     with lock:
-        sentences, remaining = extract_complete_sentences(SENTENCE_BUFFER)
-        SENTENCE_BUFFER = remaining
-        for s in sentences:
-            process_sentence(s, output_widget)
+        if typed:
+            sentences = segmenter.append(typed)
+        else:
+            segmenter.delete()
+            sentences = []
+    for s in sentences:
+        if len(s) >= MIN_SENTENCE_LENGTH:
+            enqueue_sentence(s)
 
 # === Start keylogger in thread ===
 def start_keylogger(output_widget):
@@ -73,24 +204,34 @@ def start_keylogger(output_widget):
 
 # === Stop keylogger and clear log ===
 def stop_keylogger(output_widget):
-    global listener, listener_running, SENTENCE_BUFFER
+    global listener, listener_running, session
 
     if listener is not None:
         listener.stop()
         listener = None
     listener_running = False
-    SENTENCE_BUFFER = ""
+    with lock:
+        segmenter.reset()
 
-    # Clear log file
-    with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        f.write('')
+    # Drop sentences not polished yet, then clear log file (and what hasn't been written yet).
+    # The new session makes a batch that is being polished right now discard its result.
+    discard_pending_sentences()
+    take_dropped_count()
+    with log_lock:
+        session += 1
+        log_buffer.clear()
+        with open(LOG_FILE, 'w', encoding='utf-8') as f:
+            f.write('')
 
-    # Show stopped status
-    output_widget.insert(tk.END, "\n[✘] Logging stopped and log file cleared.\n")
-    output_widget.see(tk.END)
+    # Results published before the Stop go above the stopped status, none can follow it
+    show_pending_output(output_widget)
+    append_output(output_widget, "\n[✘] Logging stopped and log file cleared.\n")
 
 # === UI Setup ===
 def create_gui():
+    # Load the models while the window comes up instead of on the first sentence
+    registry.start_warmup()
+
     window = tk.Tk()
     window.title("Live Grammar Keylogger")
     window.geometry("700x500")
@@ -112,6 +253,13 @@ def create_gui():
                          command=lambda: stop_keylogger(output))
     stop_btn.pack(side=tk.LEFT, padx=10)
 
+    def on_close():
+        flush_log()
+        window.destroy()
+
+    window.protocol("WM_DELETE_WINDOW", on_close)
+    start_worker()
+    window.after(UI_POLL_MS, drain_ui_queue, window, output)
     window.mainloop()
 
 
@@ -1,9 +1,23 @@
-from flask import Flask, render_template, request, Response, stream_with_context
-from text_polish import stream_polish_sentences
-import json
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from polishcore.metrics import instrument_flask, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
+from polishcore.issues import dumps
 
 app = Flask(__name__)
 
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+text_polish = load_pipeline("text_polish")
+registry = text_polish.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm
+registry.start_warmup()
+instrument_flask(app)
+
+def wants_timings(payload=None):
+    # Per-stage timings are opt-in: ?timings=1, a timings form field, or "timings": true in JSON
+    value = (payload or {}).get('timings', request.values.get('timings', ''))
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -13,16 +27,42 @@ def stream():
     user_input = request.form.get('user_text', '')
     if not user_input.strip():
         return Response("No input text provided.", status=400)
+    timings = wants_timings()
 
     def generate():
         try:
-            for detail in stream_polish_sentences(user_input):
-                json_data = json.dumps(detail)
+            for detail in text_polish.stream_polish_sentences(user_input, timings=timings):
+                json_data = dumps(detail)
                 yield f"data: {json_data}\n\n"
         except ValueError as e:
             yield f"data: error|{str(e)}\n\n"
 
     return Response(stream_with_context(generate()), mimetype='text/event-stream')
 
+@app.route('/cache-stats')
+def cache_stats_route():
+    return jsonify(text_polish.cache_stats())
+
+@app.route('/tier-stats')
+def tier_stats_route():
+    return jsonify(text_polish.tier_stats())
+
+@app.route('/host-stats')
+def host_stats_route():
+    return jsonify(host_stats(text_polish))
+
+@app.route('/metrics')
+def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    ready = registry.is_ready()
+    return jsonify({"ready": ready, "components": registry.status()}), (200 if ready else 503)
+
 if __name__ == '__main__':
     app.run(host="0.0.0.0", threaded=True)
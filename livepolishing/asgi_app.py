@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, render_template, request, jsonify, Response
+from polishcore.issues import dumps
+from polishcore.metrics import instrument_asgi, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
+from polishcore.offload import offload_iter, run_blocking
+
+# === asyncio/ASGI variant of app.py: same routes, no thread per connection ===
+# Open SSE streams are coroutines; the blocking polish work runs on a bounded pool of
+# POLISH_WORKERS threads, one sentence per job, and stops as soon as the client disconnects.
+# Run with: hypercorn asgi_app:app --bind 0.0.0.0:5000
+
+POLISH_WORKERS = int(os.environ.get("POLISH_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+app = Quart(__name__)
+app.config['RESPONSE_TIMEOUT'] = None  # long documents stream for longer than the 60 s default
+
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+text_polish = load_pipeline("text_polish")
+registry = text_polish.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm
+registry.start_warmup()
+instrument_asgi(app)
+
+executor = ThreadPoolExecutor(max_workers=POLISH_WORKERS, thread_name_prefix="polish")
+
+async def wants_timings(payload=None):
+    # Per-stage timings are opt-in: ?timings=1, a timings form field, or "timings": true in JSON
+    value = (payload or {}).get('timings', (await request.values).get('timings', ''))
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+@app.route('/stream', methods=['POST'])
+async def stream():
+    user_input = (await request.form).get('user_text', '')
+    if not user_input.strip():
+        return Response("No input text provided.", status=400)
+    timings = await wants_timings()
+
+    async def generate():
+        # One executor job per sentence; a disconnect cancels this generator between (or during) them
+        sentences = text_polish.stream_polish_sentences(user_input, pipelined=False, timings=timings)
+        try:
+            async for detail in offload_iter(sentences, executor):
+                json_data = dumps(detail)
+                yield f"data: {json_data}\n\n"
+        except ValueError as e:
+            yield f"data: error|{str(e)}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream')
+
+@app.route('/cache-stats')
+async def cache_stats_route():
+    return jsonify(await run_blocking(executor, text_polish.cache_stats))
+
+@app.route('/tier-stats')
+async def tier_stats_route():
+    return jsonify(await run_blocking(executor, text_polish.tier_stats))
+
+@app.route('/host-stats')
+async def host_stats_route():
+    return jsonify(await run_blocking(executor, host_stats, text_polish))
+
+@app.route('/metrics')
+async def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+async def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+async def readyz():
+    # With model hosts these are calls to the host processes, so they run off the event loop too
+    ready, components = await run_blocking(executor, lambda: (registry.is_ready(), registry.status()))
+    return jsonify({"ready": ready, "components": components}), (200 if ready else 503)
+
+if __name__ == '__main__':
+    app.run(host="0.0.0.0")
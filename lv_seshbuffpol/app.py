@@ -1,9 +1,40 @@
 from flask import Flask, render_template, request, Response, stream_with_context, jsonify
-from text_polish import stream_polish_sentences
-import json
+from polishcore.batch_scheduler import BatchTimeout
+from polishcore.issues import dumps
+from polishcore.metrics import instrument_flask, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
+from session_doc import SessionStore, VersionConflict
 
 app = Flask(__name__)
 
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+text_polish = load_pipeline("text_polish")
+registry = text_polish.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm
+registry.start_warmup()
+instrument_flask(app)
+
+# Concurrent requests (threaded=True) share batched generate calls instead of one sentence each
+GEN_BATCH_WINDOW_MS = 10
+GEN_MAX_BATCH = 16
+text_polish.enable_micro_batching(window_ms=GEN_BATCH_WINDOW_MS, max_batch=GEN_MAX_BATCH)
+
+def wants_timings(payload=None):
+    # Per-stage timings are opt-in: ?timings=1, a timings form field, or "timings": true in JSON
+    value = (payload or {}).get('timings', request.values.get('timings', ''))
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+def json_result(payload):
+    # Polish results hold Issue records; issues.dumps renders them (with orjson when installed)
+    return Response(dumps(payload), mimetype='application/json')
+
+# === Session documents: the editor sends deltas, only changed sentences are re-polished ===
+SESSION_MAX = 256
+SESSION_TTL_SECONDS = 1800
+
+sessions = SessionStore(text_polish.polish_sentences, max_sessions=SESSION_MAX, ttl_seconds=SESSION_TTL_SECONDS)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -13,13 +44,14 @@ def stream():
     user_input = request.form.get('user_text', '')
     if not user_input.strip():
         return Response("No input text provided.", status=400)
+    timings = wants_timings()
 
     def generate():
         try:
-            for detail in stream_polish_sentences(user_input):
-                json_data = json.dumps(detail)
+            for detail in text_polish.stream_polish_sentences(user_input, timings=timings):
+                json_data = dumps(detail)
                 yield f"data: {json_data}\n\n"
-        except ValueError as e:
+        except (ValueError, BatchTimeout) as e:
             yield f"data: error|{str(e)}\n\n"
 
     return Response(stream_with_context(generate()), mimetype='text/event-stream')
@@ -34,16 +66,79 @@ def auto_polish():
             return jsonify({"error": "No sentence provided"}), 400
 
         # Use only the first polished result
-        results = list(stream_polish_sentences(sentence))
+        results = list(text_polish.stream_polish_sentences(sentence, timings=wants_timings(data)))
         if not results:
             return jsonify({"error": "No polishing result returned"}), 500
 
-        return jsonify(results[0])
+        return json_result(results[0])
 
+    except BatchTimeout as e:
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/session', methods=['POST'])
+def create_session():
+    session = sessions.create()
+    return jsonify({"session_id": session.id, "version": session.version}), 201
+
+
+@app.route('/session/<session_id>', methods=['GET', 'DELETE'])
+def session_state(session_id):
+    if request.method == 'DELETE':
+        return ('', 204) if sessions.delete(session_id) else (jsonify({"error": "Unknown or expired session"}), 404)
+
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+    return json_result(session.snapshot())
+
+
+@app.route('/session/<session_id>/edit', methods=['POST'])
+def session_edit(session_id):
+    # {"version": n, "edits": [{"start", "end", "text"}, ...]} or {"text": "..."} to resync
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        return json_result(session.apply(edits=data.get('edits'), text=data.get('text'),
+                                         base_version=data.get('version')))
+    except VersionConflict as e:
+        return jsonify({"error": str(e), "version": e.version}), 409
+    except BatchTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid edit: {e}"}), 400
+
+
+@app.route('/cache-stats')
+def cache_stats_route():
+    return jsonify(text_polish.cache_stats())
+
+@app.route('/tier-stats')
+def tier_stats_route():
+    return jsonify(text_polish.tier_stats())
+
+@app.route('/host-stats')
+def host_stats_route():
+    return jsonify(host_stats(text_polish))
+
+@app.route('/metrics')
+def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    ready = registry.is_ready()
+    return jsonify({"ready": ready, "components": registry.status()}), (200 if ready else 503)
+
 if __name__ == '__main__':
     app.run(host="0.0.0.0", threaded=True)
 
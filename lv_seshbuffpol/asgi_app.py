@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from quart import Quart, render_template, request, Response, jsonify
+from polishcore.batch_scheduler import BatchTimeout
+from polishcore.issues import dumps
+from polishcore.metrics import instrument_asgi, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
+from polishcore.offload import offload_iter, run_blocking
+from session_doc import SessionStore, VersionConflict
+
+# === asyncio/ASGI variant of app.py: same routes, no thread per connection ===
+# Open SSE streams are coroutines; the blocking polish work runs on a bounded pool of
+# POLISH_WORKERS threads, one sentence per job, and stops as soon as the client disconnects.
+# Run with: hypercorn asgi_app:app --bind 0.0.0.0:5000
+
+POLISH_WORKERS = int(os.environ.get("POLISH_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+app = Quart(__name__)
+app.config['RESPONSE_TIMEOUT'] = None  # long documents stream for longer than the 60 s default
+
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+text_polish = load_pipeline("text_polish")
+registry = text_polish.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm
+registry.start_warmup()
+instrument_asgi(app)
+
+executor = ThreadPoolExecutor(max_workers=POLISH_WORKERS, thread_name_prefix="polish")
+
+# Sentences of concurrent requests share batched generate calls instead of one sentence each
+GEN_BATCH_WINDOW_MS = 10
+GEN_MAX_BATCH = 16
+text_polish.enable_micro_batching(window_ms=GEN_BATCH_WINDOW_MS, max_batch=GEN_MAX_BATCH)
+
+async def wants_timings(payload=None):
+    # Per-stage timings are opt-in: ?timings=1, a timings form field, or "timings": true in JSON
+    value = (payload or {}).get('timings', (await request.values).get('timings', ''))
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+def json_result(payload):
+    # Polish results hold Issue records; issues.dumps renders them (with orjson when installed)
+    return Response(dumps(payload), mimetype='application/json')
+
+# === Session documents: the editor sends deltas, only changed sentences are re-polished ===
+SESSION_MAX = 256
+SESSION_TTL_SECONDS = 1800
+
+# Sessions are polished inside one executor job, so the pipelined executor's extra threads are skipped
+sessions = SessionStore(partial(text_polish.polish_sentences, pipelined=False),
+                        max_sessions=SESSION_MAX, ttl_seconds=SESSION_TTL_SECONDS)
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+@app.route('/stream', methods=['POST'])
+async def stream():
+    user_input = (await request.form).get('user_text', '')
+    if not user_input.strip():
+        return Response("No input text provided.", status=400)
+    timings = await wants_timings()
+
+    async def generate():
+        # One executor job per sentence; a disconnect cancels this generator between (or during) them
+        sentences = text_polish.stream_polish_sentences(user_input, pipelined=False, timings=timings)
+        try:
+            async for detail in offload_iter(sentences, executor):
+                json_data = dumps(detail)
+                yield f"data: {json_data}\n\n"
+        except (ValueError, BatchTimeout) as e:
+            yield f"data: error|{str(e)}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream')
+
+
+@app.route('/auto-polish', methods=['POST'])
+async def auto_polish():
+    try:
+        data = await request.get_json()
+        sentence = data.get('sentence', '').strip()
+        if not sentence:
+            return jsonify({"error": "No sentence provided"}), 400
+
+        # Use only the first polished result
+        timings = await wants_timings(data)
+        results = await run_blocking(executor, lambda: list(
+            text_polish.stream_polish_sentences(sentence, pipelined=False, timings=timings)))
+        if not results:
+            return jsonify({"error": "No polishing result returned"}), 500
+
+        return json_result(results[0])
+
+    except BatchTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/session', methods=['POST'])
+async def create_session():
+    session = sessions.create()
+    return jsonify({"session_id": session.id, "version": session.version}), 201
+
+
+@app.route('/session/<session_id>', methods=['GET', 'DELETE'])
+async def session_state(session_id):
+    if request.method == 'DELETE':
+        return ('', 204) if sessions.delete(session_id) else (jsonify({"error": "Unknown or expired session"}), 404)
+
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+    return json_result(session.snapshot())
+
+
+@app.route('/session/<session_id>/edit', methods=['POST'])
+async def session_edit(session_id):
+    # {"version": n, "edits": [{"start", "end", "text"}, ...]} or {"text": "..."} to resync
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+
+    data = await request.get_json(silent=True) or {}
+    try:
+        return json_result(await run_blocking(executor, partial(session.apply, edits=data.get('edits'),
+                                                                text=data.get('text'),
+                                                                base_version=data.get('version'))))
+    except VersionConflict as e:
+        return jsonify({"error": str(e), "version": e.version}), 409
+    except BatchTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid edit: {e}"}), 400
+
+
+@app.route('/cache-stats')
+async def cache_stats_route():
+    return jsonify(await run_blocking(executor, text_polish.cache_stats))
+
+@app.route('/tier-stats')
+async def tier_stats_route():
+    return jsonify(await run_blocking(executor, text_polish.tier_stats))
+
+@app.route('/host-stats')
+async def host_stats_route():
+    return jsonify(await run_blocking(executor, host_stats, text_polish))
+
+@app.route('/metrics')
+async def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+async def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+async def readyz():
+    # With model hosts these are calls to the host processes, so they run off the event loop too
+    ready, components = await run_blocking(executor, lambda: (registry.is_ready(), registry.status()))
+    return jsonify({"ready": ready, "components": components}), (200 if ready else 503)
+
+if __name__ == '__main__':
+    app.run(host="0.0.0.0")
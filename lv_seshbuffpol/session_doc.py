@@ -0,0 +1,176 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from polishcore.segmenter import IncrementalSegmenter, sentence_spans
+
+# === Server-side session documents for live polishing ===
+# The browser sends edit deltas against the last version it saw; the server applies them,
+# re-segments the changed part of the text and keeps one result per sentence. Sentences whose text is unchanged
+# keep their previous result, so only new/edited sentences go through the polisher, and the
+# reply is a splice patch over the previous sentence list instead of the whole document.
+# The trailing sentence stays "pending" (not polished) until it ends in . ! or ?.
+
+SENTENCE_END = ('.', '!', '?')
+CLOSING_CHARS = '"\')]'
+
+
+class VersionConflict(Exception):
+    def __init__(self, version: int):
+        super().__init__(f"Session is at version {version}")
+        self.version = version
+
+
+def apply_edit(text: str, edit: Dict[str, object]) -> str:
+    # {"start": i, "end": j, "text": "..."} replaces text[i:j]; offsets refer to the text so far
+    start, end = int(edit['start']), int(edit.get('end', edit['start']))
+    if not 0 <= start <= end <= len(text):
+        raise ValueError(f"Edit range {start}:{end} is outside the document (length {len(text)})")
+    return text[:start] + str(edit.get('text', '')) + text[end:]
+
+
+def _is_complete(sentence: str) -> bool:
+    return sentence.rstrip(CLOSING_CHARS).endswith(SENTENCE_END)
+
+
+def _pending_entry(sentence: str) -> Dict[str, object]:
+    return {"original": sentence, "polished": None, "issues": [], "token_count": None, "pending": True}
+
+
+class SessionDocument:
+    def __init__(self, session_id: str, polish: Callable[[List[str]], Iterable[Dict[str, object]]]):
+        # polish(sentences) yields one result dict per sentence, in order
+        self.id = session_id
+        self.text = ""
+        self.version = 0
+        self.sentences = []
+        # Sentences whose end is confirmed, and the segmenter holding the unconfirmed text after them
+        self._confirmed = []
+        self._segmenter = IncrementalSegmenter()
+        self.touched = time.time()
+        self._polish = polish
+        self._lock = threading.Lock()
+
+    def apply(self, edits: Optional[List[Dict[str, object]]] = None, text: Optional[str] = None,
+              base_version: Optional[int] = None) -> Dict[str, object]:
+        # Either edit deltas against base_version, or a full-text replacement (initial load / resync)
+        with self._lock:
+            self.touched = time.time()
+            if text is None and base_version is not None and base_version != self.version:
+                raise VersionConflict(self.version)
+
+            new_text = self.text if text is None else text
+            changed_from = 0 if text is not None else len(new_text)
+            for edit in edits or []:
+                new_text = apply_edit(new_text, edit)
+                changed_from = min(changed_from, int(edit['start']))
+            return self._update(new_text, changed_from)
+
+    def _segment(self, new_text: str, changed_from: int) -> List[str]:
+        # A boundary only depends on the text in front of it, so the confirmed sentences stay valid
+        # while edits stay inside the unconfirmed tail (typing, backspace at the end): only the edit
+        # goes through the segmenter. An edit further up re-segments the document
+        if changed_from < len(self.text) - len(self._segmenter.pending):
+            self._segmenter.reset()
+            self._confirmed = []
+            changed_from = 0
+        else:
+            self._segmenter.delete(len(self.text) - changed_from)
+        self._confirmed.extend(self._segmenter.append(new_text[changed_from:]))
+        pending = self._segmenter.pending
+        return self._confirmed + [pending[start:end] for start, end in sentence_spans(pending)]
+
+    def _update(self, new_text: str, changed_from: int) -> Dict[str, object]:
+        texts = self._segment(new_text, changed_from)
+
+        trailing = texts[-1] if texts and not _is_complete(texts[-1]) else None
+        known = {entry['original']: entry for entry in self.sentences if not entry['pending']}
+        changed = [sentence for sentence in dict.fromkeys(texts) if sentence not in known and sentence != trailing]
+        try:
+            for sentence, result in zip(changed, self._polish(changed) if changed else []):
+                known[sentence] = {
+                    "original": sentence,
+                    "polished": result['polished'],
+                    "issues": result['issues'],
+                    "token_count": result['token_count'],
+                    "pending": False
+                }
+        except BaseException:
+            # The edit is not applied, so the segmenter goes back to the current text
+            self._segmenter.reset()
+            self._confirmed = self._segmenter.append(self.text)
+            raise
+
+        new_sentences = [known.get(sentence) or _pending_entry(sentence) for sentence in texts]
+        patch = self._patch(self.sentences, new_sentences)
+        self.text, self.sentences = new_text, new_sentences
+        self.version += 1
+
+        return {
+            "session_id": self.id,
+            "version": self.version,
+            "patch": patch,
+            "sentence_count": len(new_sentences),
+            "polished_sentences": len(changed)
+        }
+
+    @staticmethod
+    def _patch(old: List[Dict[str, object]], new: List[Dict[str, object]]) -> Dict[str, object]:
+        # One splice: keep the common prefix/suffix, replace what lies between
+        prefix = 0
+        while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        return {"index": prefix, "delete": len(old) - prefix - suffix, "insert": new[prefix:len(new) - suffix]}
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {"session_id": self.id, "version": self.version, "text": self.text,
+                    "sentences": list(self.sentences)}
+
+
+class SessionStore:
+    def __init__(self, polish: Callable[[List[str]], Iterable[Dict[str, object]]],
+                 max_sessions: int = 256, ttl_seconds: int = 1800):
+        self._polish = polish
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self) -> SessionDocument:
+        session = SessionDocument(uuid.uuid4().hex, self._polish)
+        with self._lock:
+            self._evict()
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[SessionDocument]:
+        # An idle session past the TTL is gone even if no create() has evicted it yet
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.touched > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            session.touched = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self) -> None:
+        # Idle sessions expire after the TTL; beyond max_sessions the least recently used go first
+        cutoff = time.time() - self.ttl_seconds
+        for session_id in [sid for sid, session in self._sessions.items() if session.touched < cutoff]:
+            del self._sessions[session_id]
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
@@ -1,34 +1,23 @@
-import re
-from typing import List, Dict, Generator
-import language_tool_python
-from language_tool_python.utils import correct
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-import spacy
+from typing import List
+from polishcore.issues import Issue
+from polishcore.polish_engine import PolishEngine
 
-# === Load models and tools ===
+# === Configuration of the polishing engine for this app (see polishcore/polish_engine.py) ===
+# LanguageTool, the spaCy checks below and the seq2seq model; the engine runs them as stages
 model_id = "prithivida/grammar_error_correcter_v1"
-tokenizer = AutoTokenizer.from_pretrained(model_id)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_id)
-corrector = pipeline("text2text-generation", model=model, tokenizer=tokenizer)
-_tool = language_tool_python.LanguageTool('en-US')
-nlp = spacy.load("en_core_web_sm")
-MAX_TOKENS = tokenizer.model_max_length
-
-# === Token count helper ===
-def count_tokens(text: str) -> int:
-    return len(tokenizer.tokenize(text))
-
-# === Spacing cleaner ===
-def clean_spacing(text: str) -> str:
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-    return re.sub(r'\s{2,}', ' ', text).strip()
-
-# === Custom spaCy pattern checker ===
+LT_LANGUAGE = 'en-US'
+SPACY_MODEL = "en_core_web_sm"
+# The detectors read tags, dependencies, lemmas and entity types, so tok2vec/tagger/attribute_ruler/
+# lemmatizer/parser/ner all stay; components they never look at are excluded at load time.
+SPACY_EXCLUDE = ["senter"]
+# Keys the sentence result cache: bump it whenever polishing output changes
+PIPELINE_VERSION = "lt+spacy-rules+gec/6"
+
+# === Custom spaCy pattern checkers (operate on an already parsed Doc) ===
 singular_to_plural_dets = {"this": "these", "that": "those"}
 singular_aux_to_plural = {"is": "are", "was": "were"}
 
-def detect_determiner_verb_noun_mismatch(text: str) -> List[Dict[str, str]]:
-    doc = nlp(text)
+def detect_determiner_verb_noun_mismatch(doc) -> List[Issue]:
     issues = []
 
     for sent in doc.sents:
@@ -39,22 +28,18 @@ def detect_determiner_verb_noun_mismatch(text: str) -> List[Dict[str, str]]:
                 attr = next((child for child in verb.children if child.dep_ == "attr" and child.tag_ == "NNS"), None)
 
                 if subj and attr:
-                    suggestions = [
+                    suggestions = (
                         f"{singular_to_plural_dets[subj.text.lower()].capitalize()} {singular_aux_to_plural[verb.text.lower()]} {attr.text}",
                         f"{subj.text} {verb.text} {attr.lemma_}"
-                    ]
-                    issues.append({
-                        "message": f"Mismatch: singular subject '{subj.text}' with plural noun '{attr.text}' via verb '{verb.text}'.",
-                        "offset": str(subj.idx),
-                        "length": str(len(subj) + len(verb) + len(attr) + 2),
-                        "replacements": ', '.join(suggestions),
-                        "is_pos_issue": 'True'
-                    })
+                    )
+                    issues.append(Issue(
+                        f"Mismatch: singular subject '{subj.text}' with plural noun '{attr.text}' via verb '{verb.text}'.",
+                        subj.idx, len(subj) + len(verb) + len(attr) + 2, suggestions, is_pos_issue=True
+                    ))
 
     return issues
 
-def detect_missing_articles(text: str) -> List[Dict[str, str]]:
-    doc = nlp(text)
+def detect_missing_articles(doc) -> List[Issue]:
     issues = []
 
     for sent in doc.sents:
@@ -66,97 +51,38 @@ def detect_missing_articles(text: str) -> List[Dict[str, str]]:
 
                 if not has_determiner and not is_named_entity and not is_compound_noun:
                     if token.text.lower()[0] in "aeiou":
-                        issues.append({
-                            "message": f"Missing article an/the before noun '{token.text}'",
-                            "offset": str(token.idx),
-                            "length": str(len(token)),
-                            "replacements": "an, the",
-                            "is_pos_issue": 'True'
-                        })
+                        issues.append(Issue(f"Missing article an/the before noun '{token.text}'",
+                                            token.idx, len(token), ("an", "the"), is_pos_issue=True))
                     else:
-                        issues.append({
-                            "message": f"Missing article a/the before noun '{token.text}'",
-                            "offset": str(token.idx),
-                            "length": str(len(token)),
-                            "replacements": "a, the",
-                            "is_pos_issue": 'True'
-                        })
+                        issues.append(Issue(f"Missing article a/the before noun '{token.text}'",
+                                            token.idx, len(token), ("a", "the"), is_pos_issue=True))
 
     return issues
 
-# === Full grammar + polish pipeline ===
-def polish_text(text: str) -> Dict[str, object]:
-    if count_tokens(text) > MAX_TOKENS:
-        raise ValueError(f"Input text exceeds max token limit of {MAX_TOKENS} tokens.")
-
-    # LanguageTool
-    matches = _tool.check(text)
-    lt_corrected = correct(text, matches) if matches else text
-    lt_issues = [{
-        'message': m.message,
-        'offset': str(m.offset),
-        'length': str(m.errorLength),
-        'replacements': ', '.join(m.replacements),
-        'is_pos_issue': 'False'
-    } for m in matches]
-
-    # Custom spaCy mismatch issues
-    spacy_issues = detect_determiner_verb_noun_mismatch(text) + detect_missing_articles(text)
-
-    all_issues = lt_issues + spacy_issues
-
-    # Generate polished version
-    result = corrector(lt_corrected, max_length=MAX_TOKENS)[0]['generated_text']
-    polished = clean_spacing(result)
-
-    return {
-        "original": text,
-        "polished": polished,
-        "issues": all_issues,
-        "token_count": count_tokens(text)
-    }
-
-# === Sentence splitting ===
-def split_into_sentences(text: str) -> List[str]:
-    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text.strip()) if s.strip()]
-
-# === Streaming polish per sentence ===
-def stream_polish_sentences(input_text: str) -> Generator[Dict[str, object], None, None]:
-    for idx, sentence in enumerate(split_into_sentences(input_text), 1):
-        result = polish_text(sentence)
-        yield {
-            "sentence_number": idx,
-            "original": result['original'],
-            "polished": result['polished'],
-            "issues": result['issues'],
-            "token_count": result['token_count']
-        }
-
-# === Full doc correction ===
-def polish_full_text(input_text: str) -> Dict[str, object]:
-    final_polished_text = ""
-    all_issues = []
-    all_details = []
-
-    for idx, sentence in enumerate(split_into_sentences(input_text), 1):
-        result = polish_text(sentence)
-        final_polished_text += result['polished'] + " "
-        all_issues.extend(result['issues'])
-        all_details.append({
-            "sentence_number": idx,
-            "original": result['original'],
-            "polished": result['polished'],
-            "issues": result['issues'],
-            "token_count": result['token_count']
-        })
-
-    return {
-        "polished_text": final_polished_text.strip(),
-        "details": all_details,
-        "total_tokens": count_tokens(input_text),
-        "total_sentences": len(all_details),
-        "issues": all_issues
-    }
+engine = PolishEngine(model_id, LT_LANGUAGE, PIPELINE_VERSION, spacy_model=SPACY_MODEL, spacy_exclude=SPACY_EXCLUDE,
+                      spacy_checks=[detect_determiner_verb_noun_mismatch, detect_missing_articles])
+registry = engine.registry
+
+# === The engine's entry points and helpers, as this module's functions ===
+polish_text = engine.polish_text
+polish_full_text = engine.polish_full_text
+stream_polish_sentences = engine.stream_polish_sentences
+polish_sentences = engine.polish_sentences
+split_into_sentences = engine.split_into_sentences
+plan_document = engine.plan_document
+parse_sentences = engine.parse_sentences
+detect_spacy_issues = engine.detect_spacy_issues
+check_with_languagetool = engine.check_with_languagetool
+generate_from_ids = engine.generate_from_ids
+generate_batch = engine.generate_batch
+enable_micro_batching = engine.enable_micro_batching
+batching_stats = engine.batching_stats
+cache_stats = engine.cache_stats
+tier_stats = engine.tier_stats
+count_tokens = engine.count_tokens
+clean_spacing = engine.clean_spacing
+max_tokens = engine.max_tokens
+token_budget = engine.token_budget
 
 # === CLI Mode ===
 if __name__ == "__main__":
@@ -172,8 +98,8 @@ if __name__ == "__main__":
             if detail['issues']:
                 print("Issues:")
                 for i, issue in enumerate(detail['issues'], 1):
-                    print(f"  {i}. {issue['message']}")
-                    print(f"     Suggestions: {issue['replacements']}")
+                    print(f"  {i}. {issue.message}")
+                    print(f"     Suggestions: {', '.join(issue.replacements)}")
             else:
                 print("  ✅ No issues found.")
 
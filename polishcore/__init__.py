@@ -0,0 +1,4 @@
+# === Modules shared by every app directory ===
+# Each app (grammarapp, livepolishing, ...) keeps only its own configuration and routes and
+# imports the shared engine and infrastructure from here: `pip install -e .` at the repository
+# root, then run the app from its own directory as before.
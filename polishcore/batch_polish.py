@@ -0,0 +1,283 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from multiprocessing.util import Finalize
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from .issues import dumps
+from .model_host import RemotePipeline, load_pipeline
+
+# === Offline batch polishing of whole corpora, resumable ===
+# Inputs are .txt files (one item each), .docx files (one item per non-empty paragraph), .jsonl
+# files (one item per line: a string, or an object with a "text" and optionally an "id" field) and
+# directories, searched recursively for all three. Items go to a pool of worker processes, each of
+# which imports the pipeline module (or connects to POLISH_MODEL_HOSTS, see model_host.py) and
+# warms its models once. Every result is appended to the output JSONL as soon as it arrives, in
+# completion order: {"id", "source", "result", "seconds"}, or {"id", "source", "error"}. Items are
+# read only a few per worker ahead of the results, so a huge corpus is never queued in memory.
+# Ids and sources use the input path relative to the working directory, however it was given.
+# The output doubles as the checkpoint: a rerun with the same inputs skips every id that already
+# has a result there, so a killed job picks up where it stopped (failed items are retried). The
+# exit status is 1 if any item failed.
+# Progress goes to stderr: items and characters done, throughput and an ETA by characters left.
+#
+# Run it from an app directory, whose pipeline module is the default:
+#
+#   python -m polishcore.batch_polish archive/ notes.jsonl report.docx --output polished.jsonl --workers 4
+
+BATCH_WORKERS = int(os.environ.get("POLISH_BATCH_WORKERS", "2"))
+ITEMS_AHEAD_PER_WORKER = 4  # items handed to the pool ahead of the results written so far
+PROGRESS_SECONDS = 5.0
+INPUT_SUFFIXES = (".txt", ".docx", ".jsonl")
+# Function called per item when --function isn't given, by pipeline module
+DEFAULT_FUNCTIONS = {"text_polish": "polish_full_text", "text_processor": "polish_text"}
+DEFAULT_MODULE = next((name for name in DEFAULT_FUNCTIONS if os.path.exists(name + ".py")), None)
+
+Item = Tuple[str, str, str]  # (id, source path, text)
+
+
+# === Inputs ===
+def input_files(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, files in os.walk(path):
+                subdirectories.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(INPUT_SUFFIXES):
+                        yield os.path.join(directory, name)
+        elif path.lower().endswith(INPUT_SUFFIXES):
+            yield path
+        else:
+            raise ValueError(f"Unsupported input {path} (expected a directory or {', '.join(INPUT_SUFFIXES)})")
+
+
+def _normalize(path: str) -> str:
+    # "./a.jsonl", "a.jsonl" and "/cwd/a.jsonl" name the same items, so a rerun finds them
+    try:
+        return os.path.relpath(path)
+    except ValueError:  # another drive than the working directory (Windows)
+        return os.path.abspath(path)
+
+
+def read_items(path: str) -> Iterator[Item]:
+    suffix = os.path.splitext(path)[1].lower()
+    path = _normalize(path)
+    if suffix == ".txt":
+        with open(path, encoding="utf-8") as f:
+            yield path, path, f.read()
+    elif suffix == ".docx":
+        from docx import Document
+        for number, paragraph in enumerate(Document(path).paragraphs, 1):
+            if paragraph.text.strip():
+                yield f"{path}#p{number}", path, paragraph.text
+    else:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: {e}") from e
+                if isinstance(record, str):
+                    yield f"{path}:{number}", path, record
+                else:
+                    yield str(record.get("id", f"{path}:{number}")), path, record["text"]
+
+
+def iter_items(paths: Iterable[str], skip: Set[str]) -> Iterator[Item]:
+    for path in input_files(paths):
+        for item in read_items(path):
+            if item[0] not in skip:
+                yield item
+
+
+def _bounded(items: Iterable[Item], slots: threading.Semaphore, stopped: threading.Event) -> Iterator[Item]:
+    # Runs in the pool's task-feeding thread: each item waits for a slot, which the parent frees as
+    # it writes a result, so only a window of items is read ahead
+    for item in items:
+        while not slots.acquire(timeout=0.1):
+            if stopped.is_set():
+                return
+        yield item
+
+
+# === Output / checkpoint ===
+def finished_ids(output_path: str) -> Set[str]:
+    # Ids with a result in an earlier run's output; a line cut off by a kill is dropped from the file
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            f.truncate(complete)
+    done = set()
+    for line in data[:complete].decode("utf-8").splitlines():
+        record = json.loads(line)
+        if "result" in record:
+            done.add(record["id"])
+    return done
+
+
+# === Worker processes: the pipeline is loaded once per process ===
+_function = None
+_setup_error = None
+
+
+def _init_worker(module_name: str, function_name: str) -> None:
+    # A failing pool initializer is retried in a fresh process forever, so failures are kept and
+    # reported as each item's error instead
+    global _function, _setup_error
+    try:
+        pipeline = load_pipeline(module_name)
+        pipeline.registry.warm_up()
+        _function = getattr(pipeline, function_name)
+    except Exception as e:
+        _setup_error = f"Loading {module_name}.{function_name} failed: {type(e).__name__}: {e}"
+        return
+    if not isinstance(pipeline, RemotePipeline) and "languagetool" in pipeline.registry.status():
+        # Pool workers exit without running atexit hooks, so their LanguageTool servers are stopped here
+        close = getattr(pipeline.registry.get("languagetool"), "close", None)
+        if close is not None:
+            Finalize(None, close, exitpriority=10)
+
+
+def _polish_item(item: Item) -> Tuple[str, int, bool, str]:
+    # Returns (id, characters, succeeded, output line); the line is rendered here, not in the parent
+    item_id, source, text = item
+    start = time.perf_counter()
+    if _setup_error is not None:
+        record = {"id": item_id, "source": source, "error": _setup_error}
+    else:
+        try:
+            record = {"id": item_id, "source": source, "result": _function(text),
+                      "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            record = {"id": item_id, "source": source, "error": f"{type(e).__name__}: {e}"}
+    return item_id, len(text), "result" in record, dumps(record)
+
+
+# === Progress ===
+class Progress:
+    def __init__(self, total_items: int, total_chars: int, interval: float = PROGRESS_SECONDS,
+                 stream=sys.stderr):
+        self.total_items = total_items
+        self.total_chars = total_chars
+        self.interval = interval
+        self.stream = stream
+        self.items = 0
+        self.chars = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._reported = self.started
+
+    def update(self, chars: int, succeeded: bool) -> None:
+        self.items += 1
+        self.chars += chars
+        self.errors += not succeeded
+        now = time.perf_counter()
+        if now - self._reported >= self.interval or self.items == self.total_items:
+            self._reported = now
+            self.report()
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        chars_per_sec = self.chars / elapsed if elapsed else 0.0
+        remaining = self.total_chars - self.chars
+        return {
+            "items": self.items,
+            "total_items": self.total_items,
+            "errors": self.errors,
+            "seconds": round(elapsed, 1),
+            "items_per_sec": round(self.items / elapsed, 2) if elapsed else 0.0,
+            "chars_per_sec": round(chars_per_sec),
+            "eta_seconds": round(remaining / chars_per_sec) if chars_per_sec else None,
+        }
+
+    def report(self) -> None:
+        stats = self.snapshot()
+        eta = stats["eta_seconds"]
+        eta = "?" if eta is None else f"{eta // 3600}:{eta % 3600 // 60:02d}:{eta % 60:02d}"
+        percent = 100 * self.chars / self.total_chars if self.total_chars else 100.0
+        print(f"[batch] {stats['items']}/{stats['total_items']} items ({percent:.1f}%), "
+              f"{stats['errors']} errors, {stats['items_per_sec']} items/s, {stats['chars_per_sec']} chars/s, "
+              f"ETA {eta}",
+              file=self.stream, flush=True)
+
+
+# === Run ===
+def run_batch(paths: List[str], output_path: str, module_name: str = DEFAULT_MODULE,
+              function_name: Optional[str] = None, workers: int = BATCH_WORKERS, overwrite: bool = False,
+              progress_seconds: float = PROGRESS_SECONDS) -> dict:
+    # workers=0 polishes in this process (no pool)
+    function_name = function_name or DEFAULT_FUNCTIONS.get(module_name)
+    if function_name is None:
+        raise ValueError(f"No default function for module {module_name}; pass one with --function")
+    if overwrite and os.path.exists(output_path):
+        os.remove(output_path)
+    done = finished_ids(output_path)
+
+    # A first pass sizes the job for the ETA; the texts are read again as the workers need them
+    total_items = total_chars = 0
+    for _, _, text in iter_items(paths, done):
+        total_items += 1
+        total_chars += len(text)
+    if done:
+        print(f"[batch] resuming: {len(done)} items already in {output_path}", file=sys.stderr)
+    progress = Progress(total_items, total_chars, progress_seconds)
+
+    pool = None
+    slots = threading.Semaphore(workers * ITEMS_AHEAD_PER_WORKER)
+    stopped = threading.Event()
+    if workers > 0:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(module_name, function_name))
+        results = pool.imap_unordered(_polish_item, _bounded(iter_items(paths, done), slots, stopped))
+    else:
+        _init_worker(module_name, function_name)
+        results = map(_polish_item, iter_items(paths, done))
+
+    try:
+        with open(output_path, "a", encoding="utf-8") as output:
+            for _, chars, succeeded, line in results:
+                output.write(line + "\n")
+                output.flush()  # in the OS's hands now: a killed job keeps every finished item
+                progress.update(chars, succeeded)
+                slots.release()
+    except BaseException:
+        stopped.set()  # lets the feeding thread return, so terminate() can join it
+        if pool is not None:
+            pool.terminate()
+        raise
+    if pool is not None:
+        pool.close()  # lets the workers run their finalizers
+        pool.join()
+    return dict(progress.snapshot(), resumed=len(done))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Polish directories, .txt/.docx files and JSONL corpora "
+                                                 "into a JSONL file, resuming where an earlier run stopped.")
+    parser.add_argument("inputs", nargs="+", help="directories, .txt, .docx or .jsonl files")
+    parser.add_argument("--output", "-o", required=True, help="JSONL results; also the resume checkpoint")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="pipeline module, e.g. text_polish")
+    parser.add_argument("--function", help="called with each text (default: polish_full_text / polish_text)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="worker processes (0: in-process)")
+    parser.add_argument("--overwrite", action="store_true", help="start over instead of resuming")
+    parser.add_argument("--progress-seconds", type=float, default=PROGRESS_SECONDS)
+    args = parser.parse_args()
+    if args.function is None and args.module not in DEFAULT_FUNCTIONS:
+        parser.error(f"--function is required for module {args.module}")
+    # Run the importable copy of this module, so the pool pickles its worker functions by that name
+    from polishcore import batch_polish
+    try:
+        summary = batch_polish.run_batch(args.inputs, args.output, args.module, args.function, args.workers,
+                            args.overwrite, args.progress_seconds)
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(summary), file=sys.stderr)
+    sys.exit(1 if summary["errors"] else 0)
@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .metrics import counter, histogram
+
+# === Dynamic micro-batching in front of the model ===
+# Concurrent request threads submit their items and block; one scheduler thread takes the
+# first waiting request, keeps collecting for up to window_ms (or until max_batch items),
+# runs everything as a single batched call and hands each request its slice of the results.
+# Requests that time out while queued are dropped before their batch runs.
+
+BATCH_SIZE = histogram("polish_batch_size", "Items per micro-batched generate call.", buckets=(1, 2, 4, 8, 16, 32, 64))
+BATCH_WAIT_SECONDS = histogram("polish_batch_wait_seconds", "Time a request waited for its micro-batch to start.")
+BATCH_TIMEOUTS = counter("polish_batch_timeouts_total", "Requests that gave up waiting for a micro-batch.")
+
+_STOP = object()
+
+
+class BatchTimeout(TimeoutError):
+    pass
+
+
+class _Request:
+    __slots__ = ('items', 'results', 'error', 'done', 'cancelled', 'enqueued')
+
+    def __init__(self, items: List[object]):
+        self.items = items
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+        self.cancelled = False
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    def __init__(self, run_batch: Callable[[List[object]], List[object]], window_ms: float = 10.0,
+                 max_batch: int = 16, name: str = "micro-batcher"):
+        # run_batch(items) must return one result per item, in order
+        self._run_batch = run_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._carry = None
+        self._stats = {'batches': 0, 'items': 0, 'timeouts': 0}
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit_many(self, items: List[object], timeout: Optional[float] = None) -> List[object]:
+        if not items:
+            return []
+        request = _Request(list(items))
+        self._queue.put(request)
+
+        if not request.done.wait(timeout):
+            request.cancelled = True
+            BATCH_TIMEOUTS.inc()
+            with self._stats_lock:
+                self._stats['timeouts'] += 1
+            raise BatchTimeout(f"No result within {timeout:g}s ({self._queue.qsize()} requests queued)")
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def submit(self, item: object, timeout: Optional[float] = None) -> object:
+        return self.submit_many([item], timeout)[0]
+
+    def _next_request(self, timeout: Optional[float] = None) -> object:
+        if self._carry is not None:
+            request, self._carry = self._carry, None
+            return request
+        return self._queue.get(timeout=timeout) if timeout is not None else self._queue.get()
+
+    def _collect(self) -> Optional[List[_Request]]:
+        first = self._next_request()
+        if first is _STOP:
+            return None
+        batch = [first]
+        size = len(first.items)
+        deadline = time.perf_counter() + self.window
+
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._next_request(remaining)
+            except queue.Empty:
+                break
+            if request is _STOP or size + len(request.items) > self.max_batch:
+                self._carry = request  # starts the next batch (or stops the loop after this one)
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            live = [request for request in batch if not request.cancelled]
+            if not live:
+                continue
+            items = [item for request in live for item in request.items]
+            started = time.perf_counter()
+            BATCH_SIZE.observe(len(items))
+            for request in live:
+                BATCH_WAIT_SECONDS.observe(started - request.enqueued)
+            with self._stats_lock:
+                self._stats['batches'] += 1
+                self._stats['items'] += len(items)
+
+            try:
+                results = self._run_batch(items)
+            except Exception as e:
+                for request in live:
+                    request.error = e
+                    request.done.set()
+                continue
+
+            position = 0
+            for request in live:
+                request.results = results[position:position + len(request.items)]
+                position += len(request.items)
+                request.done.set()
+
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['mean_batch_size'] = round(stats['items'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
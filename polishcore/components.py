@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# === Lazily loaded model/tool registry with background warm-up ===
+# Modules register a loader (and optionally a warm-up call) per backend instead of
+# loading at import time. get() loads on first use; start_warmup() loads everything
+# in a daemon thread and runs a dummy sentence through each backend so the first
+# real request does not pay JIT/graph/JVM start-up costs.
+
+WARMUP_SENTENCE = "This are a short sentence for warm up."
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentRegistry:
+    def __init__(self):
+        self._specs = {}
+        self._instances = {}
+        self._state = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        self._warmup_thread = None
+
+    def register(self, name: str, loader: Callable[[], object],
+                 warmup: Optional[Callable[[object], object]] = None) -> None:
+        with self._guard:
+            self._specs[name] = (loader, warmup)
+            self._locks[name] = threading.Lock()
+            self._state[name] = {'loaded': False, 'warm': warmup is None, 'load_seconds': None,
+                                 'warmup_seconds': None, 'error': None}
+
+    def get(self, name: str) -> object:
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._locks[name]:
+            if name not in self._instances:
+                loader, _ = self._specs[name]
+                start = time.perf_counter()
+                try:
+                    instance = loader()
+                except Exception as e:
+                    self._state[name]['error'] = f"{type(e).__name__}: {e}"
+                    raise
+                self._state[name].update(loaded=True, error=None,
+                                         load_seconds=round(time.perf_counter() - start, 3))
+                self._instances[name] = instance
+        return self._instances[name]
+
+    def override(self, name: str, instance: object) -> None:
+        # Swap in a ready-made instance (e.g. a stub backend) without running the loader
+        with self._locks[name]:
+            self._instances[name] = instance
+            self._state[name].update(loaded=True, warm=True, error=None)
+
+    def warm_up(self) -> None:
+        for name, (_, warmup) in list(self._specs.items()):
+            try:
+                instance = self.get(name)
+                if warmup is not None and not self._state[name]['warm']:
+                    start = time.perf_counter()
+                    warmup(instance)
+                    self._state[name].update(warm=True, warmup_seconds=round(time.perf_counter() - start, 3))
+            except Exception as e:
+                self._state[name]['error'] = f"{type(e).__name__}: {e}"
+                logger.warning("Warm-up of '%s' failed: %s", name, e)
+
+    def start_warmup(self) -> threading.Thread:
+        with self._guard:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(target=self.warm_up, name="component-warmup", daemon=True)
+                self._warmup_thread.start()
+        return self._warmup_thread
+
+    def is_ready(self) -> bool:
+        return all(state['loaded'] and state['warm'] for state in self._state.values())
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        return {name: dict(state) for name, state in self._state.items()}
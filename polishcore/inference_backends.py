@@ -0,0 +1,53 @@
+import os
+
+# === Pluggable CPU inference backends for the seq2seq GEC model ===
+# "torch"       - PyTorch fp32 (reference)
+# "torch-int8"  - PyTorch dynamic int8 quantization of the Linear layers
+# "onnx"        - ONNX Runtime encoder/decoder export with KV cache (needs optimum[onnxruntime])
+# Every backend returns an object with a transformers-style generate(input_ids=..., attention_mask=...),
+# so callers don't care which one is active. Pick one with the GEC_BACKEND environment variable.
+
+INFERENCE_BACKENDS = ("torch", "torch-int8", "onnx")
+DEFAULT_BACKEND = os.environ.get("GEC_BACKEND", "torch")
+ONNX_EXPORT_DIR = os.path.expanduser(os.environ.get("GEC_ONNX_DIR", '~/.cache/grammar_polish/onnx'))
+
+
+def _load_torch(model_id):
+    from transformers import AutoModelForSeq2SeqLM
+    return AutoModelForSeq2SeqLM.from_pretrained(model_id).eval()
+
+
+def _load_torch_int8(model_id):
+    import torch
+    model = _load_torch(model_id)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_id):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("The 'onnx' backend needs optimum with onnxruntime: "
+                           "pip install 'optimum[onnxruntime]'") from e
+
+    # Export once (encoder, decoder and decoder-with-past for the KV cache) and reuse the files afterwards
+    export_path = os.path.join(ONNX_EXPORT_DIR, model_id.replace('/', '__'))
+    if os.path.isdir(export_path):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_path, use_cache=True)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True, use_cache=True)
+    model.save_pretrained(export_path)
+    return model
+
+
+_LOADERS = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_model(model_id, backend=DEFAULT_BACKEND):
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {', '.join(INFERENCE_BACKENDS)}")
+    return _LOADERS[backend](model_id)
@@ -0,0 +1,134 @@
+import json
+from collections.abc import Sequence
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# === Issue records and how they go over the wire ===
+# An Issue is one finding (a LanguageTool match or a rule-based POS/spaCy check): a message, a
+# numeric offset and length into the sentence it was found in, the suggested replacements as a
+# tuple and whether a POS rule (rather than LanguageTool) reported it. __slots__ leaves out the
+# per-instance dict; the ints and the shared True/False take less room than the strings they replace.
+# IssueChain shows several issue lists as one sequence without copying them, so a document
+# summary lists every issue while each sentence keeps its own list.
+# dumps() renders results for HTTP/SSE responses and the result cache: with orjson when it is
+# installed, with the json module otherwise, the same compact JSON either way. An issue is an
+# object with the five fields; replacements is an array, offset/length numbers, is_pos_issue a bool.
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Issue:
+    __slots__ = ("message", "offset", "length", "replacements", "is_pos_issue")
+
+    def __init__(self, message: str, offset: int, length: int, replacements: Tuple[str, ...] = (),
+                 is_pos_issue: bool = False):
+        self.message = message
+        self.offset = offset
+        self.length = length
+        self.replacements = replacements
+        self.is_pos_issue = is_pos_issue
+
+    @classmethod
+    def from_match(cls, match, shift: int = 0) -> "Issue":
+        # A LanguageTool match; shift moves it from the checked chunk into its sentence
+        return cls(match.message, match.offset + shift, match.errorLength, tuple(match.replacements))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Issue":
+        return cls(data['message'], data['offset'], data['length'], tuple(data['replacements']),
+                   data['is_pos_issue'])
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'message': self.message,
+            'offset': self.offset,
+            'length': self.length,
+            'replacements': self.replacements,
+            'is_pos_issue': self.is_pos_issue
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Issue):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None  # mutable (offsets are moved into sentence/input coordinates)
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}({self.message!r}, offset={self.offset}, length={self.length}, "
+                f"replacements={self.replacements!r}, is_pos_issue={self.is_pos_issue})")
+
+
+class IssueChain(Sequence):
+    __slots__ = ("_lists",)
+
+    def __init__(self, lists: Iterable[List[Issue]] = ()):
+        # The lists are referenced, not copied; empty ones are left out
+        self._lists = [issues for issues in lists if issues]
+
+    def add(self, issues: List[Issue]) -> None:
+        if issues:
+            self._lists.append(issues)
+
+    def __iter__(self) -> Iterator[Issue]:
+        return chain.from_iterable(self._lists)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._lists))
+
+    def __bool__(self) -> bool:
+        return bool(self._lists)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if index >= 0:
+            for issues in self._lists:
+                if index < len(issues):
+                    return issues[index]
+                index -= len(issues)
+        raise IndexError("IssueChain index out of range")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (IssueChain, list, tuple)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickled lists that are also pickled elsewhere in the same payload (details) stay shared
+        return IssueChain, (self._lists,)
+
+    def __repr__(self) -> str:
+        return f"IssueChain({list(self)!r})"
+
+
+def _default(value: object) -> object:
+    if isinstance(value, Issue):
+        return value.to_dict()
+    if isinstance(value, IssueChain):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: object) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default).decode("utf-8")
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(text: str) -> object:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def load_result(text: str) -> Dict[str, object]:
+    # A result dict rendered by dumps(), with its issues as Issue records again
+    result = loads(text)
+    result['issues'] = [Issue.from_dict(issue) for issue in result.get('issues', ())]
+    return result
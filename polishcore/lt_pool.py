@@ -0,0 +1,234 @@
+import inspect
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+# === Pool of local LanguageTool servers behind one check() ===
+# language_tool_python starts one JVM per LanguageTool() and opens a fresh HTTP connection per
+# check, so concurrent threads queue behind a single server. The pool starts LT_POOL_SIZE servers,
+# each allowed LT_CHECK_THREADS concurrent checks, and talks to them over keep-alive sessions.
+# Every check goes to the least-loaded healthy server (round-robin among ties). A background
+# health check pings each server and restarts a JVM that stops answering or has a check stuck
+# longer than wedge_seconds (kept below the request timeout, which would abort the check first);
+# checks that hit a dead server or time out are retried on another one.
+# The pool exposes check()/close() like LanguageTool, so callers don't know which one they hold.
+
+LT_HOST = os.environ.get("LT_HOST", "127.0.0.1")  # where the pool's servers listen
+LT_POOL_SIZE = int(os.environ.get("LT_POOL_SIZE", "1"))
+LT_CHECK_THREADS = int(os.environ.get("LT_CHECK_THREADS", str(min(4, os.cpu_count() or 1))))
+LT_REQUEST_TIMEOUT_SECONDS = 30
+LT_HEALTH_INTERVAL_SECONDS = 10
+LT_WEDGE_SECONDS = 20
+
+logger = logging.getLogger(__name__)
+
+
+class LanguageToolUnavailable(RuntimeError):
+    pass
+
+
+def _match_factory():
+    from language_tool_python.match import Match
+    # Newer language_tool_python versions also want the checked text
+    if len(inspect.signature(Match.__init__).parameters) > 2:
+        return lambda match, text: Match(match, text)
+    return lambda match, text: Match(match)
+
+
+class _Server:
+    def __init__(self, index: int, language: str, check_threads: int):
+        self.index = index
+        self.language = language
+        self.check_threads = check_threads
+        self.tool = None
+        self.session = None
+        self.check_url = None
+        self.ping_url = None
+        self.healthy = False
+        self.restarting = False
+        self.generation = 0  # bumped on every (re)start
+        self.inflight = {}  # token -> start time
+        self.checks = 0
+        self.failures = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        import language_tool_python
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.tool = language_tool_python.LanguageTool(self.language, host=LT_HOST,
+                                                      config={'maxCheckThreads': self.check_threads})
+        url = f"http://{LT_HOST}:{self.tool.port}/v2/"
+        self.check_url = urljoin(url, 'check')
+        self.ping_url = urljoin(url, 'languages')
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=max(4, self.check_threads * 2)))
+        self.generation += 1
+        self.healthy = True
+
+    def stop(self) -> None:
+        self.healthy = False
+        for resource in (self.session, self.tool):
+            try:
+                if resource is not None:
+                    resource.close()
+            except Exception:
+                pass
+        self.session = self.tool = None
+
+    def check(self, text: str, timeout: float) -> List[dict]:
+        import requests
+
+        session = self.session
+        if session is None:
+            raise requests.ConnectionError(f"LanguageTool server {self.index} is restarting")
+        response = session.post(self.check_url, data={'language': self.language, 'text': text}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()['matches']
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            return self.session.get(self.ping_url, timeout=timeout).ok
+        except Exception:
+            return False
+
+
+class LanguageToolPool:
+    def __init__(self, language: str, size: int = LT_POOL_SIZE, check_threads: int = LT_CHECK_THREADS,
+                 request_timeout: float = LT_REQUEST_TIMEOUT_SECONDS,
+                 health_interval: float = LT_HEALTH_INTERVAL_SECONDS, wedge_seconds: float = LT_WEDGE_SECONDS):
+        self.language = language
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.wedge_seconds = min(wedge_seconds, request_timeout / 2)
+        self._servers = [_Server(i, language, check_threads) for i in range(max(1, size))]
+        self._cond = threading.Condition()
+        self._round_robin = itertools.count()
+        self._closed = threading.Event()
+        self._make_match = _match_factory()
+
+        # JVMs start in parallel; the pool is usable as long as at least one came up
+        errors = []
+
+        def start(server):
+            try:
+                server.start()
+            except Exception as e:
+                errors.append(e)
+
+        starters = [threading.Thread(target=start, args=(server,)) for server in self._servers]
+        for thread in starters:
+            thread.start()
+        for thread in starters:
+            thread.join()
+        if len(errors) == len(self._servers):
+            raise errors[0]
+
+        threading.Thread(target=self._health_loop, name="languagetool-health", daemon=True).start()
+
+    # === Dispatch ===
+    def _acquire(self, exclude: set, deadline: float, token: object) -> _Server:
+        with self._cond:
+            while True:
+                candidates = [s for s in self._servers if s.healthy and s not in exclude]
+                if not candidates and exclude:
+                    candidates = [s for s in self._servers if s.healthy]
+                if candidates:
+                    offset = next(self._round_robin) % len(candidates)
+                    rotated = candidates[offset:] + candidates[:offset]
+                    server = min(rotated, key=lambda server: len(server.inflight))
+                    server.inflight[token] = time.monotonic()
+                    return server
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed.is_set():
+                    raise LanguageToolUnavailable("No healthy LanguageTool server available")
+                self._cond.wait(remaining)
+
+    def check(self, text: str) -> list:
+        import requests
+
+        deadline = time.monotonic() + self.request_timeout
+        tried = set()
+        last_error = None
+
+        for _ in range(len(self._servers) + 1):
+            token = object()
+            server = self._acquire(tried, deadline, token)
+            generation = server.generation
+            try:
+                matches = server.check(text, timeout=max(0.1, deadline - time.monotonic()))
+                with self._cond:
+                    server.checks += 1
+                return [self._make_match(match, text) for match in matches]
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # Dead or wedged JVM: restart it and retry the check elsewhere (or once it is back)
+                with self._cond:
+                    server.failures += 1
+                last_error = e
+                tried.add(server)
+                self._restart(server, generation)
+            finally:
+                with self._cond:
+                    server.inflight.pop(token, None)
+                    self._cond.notify_all()
+
+        raise LanguageToolUnavailable(f"LanguageTool check failed: {last_error}") from last_error
+
+    # === Health checks and restarts ===
+    def _restart(self, server: _Server, generation: Optional[int] = None) -> None:
+        with self._cond:
+            # A failure seen on an older incarnation of the JVM has already been dealt with
+            if server.restarting or self._closed.is_set() or generation not in (None, server.generation):
+                return
+            server.restarting = True
+            server.healthy = False
+        threading.Thread(target=self._do_restart, args=(server,), name=f"languagetool-restart-{server.index}",
+                         daemon=True).start()
+
+    def _do_restart(self, server: _Server) -> None:
+        logger.warning("Restarting LanguageTool server %d", server.index)
+        server.stop()
+        with self._cond:
+            server.inflight.clear()  # checks still running against the old JVM fail and are retried
+        try:
+            server.start()
+            server.restarts += 1
+        except Exception as e:
+            logger.error("LanguageTool server %d failed to restart: %s", server.index, e)  # retried by the health loop
+        with self._cond:
+            server.restarting = False
+            self._cond.notify_all()
+
+    def _health_loop(self) -> None:
+        while not self._closed.wait(self.health_interval):
+            for server in self._servers:
+                if server.restarting:
+                    continue
+                stuck = any(time.monotonic() - started > self.wedge_seconds for started in list(server.inflight.values()))
+                if not server.healthy or stuck or not server.ping(timeout=5):
+                    self._restart(server)
+
+    def stats(self) -> List[Dict[str, object]]:
+        return [{
+            'server': server.index,
+            'url': server.check_url,
+            'healthy': server.healthy,
+            'inflight': len(server.inflight),
+            'checks': server.checks,
+            'failures': server.failures,
+            'restarts': server.restarts
+        } for server in self._servers]
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._cond:
+            self._cond.notify_all()
+        for server in self._servers:
+            server.stop()
+
@@ -0,0 +1,244 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Sequence, Tuple
+
+# === In-process metrics with Prometheus text exposition ===
+# Counters and histograms live in memory and are rendered on demand by the /metrics route,
+# so nothing is exported or aggregated unless something scrapes. Recording is a lock plus a
+# bisect per observation; POLISH_METRICS=0 turns every record call into a no-op.
+# StageTrace times the stages of one polish call: it always feeds the process-wide
+# histograms and can additionally be returned to the caller as an opt-in "timings" payload.
+
+METRICS_ENABLED = os.environ.get("POLISH_METRICS", "1") != "0"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="{}"'.format("+Inf" if bound == float("inf") else _format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {count}"
+
+
+_metrics = []
+
+
+def counter(name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, documentation, labels)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, documentation: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, documentation, labels, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in _metrics for line in metric.render()) + "\n"
+
+
+# === Metrics shared by the polishing modules and the Flask apps ===
+STAGE_SECONDS = histogram("polish_stage_duration_seconds", "Time spent in each polishing stage.", ["stage"])
+STAGE_ERRORS = counter("polish_stage_errors_total", "Exceptions raised inside a polishing stage.", ["stage"])
+QUEUE_WAIT_SECONDS = histogram("polish_queue_wait_seconds", "Time a sentence waited between pipeline stages.")
+SENTENCES = counter("polish_sentences_total", "Sentences (or paragraphs) processed.")
+TOKENS = counter("polish_tokens_total", "Model tokens consumed and generated.", ["direction"])
+
+REQUEST_SECONDS = histogram("http_request_duration_seconds",
+                            "Request latency, including the whole body for streamed responses.", ["route", "method"])
+REQUESTS = counter("http_requests_total", "Requests handled.", ["route", "method", "status"])
+REQUEST_ERRORS = counter("http_request_errors_total", "Requests that ended with a 5xx status.", ["route"])
+
+_COUNTS = {
+    "sentences": (SENTENCES, {}),
+    "tokens_in": (TOKENS, {"direction": "in"}),
+    "tokens_out": (TOKENS, {"direction": "out"}),
+}
+
+
+# === Per-call stage timings ===
+class StageTrace:
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+        self.queue_wait = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            STAGE_ERRORS.inc(stage=name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            STAGE_SECONDS.observe(elapsed, stage=name)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+        metric, labels = _COUNTS[name]
+        metric.inc(amount, **labels)
+
+    def waited(self, seconds: float) -> None:
+        self.queue_wait += seconds
+        QUEUE_WAIT_SECONDS.observe(seconds)
+
+    def merge(self, other: "StageTrace") -> "StageTrace":
+        # Folds another trace into this one without re-recording the process-wide metrics
+        for name, seconds in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        for name, amount in other.counts.items():
+            self.counts[name] = self.counts.get(name, 0) + amount
+        self.queue_wait += other.queue_wait
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "queue_wait_ms": round(self.queue_wait * 1000, 3),
+            "sentences": self.counts.get("sentences", 0),
+            "tokens_in": self.counts.get("tokens_in", 0),
+            "tokens_out": self.counts.get("tokens_out", 0),
+        }
+
+
+# === Flask request instrumentation (flask is imported lazily; CLI modules don't need it) ===
+def instrument_flask(app) -> None:
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("metrics_start", None)
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        if start is None or route == "/metrics":
+            return response
+        method, status = request.method, response.status_code
+
+        def observe():
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=method)
+            REQUESTS.inc(route=route, method=method, status=str(status))
+            if status >= 500:
+                REQUEST_ERRORS.inc(route=route)
+
+        # Runs once the body is fully sent, so streamed (SSE) responses are timed end to end
+        response.call_on_close(observe)
+        return response
+
+
+# === ASGI (Quart) request instrumentation: wraps app.asgi_app, so streams are timed to the last chunk ===
+def instrument_asgi(app) -> None:
+    from werkzeug.exceptions import HTTPException
+
+    inner = app.asgi_app
+    url_map = app.url_map.bind("")
+
+    def route_of(scope) -> str:
+        try:
+            rule, _ = url_map.match(scope["path"], method=scope["method"], return_rule=True)
+            return rule.rule
+        except HTTPException:
+            return "unmatched"
+
+    async def asgi_app(scope, receive, send):
+        if scope["type"] != "http":
+            return await inner(scope, receive, send)
+        route, method = route_of(scope), scope["method"]
+        if route == "/metrics":
+            return await inner(scope, receive, send)
+        start = time.perf_counter()
+        status = 500  # unless the app gets as far as sending a response
+
+        async def send_and_track(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await inner(scope, receive, send_and_track)
+        finally:
+            # Also runs when the client disconnects mid-stream and the request task is cancelled
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=method)
+            REQUESTS.inc(route=route, method=method, status=str(status))
+            if status >= 500:
+                REQUEST_ERRORS.inc(route=route)
+
+    app.asgi_app = asgi_app
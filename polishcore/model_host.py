@@ -0,0 +1,443 @@
+import argparse
+import importlib
+import inspect
+import itertools
+import os
+import pickle
+import secrets
+import threading
+import time
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# === Shared model host: lightweight HTTP workers, one process holding the weights ===
+# Run several HTTP worker processes (gunicorn -w N) and each one would load its own seq2seq model,
+# LanguageTool JVM and spaCy pipeline. In host mode the workers only run the web app: every call
+# into the pipeline module goes over local IPC (multiprocessing.connection, TCP or a Unix socket)
+# to one of the model hosts listed in POLISH_MODEL_HOSTS, which import that module once and serve
+# all workers. Calls go to the host with the fewest in-flight calls from this worker.
+# Generators (streams) come back item by item; if the worker stops reading, its connection is
+# dropped and the host closes the generator at the next item. Callables passed as arguments
+# (progress callbacks) are called back in the worker. Return values that can't cross processes
+# (threads, batchers) come back as None.
+#
+# Start a host from the app directory (so the pipeline module is importable), then point the workers at it:
+#   python -m polishcore.model_host --module text_polish --address 127.0.0.1:6001
+#   POLISH_MODEL_HOSTS=127.0.0.1:6001 gunicorn -w 4 app:app
+#
+# Connections are authenticated with POLISH_HOST_AUTHKEY. Without it, a host writes a random key
+# to POLISH_HOST_AUTHKEY_FILE (mode 0600) on first start and workers running as the same user read
+# it from there; neither side starts without a key, and a key file others can read is refused.
+# A host only runs the calls in HOST_CALLS (plus any --allow NAME), never arbitrary attributes.
+
+MODEL_HOSTS = [address.strip() for address in os.environ.get("POLISH_MODEL_HOSTS", "").split(",") if address.strip()]
+HOST_AUTHKEY_FILE = os.environ.get("POLISH_HOST_AUTHKEY_FILE",
+                                   os.path.join(os.path.expanduser("~"), ".polish_host_authkey"))
+HOST_WORKERS = int(os.environ.get("POLISH_HOST_WORKERS", str(min(8, os.cpu_count() or 1))))
+HOST_BACKLOG = 128  # pending connects; Listener's default of 1 stalls bursts of new worker connections
+HOST_STATS = "__stats__"
+# Everything the apps and batch_polish call on a hosted pipeline module
+HOST_CALLS = frozenset({
+    "polish_text", "polish_full_text", "polish_sentences", "stream_polish_sentences",
+    "process_docx_paragraphs", "enable_micro_batching", "cache_stats", "tier_stats",
+    "registry.start_warmup", "registry.warm_up", "registry.is_ready", "registry.status",
+})
+
+_END = object()
+
+
+class HostUnavailable(RuntimeError):
+    pass
+
+
+class HostAuthkeyError(RuntimeError):
+    pass
+
+
+class _Disconnected(Exception):
+    pass
+
+
+class _Callback:
+    # Stands in for a callable argument on the wire
+    def __init__(self, index: int):
+        self.index = index
+
+
+def _parse_address(address: str):
+    # "host:port" for TCP, anything else is a Unix socket path
+    host, sep, port = address.rpartition(":")
+    return (host, int(port)) if sep and port.isdigit() else address
+
+
+def host_authkey(create: bool = False) -> bytes:
+    # POLISH_HOST_AUTHKEY, else the key file; a host (create=True) writes a random key if it's missing
+    key = os.environ.get("POLISH_HOST_AUTHKEY", "")
+    if key:
+        return key.encode()
+    path = HOST_AUTHKEY_FILE
+    if create:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # an earlier (or concurrently starting) host wrote it
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+            print(f"🔑 Wrote a new model host key to {path}")
+    try:
+        if os.stat(path).st_mode & 0o077:
+            raise HostAuthkeyError(f"{path} is readable by other users; chmod 600 it")
+        with open(path) as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        raise HostAuthkeyError("No model host key: set POLISH_HOST_AUTHKEY or start a model host "
+                               f"first so that it writes {path}") from None
+    if not key:
+        raise HostAuthkeyError(f"{path} is empty")
+    return key.encode()
+
+
+def _send(conn, message: tuple) -> None:
+    try:
+        conn.send(message)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        # Pickling fails before anything is written, so the connection is still usable: an error
+        # goes out as its repr, anything else fails the call and _handle sends that error instead
+        kind = message[0]
+        if kind != "error":
+            raise pickle.PicklingError(f"Cannot send the {kind} to the worker: {e}") from e
+        conn.send(("error", RuntimeError(repr(message[1]))))
+    except (OSError, EOFError) as e:
+        raise _Disconnected() from e
+
+
+# === Host process ===
+class ModelHost:
+    def __init__(self, module_name: str, address: str, workers: int = HOST_WORKERS,
+                 authkey: Optional[bytes] = None, calls: Iterable[str] = HOST_CALLS):
+        self.authkey = authkey or host_authkey(create=True)
+        self.module = importlib.import_module(module_name)
+        self.address = address
+        self.workers = workers
+        self.calls = frozenset(calls)
+        self._slots = threading.Semaphore(workers)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._stats = {'connections': 0, 'queued': 0, 'busy': 0, 'calls': 0, 'errors': 0, 'busy_seconds': 0.0}
+
+    def serve_forever(self) -> None:
+        registry = getattr(self.module, "registry", None)
+        if registry is not None:
+            registry.start_warmup()
+
+        with Listener(_parse_address(self.address), authkey=self.authkey, backlog=HOST_BACKLOG) as listener:
+            print(f"🚀 Model host for {self.module.__name__} on {self.address} ({self.workers} workers)")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError, EOFError) as e:
+                    print(f"⚠️ Rejected model host connection: {e}")
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), name="model-host-conn", daemon=True).start()
+
+    def _run(self, fn, *args):
+        # At most `workers` calls run at once; the rest wait for a slot (the host's queue depth)
+        with self._lock:
+            self._stats['queued'] += 1
+        self._slots.acquire()
+        start = time.perf_counter()
+        with self._lock:
+            self._stats['queued'] -= 1
+            self._stats['busy'] += 1
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._stats['busy'] -= 1
+                self._stats['busy_seconds'] += time.perf_counter() - start
+
+    def _serve(self, conn) -> None:
+        with self._lock:
+            self._stats['connections'] += 1
+        try:
+            while True:
+                try:
+                    name, args, kwargs = conn.recv()
+                except (OSError, EOFError):
+                    return
+                self._handle(conn, name, args, kwargs)
+        except _Disconnected:
+            pass  # the worker went away mid-reply
+        finally:
+            conn.close()
+            with self._lock:
+                self._stats['connections'] -= 1
+
+    def _resolve(self, name: str):
+        if name not in self.calls:
+            raise AttributeError(f"{name} is not served by this model host")
+        target = self.module
+        for part in name.split("."):
+            target = getattr(target, part)
+        return target
+
+    def _handle(self, conn, name: str, args: tuple, kwargs: dict) -> None:
+        if name == HOST_STATS:
+            _send(conn, ("value", self.stats()))
+            return
+        with self._lock:
+            self._stats['calls'] += 1
+
+        send_lock = threading.Lock()  # callbacks may fire from the pipeline's own worker threads
+
+        def unwrap(value):
+            if isinstance(value, _Callback):
+                def callback(*a, **k):
+                    with send_lock:
+                        _send(conn, ("callback", value.index, a, k))
+                return callback
+            return value
+
+        args = [unwrap(value) for value in args]
+        kwargs = {key: unwrap(value) for key, value in kwargs.items()}
+        try:
+            fn = self._resolve(name)
+            result = self._run(lambda: fn(*args, **kwargs))
+            if not inspect.isgenerator(result):
+                _send(conn, ("value", result))
+                return
+
+            # One worker slot per item, so a long stream doesn't hold a slot while the client reads
+            _send(conn, ("stream", None))
+            try:
+                while True:
+                    item = self._run(next, result, _END)
+                    if item is _END:
+                        break
+                    _send(conn, ("item", item))
+            finally:
+                result.close()
+            _send(conn, ("end", None))
+        except _Disconnected:
+            raise
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            _send(conn, ("error", e))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+        uptime = time.monotonic() - self._started
+        stats.update({
+            'module': self.module.__name__,
+            'address': self.address,
+            'pid': os.getpid(),
+            'workers': self.workers,
+            'uptime_seconds': round(uptime, 1),
+            'busy_seconds': round(stats['busy_seconds'], 3),
+            'utilization': round(stats['busy_seconds'] / (uptime * self.workers), 4) if uptime else 0.0,
+        })
+        return stats
+
+
+# === Worker side ===
+class _HostSlot:
+    def __init__(self, address: str):
+        self.address = address
+        self.idle = []  # open connections not in use
+        self.inflight = 0
+
+
+class HostClient:
+    def __init__(self, addresses: List[str], authkey: Optional[bytes] = None):
+        if not addresses:
+            raise ValueError("No model host addresses given")
+        self.authkey = authkey or host_authkey()
+        self._hosts = [_HostSlot(address) for address in addresses]
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+
+    def _checkout(self, reuse: bool = True):
+        # Least in-flight host first (round-robin among ties); unreachable hosts are skipped.
+        # Returns (host, connection, whether it is a reused idle one)
+        with self._lock:
+            offset = next(self._round_robin) % len(self._hosts)
+            ordered = sorted(self._hosts[offset:] + self._hosts[:offset], key=lambda host: host.inflight)
+
+        last_error = None
+        for host in ordered:
+            with self._lock:
+                host.inflight += 1
+                conn = host.idle.pop() if reuse and host.idle else None
+            if conn is not None:
+                return host, conn, True
+            try:
+                return host, Client(_parse_address(host.address), authkey=self.authkey), False
+            except (OSError, EOFError, AuthenticationError) as e:
+                last_error = e
+                with self._lock:
+                    host.inflight -= 1
+        raise HostUnavailable(f"No model host reachable: {last_error}") from last_error
+
+    def _checkin(self, host: _HostSlot, conn, reusable: bool) -> None:
+        with self._lock:
+            host.inflight -= 1
+            if reusable:
+                host.idle.append(conn)
+                return
+        conn.close()
+
+    def _drop_idle(self, host: _HostSlot) -> None:
+        # The host went away since these were opened (e.g. it restarted)
+        with self._lock:
+            idle, host.idle = host.idle, []
+        for conn in idle:
+            conn.close()
+
+    @staticmethod
+    def _reply(conn, callbacks: List, message: Optional[tuple] = None) -> tuple:
+        while True:
+            if message is None:
+                message = conn.recv()
+            if message[0] != "callback":
+                return message
+            _, index, args, kwargs = message
+            callbacks[index](*args, **kwargs)
+            message = None
+
+    def _send_request(self, request: tuple) -> Tuple[_HostSlot, object, tuple]:
+        # Sends the call and reads the first reply. A reused idle connection the host has closed
+        # fails right here, before any callback ran, so the call is sent once more on a new one
+        for reuse in (True, False):
+            host, conn, reused = self._checkout(reuse)
+            try:
+                conn.send(request)
+                return host, conn, conn.recv()
+            except (OSError, EOFError):
+                self._checkin(host, conn, reusable=False)
+                if not reused:
+                    raise
+                self._drop_idle(host)
+            except BaseException:
+                self._checkin(host, conn, reusable=False)
+                raise
+
+    def call(self, name: str, *args, **kwargs) -> object:
+        callbacks = []
+
+        def wrap(value):
+            if callable(value):
+                callbacks.append(value)
+                return _Callback(len(callbacks) - 1)
+            return value
+
+        args = tuple(wrap(value) for value in args)
+        kwargs = {key: wrap(value) for key, value in kwargs.items()}
+
+        host, conn, message = self._send_request((name, args, kwargs))
+        reusable = False
+        try:
+            kind, value = self._reply(conn, callbacks, message)
+            if kind == "stream":
+                stream, host = self._stream(host, conn, callbacks), None  # the stream owns the connection now
+                return stream
+            reusable = True
+            if kind == "error":
+                raise value
+            return value
+        finally:
+            if host is not None:
+                self._checkin(host, conn, reusable)
+
+    def _stream(self, host: _HostSlot, conn, callbacks: List):
+        finished = False
+        try:
+            while True:
+                kind, value = self._reply(conn, callbacks)
+                if kind != "item":
+                    finished = True
+                    if kind == "error":
+                        raise value
+                    return
+                yield value
+        finally:
+            # Abandoned mid-stream: closing the connection makes the host stop the generator
+            self._checkin(host, conn, reusable=finished)
+
+    def stats(self) -> List[Dict[str, object]]:
+        stats = []
+        for host in self._hosts:
+            with self._lock:
+                entry = {'address': host.address, 'inflight': host.inflight, 'idle_connections': len(host.idle)}
+            try:
+                entry['host'] = self._host_stats(host)
+            except (OSError, EOFError, AuthenticationError) as e:
+                entry['error'] = str(e)
+            stats.append(entry)
+        return stats
+
+    def _host_stats(self, host: _HostSlot) -> Dict[str, object]:
+        # Own short-lived connection, so stats stay available while every pooled one is busy
+        with Client(_parse_address(host.address), authkey=self.authkey) as conn:
+            conn.send((HOST_STATS, (), {}))
+            return conn.recv()[1]
+
+
+class _RemoteAttr:
+    # pipeline.registry.status() becomes the remote call "registry.status"
+    def __init__(self, client: HostClient, name: str):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, name: str) -> "_RemoteAttr":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _RemoteAttr(self._client, f"{self._name}.{name}")
+
+    def __call__(self, *args, **kwargs) -> object:
+        return self._client.call(self._name, *args, **kwargs)
+
+
+class RemotePipeline:
+    def __init__(self, module_name: str, client: HostClient):
+        self.module_name = module_name
+        self.client = client
+
+    def __getattr__(self, name: str) -> _RemoteAttr:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _RemoteAttr(self.client, name)
+
+
+def load_pipeline(module_name: str):
+    # The pipeline module itself, or a proxy to the model hosts when POLISH_MODEL_HOSTS is set
+    if not MODEL_HOSTS:
+        return importlib.import_module(module_name)
+    return RemotePipeline(module_name, HostClient(MODEL_HOSTS))
+
+
+def host_stats(pipeline) -> Dict[str, object]:
+    if isinstance(pipeline, RemotePipeline):
+        return {"mode": "hosts", "hosts": pipeline.client.stats()}
+    return {"mode": "local"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a polish pipeline module to HTTP worker processes.")
+    parser.add_argument("--module", required=True, help="pipeline module to host, e.g. text_polish")
+    parser.add_argument("--address", default="127.0.0.1:6001", help="host:port or a Unix socket path")
+    parser.add_argument("--workers", type=int, default=HOST_WORKERS, help="calls served concurrently")
+    parser.add_argument("--allow", action="append", default=[], metavar="NAME",
+                        help="serve this call too (e.g. a batch_polish --function), repeatable")
+    args = parser.parse_args()
+    # Run the importable copy of this module, so unpickled _Callback markers are the class _handle checks for
+    from polishcore import model_host
+    try:
+        host = model_host.ModelHost(args.module, args.address, args.workers,
+                                    calls=model_host.HOST_CALLS | set(args.allow))
+    except model_host.HostAuthkeyError as e:
+        parser.error(str(e))
+    host.serve_forever()
@@ -0,0 +1,39 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Iterator
+
+# === Running the blocking polish pipeline from asyncio code ===
+# Model, LanguageTool and spaCy calls block, so they run on a bounded thread pool and the event
+# loop only awaits their futures; a connection waiting for results holds no thread.
+# offload_iter() advances a sync generator one item per executor job. When the awaiting task is
+# cancelled (the client disconnected), a step that hasn't started yet is dropped, a step that is
+# already running finishes, and the generator is closed right after, so nothing further is polished.
+
+_END = object()
+
+
+async def run_blocking(executor: Executor, fn: Callable, *args) -> object:
+    return await asyncio.wrap_future(executor.submit(fn, *args))
+
+
+def _close(iterator: Iterator) -> None:
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+async def offload_iter(iterator: Iterator, executor: Executor) -> AsyncIterator[object]:
+    step = None
+    try:
+        while True:
+            step = executor.submit(next, iterator, _END)
+            item = await asyncio.wrap_future(step)
+            if item is _END:
+                return
+            yield item
+    finally:
+        # A generator can't be closed while a worker is inside it; close it once that step returns
+        if step is None or step.done() or step.cancel():
+            _close(iterator)
+        else:
+            step.add_done_callback(lambda _: _close(iterator))
@@ -0,0 +1,478 @@
+import re
+import time
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Optional, Sequence, Tuple
+from language_tool_python.utils import correct
+from .batch_scheduler import MicroBatcher
+from .components import ComponentRegistry, WARMUP_SENTENCE
+from .inference_backends import DEFAULT_BACKEND, load_model
+from .issues import Issue, IssueChain, dumps, load_result
+from .lt_pool import LanguageToolPool
+from .metrics import StageTrace
+from .result_cache import ResultCache
+from .speculative import DEFAULT_DECODING, length_cap, prompt_lookup_decode, supports_prompt_lookup
+from .stage_graph import Stage, StageGraph
+from .stage_pipeline import run_pipelined
+from .tiering import SKIP_CHECK_REASONS, TIERED_MODE, TierCounter, prefilter
+from .tokenization import encode, plan_sentences, sentence_spans
+
+# === One polishing engine, configured by every text_polish variant ===
+# A sentence goes through the same stages in every app (see stage_graph.py): the tiering
+# prefilter, LanguageTool per token-budget chunk, the variant's spaCy checks (if it has any),
+# the tier decision, seq2seq generation from the LanguageTool-corrected chunks and cleanup.
+# LanguageTool and spaCy only need the original sentence, so they run side by side; without
+# tiered mode generation only waits for LanguageTool. A variant is a PolishEngine built from its
+# model id, LanguageTool language, cache version and optional spaCy model and checks; its
+# text_polish.py holds that configuration and exposes the engine's methods as module functions.
+#
+# Entry points: polish_text (one sentence), polish_full_text (a document, with one batched
+# generate pass over all of its sentences), stream_polish_sentences / polish_sentences (results
+# as they finish; the pipelined executor overlaps parsing, checks and generation).
+
+BATCH_SIZE = 16                   # sequences per generate pass
+SPACY_BATCH_SIZE = 64             # sentences per nlp.pipe batch
+SPACY_N_PROCESS = 1               # >1 forks worker processes for nlp.pipe on long documents
+PIPELINE_QUEUE_SIZE = 8           # max sentences buffered between streaming stages
+GEN_BATCH_WINDOW_MS = 10          # micro-batching: how long to wait for concurrent requests to join
+GEN_MAX_BATCH = 16                # micro-batching: max sequences per generate call
+GEN_REQUEST_TIMEOUT_SECONDS = 30  # micro-batching: give up on a queued request after this long
+
+SpacyCheck = Callable[[object], List[Issue]]  # a parsed Doc in, its issues out
+
+
+def clean_spacing(text: str) -> str:
+    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    return re.sub(r'\s{2,}', ' ', text).strip()
+
+
+def split_into_sentences(text: str) -> List[str]:
+    return [text[start:end] for start, end in sentence_spans(text)]
+
+
+def _with_timings(result: Dict[str, object], trace: StageTrace, timings: bool) -> Dict[str, object]:
+    return dict(result, timings=trace.to_dict()) if timings else result
+
+
+class PolishEngine:
+    clean_spacing = staticmethod(clean_spacing)
+    split_into_sentences = staticmethod(split_into_sentences)
+
+    def __init__(self, model_id: str, lt_language: str, pipeline_version: str,
+                 spacy_model: Optional[str] = None, spacy_exclude: Sequence[str] = (),
+                 spacy_checks: Sequence[SpacyCheck] = (), backend: str = DEFAULT_BACKEND,
+                 decoding: str = DEFAULT_DECODING, batch_size: int = BATCH_SIZE):
+        self.model_id = model_id
+        self.lt_language = lt_language
+        self.backend = backend      # "torch", "torch-int8" or "onnx" (GEC_BACKEND env var)
+        self.decoding = decoding    # "greedy" or "speculative" (GEC_DECODING env var, see speculative.py)
+        self.batch_size = batch_size
+        self.spacy_model = spacy_model
+        self.spacy_exclude = list(spacy_exclude)
+        self.spacy_checks = list(spacy_checks)
+
+        # Models and tools are loaded lazily and warmed in the background
+        self.registry = ComponentRegistry()
+        self.registry.register("tokenizer", self._load_tokenizer, lambda tokenizer: encode(tokenizer, WARMUP_SENTENCE))
+        self.registry.register("model", self._load_model, lambda model: self.generate_batch([WARMUP_SENTENCE]))
+        self.registry.register("languagetool", self._load_tool, lambda tool: tool.check(WARMUP_SENTENCE))
+        if spacy_model is not None:
+            self.registry.register("nlp", self._load_nlp, lambda nlp: nlp(WARMUP_SENTENCE))
+
+        # Sentence result cache; quantized/ONNX outputs can differ from fp32, so the backend is part
+        # of the model identity
+        self.pipeline_version = pipeline_version + ("+tiered" if TIERED_MODE else "")
+        self.cache = ResultCache(f"{model_id}@{backend}", lt_language, self.pipeline_version,
+                                 dumps=dumps, loads=load_result)
+        self.tiers = TierCounter()  # which tier produced each result (see tiering.py)
+        self.batcher = None
+
+        issue_values = ("lt_issues", "spacy_issues") if self.spacy_model is not None else ("lt_issues",)
+        stages = [
+            Stage("prefilter", self._prefilter_stage, ("plan", "trace"), ("reason",)),
+            Stage("languagetool", self._languagetool_stage, ("plan", "reason", "trace"),
+                  ("lt_issues", "lt_chunks", "gen_ids")),
+        ]
+        if self.spacy_model is not None:
+            stages.append(Stage("spacy", self._spacy_stage, ("plan", "doc", "reason", "trace"), ("spacy_issues",)))
+        stages += [
+            # Tiered mode has to wait for every cheap check before deciding whether to generate
+            Stage("tier", self._tier_stage, ("reason",) + issue_values if TIERED_MODE else ("reason",), ("tier",)),
+            Stage("generation", self._generation_stage, ("tier", "gen_ids", "trace"), ("polished_chunks",)),
+            Stage("cleanup", self._cleanup_stage, ("plan", "tier", "lt_chunks", "polished_chunks") + issue_values,
+                  ("result",)),
+        ]
+        self.stages = StageGraph(stages)
+        # Everything up to (not including) generation, so generation can be batched across
+        # sentences or run on another thread
+        self.analysis_values = ("tier", "gen_ids", "lt_chunks") + issue_values
+
+    # === Loaders ===
+    def _load_tokenizer(self):
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(self.model_id, use_fast=True)  # fast tokenizer: offsets are needed
+
+    def _load_model(self):
+        return load_model(self.model_id, self.backend)
+
+    def _load_tool(self):
+        # LT_POOL_SIZE servers x LT_CHECK_THREADS concurrent checks each (see lt_pool.py)
+        return LanguageToolPool(self.lt_language)
+
+    def _load_nlp(self):
+        import spacy
+        return spacy.load(self.spacy_model, exclude=self.spacy_exclude)
+
+    # === Helpers ===
+    def max_tokens(self) -> int:
+        return self.registry.get("tokenizer").model_max_length
+
+    def token_budget(self) -> int:
+        # Source tokens that fit once the tokenizer has added its special tokens (e.g. </s>)
+        tokenizer = self.registry.get("tokenizer")
+        return tokenizer.model_max_length - tokenizer.num_special_tokens_to_add()
+
+    def count_tokens(self, text: str) -> int:
+        return len(encode(self.registry.get("tokenizer"), text)[0])
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.cache.stats()
+
+    def tier_stats(self) -> Dict[str, object]:
+        return self.tiers.snapshot()
+
+    def check_with_languagetool(self, text: str) -> Tuple[str, List[Issue]]:
+        matches = self.registry.get("languagetool").check(text)
+        lt_corrected = correct(text, matches) if matches else text
+        return lt_corrected, [Issue.from_match(m) for m in matches]
+
+    def parse_sentences(self, sentences: Iterable[str], batch_size: int = SPACY_BATCH_SIZE,
+                        n_process: int = SPACY_N_PROCESS) -> Iterator[object]:
+        # One Doc per sentence, batched through nlp.pipe; every spaCy check shares it
+        return self.registry.get("nlp").pipe(sentences, batch_size=batch_size, n_process=n_process)
+
+    def detect_spacy_issues(self, doc) -> List[Issue]:
+        return [issue for check in self.spacy_checks for issue in check(doc)]
+
+    # === Generation straight from token ids ===
+    # Output length is capped in proportion to each source's own length (speculative.length_cap).
+    # Returns (polished text, generated token count) per sequence, for one padded batch
+    def _generate_rows(self, id_lists: List[List[int]]) -> List[Tuple[str, int]]:
+        import torch
+
+        tokenizer = self.registry.get("tokenizer")
+        model = self.registry.get("model")
+        sources = [tokenizer.build_inputs_with_special_tokens(ids) for ids in id_lists]
+        if self.decoding == "speculative" and supports_prompt_lookup(model):
+            return [self._generate_speculative(model, source) for source in sources]
+
+        caps = [length_cap(len(source), self.max_tokens()) for source in sources]
+        features = tokenizer.pad({"input_ids": sources}, return_tensors="pt")
+        with torch.no_grad():
+            generated = model.generate(**features, max_new_tokens=max(caps))
+        # generate() takes one limit per batch, so every row is cut back to its own cap: greedy
+        # decoding makes that exactly the output of generating the row alone, whatever it was
+        # batched with (micro-batches depend on load, and the result cache assumes output is a
+        # function of the input). Encoder-decoder rows start with the decoder start token.
+        start = 1 if getattr(getattr(model, "config", None), "is_encoder_decoder", False) else 0
+        rows = [row[:start + cap] for row, cap in zip(generated.tolist(), caps)]
+        token_counts = [sum(token != tokenizer.pad_token_id for token in row) for row in rows]
+        decoded = tokenizer.batch_decode(rows, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+        return [(self.clean_spacing(text), count) for text, count in zip(decoded, token_counts)]
+
+    def _generate_speculative(self, model, source: List[int]) -> Tuple[str, int]:
+        # Drafts from the source sentence; same tokens as greedy generate, fewer decoder passes
+        tokenizer = self.registry.get("tokenizer")
+        generated = prompt_lookup_decode(model, source, length_cap(len(source), self.max_tokens()))
+        text = tokenizer.decode(generated, skip_special_tokens=True, clean_up_tokenization_spaces=False)
+        return self.clean_spacing(text), sum(token != tokenizer.pad_token_id for token in generated)
+
+    # === Optional micro-batching: concurrent callers share batched generate calls ===
+    def enable_micro_batching(self, window_ms: float = GEN_BATCH_WINDOW_MS, max_batch: int = GEN_MAX_BATCH) -> MicroBatcher:
+        if self.batcher is None:
+            self.batcher = MicroBatcher(self._generate_rows, window_ms=window_ms, max_batch=max_batch, name="gec-batcher")
+        return self.batcher
+
+    def batching_stats(self) -> Optional[Dict[str, object]]:
+        return self.batcher.stats() if self.batcher is not None else None
+
+    def generate_from_ids(self, id_lists: List[List[int]], batch_size: Optional[int] = None,
+                          trace: Optional[StageTrace] = None) -> List[str]:
+        # Sorted by length so each batch pads little; with micro-batching on, every batch joins
+        # whatever concurrent requests are waiting
+        batch_size = batch_size or self.batch_size
+        order = sorted(range(len(id_lists)), key=lambda i: len(id_lists[i]))
+        outputs = [""] * len(id_lists)
+
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            items = [id_lists[i] for i in bucket]
+            if self.batcher is not None:
+                rows = self.batcher.submit_many(items, timeout=GEN_REQUEST_TIMEOUT_SECONDS)
+            else:
+                rows = self._generate_rows(items)
+            if trace is not None:
+                trace.count("tokens_out", sum(count for _, count in rows))
+            for i, (text, _) in zip(bucket, rows):
+                outputs[i] = text
+
+        return outputs
+
+    def generate_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[str]:
+        tokenizer = self.registry.get("tokenizer")
+        budget = self.token_budget()
+        return self.generate_from_ids([encode(tokenizer, text)[0][:budget] for text in texts], batch_size)
+
+    # === Per-sentence stages over a tokenization plan (see tokenization.plan_sentences) ===
+    def _prefilter_stage(self, plan: Dict[str, object], trace: StageTrace) -> Optional[str]:
+        trace.count("sentences")
+        trace.count("tokens_in", plan['token_count'])
+        return prefilter(plan['original']) if TIERED_MODE else None
+
+    def _languagetool_stage(self, plan: Dict[str, object], reason: Optional[str],
+                            trace: StageTrace) -> Tuple[List[Issue], List[str], List[List[int]]]:
+        # LanguageTool per chunk; unchanged chunks reuse the document encoding, only rewrites are re-encoded
+        lt_chunks = [chunk['text'] for chunk in plan['chunks']]
+        issues = []
+        gen_ids = []
+        if reason in SKIP_CHECK_REASONS:
+            return issues, lt_chunks, gen_ids
+
+        tokenizer = self.registry.get("tokenizer")
+        budget = self.token_budget()
+        with trace.stage("languagetool"):
+            for k, chunk in enumerate(plan['chunks']):
+                lt_corrected, lt_issues = self.check_with_languagetool(chunk['text'])
+                for issue in lt_issues:
+                    issue.offset += chunk['offset']
+                issues.extend(lt_issues)
+                lt_chunks[k] = lt_corrected
+                ids = chunk['ids'] if lt_corrected == chunk['text'] else encode(tokenizer, lt_corrected)[0]
+                gen_ids.append(ids[:budget])
+        return issues, lt_chunks, gen_ids
+
+    def _spacy_stage(self, plan: Dict[str, object], doc, reason: Optional[str], trace: StageTrace) -> List[Issue]:
+        # The variant's spaCy checks, all sharing one parse (parsed here unless passed in)
+        if reason in SKIP_CHECK_REASONS:
+            return []
+        with trace.stage("spacy"):
+            if doc is None:
+                doc = self.registry.get("nlp")(plan['original'])
+            return self.detect_spacy_issues(doc)
+
+    def _tier_stage(self, reason: Optional[str], *issue_lists: List[Issue]) -> str:
+        # Tiered mode: the model only runs when the cheap checks leave something to fix
+        if reason is not None:
+            return "prefilter"
+        if TIERED_MODE and not any(issue_lists):
+            return "rules"
+        return "generation"
+
+    def _generation_stage(self, tier: str, gen_ids: List[List[int]], trace: StageTrace) -> Optional[List[str]]:
+        # seq2seq over the LanguageTool-corrected chunks; skipped tiers keep those as is (None)
+        if tier != "generation":
+            return None
+        with trace.stage("generation"):
+            return self.generate_from_ids(gen_ids, trace=trace) if gen_ids else []
+
+    def _cleanup_stage(self, plan: Dict[str, object], tier: str, lt_chunks: List[str],
+                       polished_chunks: Optional[List[str]], *issue_lists: List[Issue]) -> Dict[str, object]:
+        result = {
+            "original": plan['original'],
+            "polished": self.clean_spacing(" ".join(lt_chunks if polished_chunks is None else polished_chunks)),
+            "issues": [issue for issues in issue_lists for issue in issues],
+            "token_count": plan['token_count'],
+            "tier": tier
+        }
+        self.tiers.record(tier)
+        self.cache.put(plan['original'], result)
+        return result
+
+    def _polish_plan(self, plan: Dict[str, object], doc=None, trace: Optional[StageTrace] = None) -> Dict[str, object]:
+        trace = trace if trace is not None else StageTrace()
+        return self.stages.run({"plan": plan, "doc": doc, "trace": trace}, ["result"])["result"]
+
+    def _analyze(self, plan: Dict[str, object], doc=None, trace: Optional[StageTrace] = None) -> Dict[str, object]:
+        # Stage values up to generation
+        trace = trace if trace is not None else StageTrace()
+        return self.stages.run({"plan": plan, "doc": doc, "trace": trace}, self.analysis_values)
+
+    def _finish(self, analysis: Dict[str, object], polished_chunks: Optional[List[str]] = None) -> Dict[str, object]:
+        # The remaining stages: generation (unless the tier skips it or polished_chunks came from a
+        # shared generate pass) and cleanup
+        values = dict(analysis)
+        if polished_chunks is not None:
+            values['polished_chunks'] = polished_chunks if analysis['tier'] == "generation" else None
+        return self.stages.run(values, ["result"])["result"]
+
+    # === One sentence ===
+    # timings=True adds a "timings" entry (per-stage ms, queue wait, sentences, tokens in/out) to the
+    # result; stage durations are recorded for /metrics either way.
+    def polish_text(self, text: str, doc=None, timings: bool = False) -> Dict[str, object]:
+        trace = StageTrace()
+        with trace.stage("cache_lookup"):
+            cached = self.cache.get(text)
+        if cached is not None:
+            trace.count("sentences")
+            self.tiers.record("cache")
+            return _with_timings(dict(cached, original=text), trace, timings)
+
+        # Over-long input is split into budget-sized chunks instead of being rejected
+        with trace.stage("tokenization"):
+            plans, _ = plan_sentences(self.registry.get("tokenizer"), text, [(0, len(text))], self.token_budget())
+        return _with_timings(self._polish_plan(plans[0], doc, trace), trace, timings)
+
+    # === Documents: one tokenization pass, cache lookups first, then one nlp.pipe over the misses ===
+    def plan_document(self, input_text: str) -> Tuple[List[Dict[str, object]], int]:
+        return plan_sentences(self.registry.get("tokenizer"), input_text, sentence_spans(input_text),
+                              self.token_budget())
+
+    def _skips_checks(self, text: str) -> bool:
+        return TIERED_MODE and prefilter(text) in SKIP_CHECK_REASONS
+
+    def _parse_uncached(self, plans: List[Dict[str, object]], batch_size: int = SPACY_BATCH_SIZE,
+                        n_process: int = SPACY_N_PROCESS) -> Iterator[Tuple[Dict[str, object], object, object, StageTrace]]:
+        # Yields (plan, cached result, doc, trace); URL/code/number segments skipped by tiered mode are never parsed
+        traces = [StageTrace() for _ in plans]
+        cached_results = []
+        for plan, trace in zip(plans, traces):
+            with trace.stage("cache_lookup"):
+                cached_results.append(self.cache.get(plan['original']))
+        unchecked = [cached is None and self._skips_checks(plan['original'])
+                     for plan, cached in zip(plans, cached_results)]
+        docs = None
+        if self.spacy_model is not None:
+            docs = self.parse_sentences((plan['original'] for plan, cached, skip in zip(plans, cached_results, unchecked)
+                                         if cached is None and not skip),
+                                        batch_size=batch_size, n_process=n_process)
+
+        for plan, cached, skip, trace in zip(plans, cached_results, unchecked, traces):
+            if cached is not None:
+                trace.count("sentences")
+                self.tiers.record("cache")
+                yield plan, dict(cached, original=plan['original']), None, trace
+            elif skip or docs is None:
+                yield plan, None, None, trace
+            else:
+                # nlp.pipe parses a whole batch on the first next(), so that sentence carries the batch cost
+                with trace.stage("spacy"):
+                    doc = next(docs)
+                yield plan, None, doc, trace
+
+    # Both executors yield (result, trace) pairs
+    def _polish_sentences(self, plans: List[Dict[str, object]], batch_size: int = SPACY_BATCH_SIZE,
+                          n_process: int = SPACY_N_PROCESS) -> Iterator[Tuple[Dict[str, object], StageTrace]]:
+        for plan, cached, doc, trace in self._parse_uncached(plans, batch_size, n_process):
+            yield (cached if cached is not None else self._polish_plan(plan, doc, trace)), trace
+
+    # Pipelined: parsing, the checks and generation run on separate threads, so sentence N+1 is
+    # parsed and checked while sentence N is generating; results stay in order. Each hand-off is
+    # timestamped so the time a sentence sat in a queue shows up as queue wait.
+    def _polish_sentences_pipelined(self, plans: List[Dict[str, object]], batch_size: int = SPACY_BATCH_SIZE,
+                                    n_process: int = SPACY_N_PROCESS) -> Iterator[Tuple[Dict[str, object], StageTrace]]:
+        def analyze_stage(item):
+            plan, cached, doc, trace, queued_at = item
+            trace.waited(time.perf_counter() - queued_at)
+            analysis = None if cached is not None else self._analyze(plan, doc, trace)
+            return cached, analysis, trace, time.perf_counter()
+
+        def generate_stage(item):
+            cached, analysis, trace, queued_at = item
+            trace.waited(time.perf_counter() - queued_at)
+            return (cached if cached is not None else self._finish(analysis)), trace
+
+        parsed = (item + (time.perf_counter(),) for item in self._parse_uncached(plans, batch_size, n_process))
+        return run_pipelined(parsed, [analyze_stage, generate_stage], max_queue=PIPELINE_QUEUE_SIZE)
+
+    def stream_polish_sentences(self, input_text: str, batch_size: int = SPACY_BATCH_SIZE,
+                                n_process: int = SPACY_N_PROCESS, pipelined: bool = True,
+                                timings: bool = False) -> Generator[Dict[str, object], None, None]:
+        document_trace = StageTrace()
+        with document_trace.stage("tokenization"):
+            plans, _ = self.plan_document(input_text)
+        polish = self._polish_sentences_pipelined if pipelined else self._polish_sentences
+        for idx, (result, trace) in enumerate(polish(plans, batch_size, n_process), 1):
+            if idx == 1:
+                trace.merge(document_trace)  # the one tokenizer pass is timed with the first sentence
+            detail = {
+                "sentence_number": idx,
+                "original": result['original'],
+                "polished": result['polished'],
+                "issues": result['issues'],
+                "token_count": result['token_count'],
+                "tier": result['tier']
+            }
+            yield _with_timings(detail, trace, timings)
+
+    def polish_sentences(self, sentences: List[str], pipelined: bool = True,
+                         timings: bool = False) -> Iterator[Dict[str, object]]:
+        # Already-segmented sentences (e.g. only the changed ones of a session document), joined with
+        # newlines so all of them go through one tokenizer pass; each keeps its own span
+        spans = []
+        start = 0
+        for sentence in sentences:
+            spans.append((start, start + len(sentence)))
+            start += len(sentence) + 1
+        batch_trace = StageTrace()
+        with batch_trace.stage("tokenization"):
+            plans, _ = plan_sentences(self.registry.get("tokenizer"), "\n".join(sentences), spans,
+                                      self.token_budget())
+
+        polish = self._polish_sentences_pipelined if pipelined else self._polish_sentences
+        for idx, (result, trace) in enumerate(polish(plans), 1):
+            if idx == 1:
+                trace.merge(batch_trace)
+            yield _with_timings(result, trace, timings)
+
+    def polish_full_text(self, input_text: str, batch_size: Optional[int] = None,
+                         timings: bool = False) -> Dict[str, object]:
+        # The checks per uncached sentence, then one batched generate pass over the chunks of the
+        # sentences whose tier generates (batch_size sequences per pass)
+        document_trace = StageTrace()
+        with document_trace.stage("tokenization"):
+            plans, total_tokens = self.plan_document(input_text)
+
+        traces = []
+        results = []
+        analyses = {}
+        for k, (plan, cached, doc, trace) in enumerate(self._parse_uncached(plans)):
+            traces.append(trace)
+            results.append(cached)
+            if cached is None:
+                analyses[k] = self._analyze(plan, doc, trace)
+
+        generating = [analysis for analysis in analyses.values() if analysis['tier'] == "generation"]
+        gen_ids = [ids for analysis in generating for ids in analysis['gen_ids']]
+        polished_chunks = []
+        if gen_ids:
+            with document_trace.stage("generation"):
+                polished_chunks = self.generate_from_ids(gen_ids, batch_size, document_trace)
+
+        position = 0
+        for k, analysis in analyses.items():
+            chunk_count = len(analysis['gen_ids']) if analysis['tier'] == "generation" else 0
+            results[k] = self._finish(analysis, polished_chunks[position:position + chunk_count])
+            position += chunk_count
+
+        final_polished_text = ""
+        all_issues = IssueChain()  # the sentences' own issue lists, not copies
+        all_details = []
+        for idx, result in enumerate(results, 1):
+            final_polished_text += result['polished'] + " "
+            all_issues.add(result['issues'])
+            all_details.append({
+                "sentence_number": idx,
+                "original": result['original'],
+                "polished": result['polished'],
+                "issues": result['issues'],
+                "token_count": result['token_count'],
+                "tier": result['tier']
+            })
+        for trace in traces:
+            document_trace.merge(trace)
+
+        return _with_timings({
+            "polished_text": final_polished_text.strip(),
+            "details": all_details,
+            "total_tokens": total_tokens,
+            "total_sentences": len(plans),
+            "issues": all_issues
+        }, document_trace, timings)
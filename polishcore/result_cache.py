@@ -0,0 +1,153 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# === Two-tier, content-addressed cache for polish results ===
+# Tier 1 is a bounded in-process LRU, tier 2 a SQLite file that survives restarts.
+# Keys hash the normalized text together with everything that changes the output
+# (model id, LanguageTool language, pipeline version), so bumping any of those
+# simply stops old entries from matching.
+# dumps/loads turn a result into the text stored on disk and back (JSON by default).
+# Disk writes are write-behind: put() only queues the entry, and a writer thread commits the
+# queue every COMMIT_SECONDS (sooner once COMMIT_BATCH entries wait, and at exit) under its own
+# connection lock, so lookups never wait for an fsync.
+
+DEFAULT_DB_PATH = os.path.expanduser('~/.cache/grammar_polish/results.sqlite3')
+COMMIT_SECONDS = 1.0
+COMMIT_BATCH = 64
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    # NFC only: whitespace is left alone so cached issue offsets stay valid for the caller's text
+    return unicodedata.normalize('NFC', text)
+
+
+class ResultCache:
+    def __init__(self, model_id: str, language: str, pipeline_version: str,
+                 max_entries: int = 4096, db_path: Optional[str] = DEFAULT_DB_PATH,
+                 dumps: Optional[Callable[[Dict[str, object]], str]] = None,
+                 loads: Optional[Callable[[str], Dict[str, object]]] = None):
+        self.namespace = [model_id, language, pipeline_version]
+        self.max_entries = max_entries
+        self._dumps = dumps or (lambda value: json.dumps(value, ensure_ascii=False))
+        self._loads = loads or json.loads
+        self._memory = OrderedDict()
+        self._pending = {}  # put() but not yet on disk
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()  # one sqlite3 connection, used by one thread at a time
+        self._wakeup = threading.Event()
+        self._writer = None
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_errors': 0}
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+                self._db.commit()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Result cache: disk tier disabled (%s)", e)
+                self._db = None
+            else:
+                atexit.register(self.flush)
+
+    def key(self, text: str) -> str:
+        payload = json.dumps(self.namespace + [normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, text: str) -> Optional[Dict[str, object]]:
+        key = self.key(text)
+        with self._lock:
+            value = self._memory.get(key, self._pending.get(key))
+            if value is not None:
+                self._counters['memory_hits'] += 1
+                self._remember(key, value)
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, text: str, value: Dict[str, object]) -> None:
+        key = self.key(text)
+        with self._lock:
+            self._remember(key, value)
+            if self._db is None:
+                return
+            self._pending[key] = value
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_behind, name="result-cache-writer", daemon=True)
+                self._writer.start()
+            full = len(self._pending) >= COMMIT_BATCH
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        # Writes and commits every queued entry (the writer thread calls this; so does exit)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            rows = [(key, self._dumps(value)) for key, value in pending.items()]
+            with self._db_lock:
+                self._db.executemany('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)', rows)
+                self._db.commit()
+        except (sqlite3.Error, TypeError, ValueError):
+            # Unwritable entries are only lost from disk; the writer thread keeps running
+            with self._lock:
+                self._counters['disk_errors'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['pending_writes'] = len(self._pending)
+            stats['max_entries'] = self.max_entries
+            stats['disk_enabled'] = self._db is not None
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    # === Internals (caller holds self._lock) ===
+    def _remember(self, key: str, value: Dict[str, object]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    # === Disk tier (caller does not hold self._lock) ===
+    def _read_disk(self, key: str) -> Optional[Dict[str, object]]:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            with self._lock:
+                self._counters['disk_errors'] += 1
+            return None
+        return self._loads(row[0]) if row else None
+
+    def _write_behind(self) -> None:
+        while True:
+            self._wakeup.wait(COMMIT_SECONDS)
+            self._wakeup.clear()
+            self.flush()
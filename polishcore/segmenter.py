@@ -0,0 +1,119 @@
+import re
+from typing import Iterator, List, Sequence, Tuple
+
+# === Sentence boundaries, for whole documents and for text arriving a character at a time ===
+# A boundary is sentence punctuation (optionally followed by closing quotes/brackets) and then
+# whitespace. A single period after a known abbreviation ("e.g.", "Dr.") or after an initial
+# ("J. Smith") is not a boundary. The decision at a whitespace character only looks back, never
+# ahead, so IncrementalSegmenter can settle each position once: appending a character costs O(1)
+# no matter how long the unterminated text in front of it is, and a sentence is emitted as soon
+# as the whitespace confirming its end arrives.
+
+TERMINATORS = ".!?"
+CLOSERS = "\"')]”’"
+OPENERS = "\"'([“‘"
+# Lower-case, without the final period
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "rev", "gen", "col", "capt", "lt", "sgt",
+    "vs", "e.g", "i.e", "cf", "al", "viz", "approx", "ca", "fig", "figs", "eq", "eqs", "vol", "vols",
+    "pp", "ch", "sec", "dept", "univ", "inc", "ltd", "co", "corp", "jan", "feb", "mar", "apr", "jun",
+    "jul", "aug", "sep", "sept", "oct", "nov", "dec", "a.m", "p.m", "ph.d", "u.s", "u.k",
+})
+MAX_ABBREVIATION_LENGTH = max(len(abbreviation) for abbreviation in ABBREVIATIONS) + 1  # + an opener
+
+_CANDIDATE_RE = re.compile(rf"[{re.escape(TERMINATORS)}][{re.escape(CLOSERS)}]*(\s+)")
+
+
+def ends_sentence(text: Sequence[str], end: int, abbreviations: frozenset = ABBREVIATIONS) -> bool:
+    # Whether text[:end] ends a sentence, given that whitespace follows position end
+    close = end
+    while close > 0 and text[close - 1] in CLOSERS:
+        close -= 1
+    stop = close
+    while stop > 0 and text[stop - 1] in TERMINATORS:
+        stop -= 1
+    if stop == close:
+        return False
+    if close - stop > 1 or text[close - 1] != ".":
+        return True  # "!", "?", "?!", "..."
+
+    # A single period: is the word in front of it an abbreviation or an initial?
+    start = stop
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+        if stop - start > MAX_ABBREVIATION_LENGTH:
+            return True
+    word = "".join(text[start:stop]).lstrip(OPENERS)
+    if word.lower() in abbreviations:
+        return False
+    return not (len(word) == 1 and word.isupper())
+
+
+def boundaries(text: str, abbreviations: frozenset = ABBREVIATIONS) -> Iterator[Tuple[int, int]]:
+    # (end of a sentence, start of the whitespace-free text after it) for every boundary in text
+    for match in _CANDIDATE_RE.finditer(text):
+        if ends_sentence(text, match.start(1), abbreviations):
+            yield match.start(1), match.end(1)
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def sentence_spans(text: str, abbreviations: frozenset = ABBREVIATIONS) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for end, next_start in boundaries(text, abbreviations):
+        spans.append(_strip_span(text, start, end))
+        start = next_start
+    spans.append(_strip_span(text, start, len(text)))
+    return [(a, b) for a, b in spans if a < b]
+
+
+class IncrementalSegmenter:
+    def __init__(self, abbreviations: frozenset = ABBREVIATIONS):
+        self.abbreviations = abbreviations
+        self._chars = []  # text after the last emitted sentence, one entry per character
+        self._scanned = 0  # positions before this one are known not to confirm a boundary
+
+    @property
+    def pending(self) -> str:
+        return "".join(self._chars)
+
+    def append(self, text: str) -> List[str]:
+        # Adds typed/pasted text; returns the sentences whose end it confirmed
+        self._chars.extend(text)
+        sentences = []
+        chars = self._chars
+        position = self._scanned
+        while position < len(chars):
+            if chars[position].isspace() and ends_sentence(chars, position, self.abbreviations):
+                sentence = "".join(chars[:position]).strip()
+                if sentence:
+                    sentences.append(sentence)
+                del chars[:position + 1]
+                position = 0
+            else:
+                position += 1
+        self._scanned = len(chars)
+        return sentences
+
+    def delete(self, count: int = 1) -> None:
+        # Removes characters from the end (backspace); emitted sentences stay emitted
+        if count > 0:
+            del self._chars[-count:]
+        self._scanned = min(self._scanned, len(self._chars))
+
+    def flush(self) -> List[str]:
+        # Everything not emitted yet, as sentences, whether or not their end was confirmed
+        text = self.pending
+        self.reset()
+        return [text[start:end] for start, end in sentence_spans(text, self.abbreviations)]
+
+    def reset(self) -> None:
+        self._chars = []
+        self._scanned = 0
@@ -0,0 +1,110 @@
+import os
+from typing import Dict, List, Optional
+
+# === Input-guided (prompt-lookup) speculative decoding for the seq2seq GEC model ===
+# A grammar correction is mostly a copy of its input, so the next few output tokens can be drafted
+# by finding the last generated n-gram in the source ids and proposing what followed it there.
+# One decoder forward pass scores the whole draft; the longest prefix that matches the model's own
+# argmax is accepted, plus the model's token at the first mismatch. Rejected draft positions are
+# cropped from the KV cache. Every emitted token is the greedy argmax given the tokens before it,
+# so the output is identical to greedy decoding, only in fewer forward passes.
+# Pick the decoding mode with GEC_DECODING ("greedy", the default, or "speculative").
+
+DECODING_MODES = ("greedy", "speculative")
+DEFAULT_DECODING = os.environ.get("GEC_DECODING", "greedy")
+DRAFT_TOKENS = 10    # tokens proposed per verification pass
+NGRAM_SIZE = 3       # longest output suffix looked up in the source (falls back to shorter ones)
+LENGTH_RATIO = 1.5   # output length cap relative to the source length ...
+LENGTH_SLACK = 8     # ... plus a few tokens for short inputs that gain words
+
+
+def length_cap(source_length: int, max_length: int) -> int:
+    # Corrections stay close to the input length; the model maximum is only an upper bound
+    return min(max_length, int(source_length * LENGTH_RATIO) + LENGTH_SLACK)
+
+
+def supports_prompt_lookup(model) -> bool:
+    # Needs a PyTorch encoder-decoder (fp32 or dynamic int8) whose generation config is plain greedy,
+    # otherwise the argmax check would not reproduce what generate() does
+    try:
+        import torch
+    except ImportError:
+        return False
+    if not isinstance(model, torch.nn.Module) or not hasattr(model, "get_encoder"):
+        return False
+    config = model.generation_config
+    # Unset fields are None in newer transformers versions, which means the greedy default
+    return (config.num_beams in (None, 1) and not config.do_sample
+            and config.repetition_penalty in (None, 1.0)
+            and not config.no_repeat_ngram_size
+            and not config.min_length and not config.min_new_tokens
+            and config.forced_bos_token_id is None and config.forced_eos_token_id is None
+            and not config.bad_words_ids and not config.suppress_tokens)
+
+
+def _draft(source_ids: List[int], output: List[int], ngram: int, draft_tokens: int) -> List[int]:
+    generated = output[1:]  # without the decoder start token
+    if not generated:
+        return source_ids[:draft_tokens]
+    for size in range(min(ngram, len(generated)), 0, -1):
+        suffix = generated[-size:]
+        # The most recent match is the likeliest continuation
+        for start in range(len(source_ids) - size, -1, -1):
+            if source_ids[start:start + size] == suffix:
+                return source_ids[start + size:start + size + draft_tokens]
+    return []
+
+
+def _crop(past, length: int):
+    if hasattr(past, "crop"):  # transformers Cache objects (EncoderDecoderCache)
+        past.crop(length)
+        return past
+    # Legacy tuples: (self_key, self_value, cross_key, cross_value) per layer; only self-attention grows
+    return tuple((layer[0][:, :, :length], layer[1][:, :, :length]) + tuple(layer[2:]) for layer in past)
+
+
+def prompt_lookup_decode(model, source_ids: List[int], max_new_tokens: int, draft_tokens: int = DRAFT_TOKENS,
+                         ngram: int = NGRAM_SIZE, stats: Optional[Dict[str, int]] = None) -> List[int]:
+    # source_ids already include the tokenizer's special tokens; returns the decoder start token
+    # followed by the generated ids, like generate() does for a single sequence
+    import torch
+
+    config = model.generation_config
+    start_token = config.decoder_start_token_id
+    if start_token is None:
+        start_token = model.config.decoder_start_token_id
+    eos_tokens = config.eos_token_id if isinstance(config.eos_token_id, list) else [config.eos_token_id]
+
+    output = [start_token]
+    cached = 0  # leading output tokens whose keys/values are in the cache
+    past = None
+
+    with torch.no_grad():
+        encoder_outputs = model.get_encoder()(input_ids=torch.tensor([source_ids]))
+        while len(output) - 1 < max_new_tokens:
+            # Leave room for the model's own token after the accepted draft
+            draft = _draft(source_ids, output, ngram, draft_tokens)[:max_new_tokens - len(output)]
+            feed = output[cached:] + draft
+            outputs = model(encoder_outputs=encoder_outputs, decoder_input_ids=torch.tensor([feed]),
+                            past_key_values=past, use_cache=True)
+            predicted = outputs.logits[0].argmax(-1).tolist()
+
+            # predicted[base + i] is the greedy token after output + draft[:i]
+            base = len(output) - cached - 1
+            accepted = 0
+            while accepted < len(draft) and predicted[base + accepted] == draft[accepted]:
+                accepted += 1
+            new_tokens = draft[:accepted] + [predicted[base + accepted]]
+
+            if stats is not None:
+                stats['forward_passes'] = stats.get('forward_passes', 0) + 1
+                stats['drafted'] = stats.get('drafted', 0) + len(draft)
+                stats['accepted'] = stats.get('accepted', 0) + accepted
+
+            past = _crop(outputs.past_key_values, len(output) + accepted)
+            cached = len(output) + accepted
+            for token in new_tokens:
+                output.append(token)
+                if token in eos_tokens:
+                    return output
+    return output
@@ -0,0 +1,114 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Sequence
+
+# === Stage graph: pipeline stages declared with their inputs, run as soon as those are ready ===
+# A Stage names the values it reads and the values it produces; a StageGraph connects stages by
+# those names only, so a pipeline variant is just a list of stages. run() executes the stages a
+# set of target values needs, skipping stages whose outputs were passed in. Whenever several
+# stages are ready at once (LanguageTool and the spaCy parse both only need the original
+# sentence), or while another stage is still running, they go to a shared pool of STAGE_WORKERS
+# threads, so each one starts the moment its inputs exist; a lone ready stage with nothing else
+# in flight runs on the calling thread. A stage is only handed to the pool when a worker is idle,
+# otherwise the caller runs it itself, so nested or concurrent runs never wait on a pool that is
+# full of waiters.
+# POLISH_STAGE_WORKERS=0 runs every stage serially on the calling thread.
+
+STAGE_WORKERS = int(os.environ.get("POLISH_STAGE_WORKERS", str(min(8, 2 * (os.cpu_count() or 1)))))
+
+_pool = None
+_idle = threading.Semaphore(STAGE_WORKERS)
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, STAGE_WORKERS), thread_name_prefix="stage")
+        return _pool
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable, inputs: Sequence[str], outputs: Sequence[str]):
+        # fn takes the inputs positionally and returns the single output, or a tuple of outputs
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+    def __call__(self, values: Dict[str, object]) -> Dict[str, object]:
+        result = self.fn(*[values[name] for name in self.inputs])
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        return dict(zip(self.outputs, result))
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name}: {', '.join(self.inputs)} -> {', '.join(self.outputs)})"
+
+
+class StageGraph:
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages = list(stages)
+        self._producers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self._producers:
+                    raise ValueError(f"{output} is produced by both {self._producers[output].name} and {stage.name}")
+                self._producers[output] = stage
+
+    def required(self, targets: Iterable[str], available: Iterable[str]) -> List[Stage]:
+        # Stages needed for targets, given the values already available, in declaration order
+        available = set(available)
+        needed = set()
+        missing = [name for name in targets if name not in available]
+        while missing:
+            name = missing.pop()
+            stage = self._producers.get(name)
+            if stage is None:
+                raise KeyError(f"No stage produces {name} and it wasn't passed in")
+            if stage not in needed:
+                needed.add(stage)
+                missing.extend(name for name in stage.inputs if name not in available)
+        return [stage for stage in self.stages if stage in needed]
+
+    def run(self, values: Dict[str, object], targets: Iterable[str]) -> Dict[str, object]:
+        # Returns values extended with every output computed on the way to targets
+        values = dict(values)
+        pending = self.required(targets, values)
+        running = {}
+
+        def offload(stage):
+            try:
+                return stage(values)
+            finally:
+                _idle.release()
+
+        # On an error the remaining stages never start; offloaded ones still running finish on their own
+        while pending or running:
+            ready = [stage for stage in pending if all(name in values for name in stage.inputs)]
+            for stage in ready:
+                pending.remove(stage)
+            inline = []
+            if len(ready) == 1 and not running:
+                inline = ready  # nothing could run next to it
+            else:
+                for stage in ready:
+                    if _idle.acquire(blocking=False):
+                        running[_executor().submit(offload, stage)] = stage
+                    else:
+                        inline.append(stage)
+
+            for stage in inline:
+                values.update(stage(values))
+            if inline:
+                continue  # their outputs may have made more stages ready
+
+            if not running:
+                raise ValueError(f"Inputs of {pending} are never produced")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                values.update(future.result())
+        return values
@@ -0,0 +1,82 @@
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List
+
+# === Pipelined stage executor ===
+# Each stage runs on its own worker thread and hands results to the next stage through a
+# bounded queue, so item N+1 can be in stage 1 while item N is in stage 2. One worker per
+# stage and FIFO queues keep results in input order; bounded queues keep memory flat no
+# matter how many items the input yields. Closing the returned generator stops the workers.
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> object:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def run_pipelined(items: Iterable, stages: List[Callable[[object], object]], max_queue: int = 8) -> Iterator[object]:
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=max_queue) for _ in range(len(stages) + 1)]
+
+    def feed():
+        try:
+            for item in items:
+                if not _put(queues[0], item, stop):
+                    return
+        except Exception as e:
+            _put(queues[0], _Failure(e), stop)
+        _put(queues[0], _DONE, stop)
+
+    def work(stage, inbox, outbox):
+        while True:
+            item = _get(inbox, stop)
+            if item is _DONE:
+                _put(outbox, _DONE, stop)
+                return
+            if not isinstance(item, _Failure):
+                try:
+                    item = stage(item)
+                except Exception as e:
+                    item = _Failure(e)
+            if not _put(outbox, item, stop):
+                return
+
+    threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+    for i, stage in enumerate(stages):
+        threads.append(threading.Thread(target=work, args=(stage, queues[i], queues[i + 1]),
+                                        name=f"pipeline-stage-{i}", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = _get(queues[-1], stop)
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,65 @@
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from .metrics import counter
+
+# === Tiered correction: only send sentences to the seq2seq model when cheap checks say so ===
+# "prefilter"  - very short, URL, code or number-only segments; never generated (URL/code/number
+#                segments skip LanguageTool and spaCy as well, they would only produce noise)
+# "rules"      - LanguageTool (and spaCy rules, where the variant has them) found nothing
+# "generation" - everything else goes through the model as before
+# Off by default (every sentence is generated); POLISH_TIERED=1 turns it on.
+
+TIERED_MODE = os.environ.get("POLISH_TIERED", "0") == "1"
+MIN_WORDS = 3                                # fewer words than this counts as "short"
+CODE_SYMBOL_RATIO = 0.2                      # share of code-ish symbols that marks a segment as code
+SKIP_CHECK_REASONS = {"url", "code", "numeric"}
+
+URL_RE = re.compile(r'^<?(?:https?://|ftp://|www\.|[\w.+-]+@[\w-]+\.)\S*$', re.IGNORECASE)
+WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+CODE_RE = re.compile(r'`|=>|==|!=|::|\w\(.*\)|[;{}]\s*$|^\s*(?:def|class|import|return|function|const|let|var)\s')
+CODE_SYMBOLS = set('{}[]()<>=;$#\\|`_*/&^~')
+
+TIER_TOTAL = counter("polish_tier_total", "Sentences by the tier that produced their result (cache = cache hit).",
+                     ["tier"])
+
+
+def prefilter(text: str) -> Optional[str]:
+    # Returns why a segment never needs generation ("numeric", "url", "code", "short") or None
+    stripped = text.strip()
+    if not any(char.isalpha() for char in stripped):
+        return "numeric"
+    if URL_RE.match(stripped):
+        return "url"
+    symbols = [char for char in stripped if not char.isspace()]
+    if CODE_RE.search(stripped) or sum(char in CODE_SYMBOLS for char in symbols) > CODE_SYMBOL_RATIO * len(symbols):
+        return "code"
+    if len(WORD_RE.findall(stripped)) < MIN_WORDS:
+        return "short"
+    return None
+
+
+class TierCounter:
+    def __init__(self):
+        self._counts = {"prefilter": 0, "rules": 0, "generation": 0, "cache": 0}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str) -> None:
+        TIER_TOTAL.inc(tier=tier)
+        with self._lock:
+            self._counts[tier] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self._counts)
+        computed = counts["prefilter"] + counts["rules"] + counts["generation"]
+        skipped = counts["prefilter"] + counts["rules"]
+        return {
+            "tiered_mode": TIERED_MODE,
+            "counts": counts,
+            "computed": computed,
+            "skipped_generation": skipped,
+            "skipped_fraction": round(skipped / computed, 4) if computed else 0.0
+        }
@@ -0,0 +1,86 @@
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from .segmenter import sentence_spans  # re-exported: sentence splitting lives in segmenter.py
+
+# === Single-pass tokenization and token-budget chunking ===
+# The whole document is encoded once with the fast tokenizer; sentence token counts, the
+# ids fed to generation and the total token count are all sliced out of that one encoding.
+# Sentences longer than the model budget are split into chunks at clause punctuation,
+# falling back to word boundaries and finally to a hard cut at the budget.
+# SentencePiece (Metaspace) and byte-level BPE offsets include the space before a word, so a
+# token is placed by its first non-space character: "▁Bob" in "Hi there. Bob went." starts at
+# "B" and belongs to the second sentence, and a gap before that character is a word boundary.
+
+CLAUSE_PUNCTUATION = ',;:'
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def encode(tokenizer, text: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    return encoding['input_ids'], encoding['offset_mapping']
+
+
+def token_starts(text: str, offsets: List[Tuple[int, int]]) -> List[int]:
+    # Offset of each token's first non-space character (its end for a whitespace-only token)
+    starts = []
+    for token_start, token_end in offsets:
+        while token_start < token_end and text[token_start].isspace():
+            token_start += 1
+        starts.append(token_start)
+    return starts
+
+
+def chunk_token_range(text: str, offsets: List[Tuple[int, int]], starts: List[int], start: int, end: int,
+                      budget: int) -> List[Tuple[int, int]]:
+    chunks = []
+    while end - start > budget:
+        limit = start + budget
+        # Prefer a clause boundary in the second half of the window so chunks don't get tiny
+        cut = next((j for j in range(limit, start + budget // 2, -1)
+                    if offsets[j - 1][1] > 0 and text[offsets[j - 1][1] - 1] in CLAUSE_PUNCTUATION), None)
+        if cut is None:
+            cut = next((j for j in range(limit, start, -1) if starts[j] > offsets[j - 1][1]), limit)
+        chunks.append((start, cut))
+        start = cut
+    if end > start:
+        chunks.append((start, end))
+    return chunks
+
+
+def plan_sentences(tokenizer, text: str, spans: List[Tuple[int, int]],
+                   budget: int) -> Tuple[List[Dict[str, object]], int]:
+    """
+    Returns one plan per span ({original, token_count, chunks}) plus the document token count.
+    Each chunk carries its offset inside the sentence, its text and its slice of the encoding.
+    """
+    ids, offsets = encode(tokenizer, text)
+    starts = token_starts(text, offsets)
+    bounds = [bisect_left(starts, span_start) for span_start, _ in spans] + [len(ids)]
+
+    plans = []
+    for k, (span_start, span_end) in enumerate(spans):
+        first, last = bounds[k], bounds[k + 1]
+        chunks = []
+        for c0, c1 in chunk_token_range(text, offsets, starts, first, last, budget):
+            chunk_start = span_start if c0 == first else starts[c0]
+            chunk_end = span_end if c1 == last else offsets[c1 - 1][1]
+            chunk_start, chunk_end = _strip_span(text, chunk_start, chunk_end)
+            chunks.append({
+                'offset': chunk_start - span_start,
+                'text': text[chunk_start:chunk_end],
+                'ids': ids[c0:c1]
+            })
+        plans.append({
+            'original': text[span_start:span_end],
+            'token_count': last - first,
+            'chunks': chunks
+        })
+
+    return plans, len(ids)
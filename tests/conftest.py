@@ -0,0 +1,42 @@
+"""
+Every app directory is its own flat import root (each has a text_polish, app, ...), so app
+modules are loaded with run_benchmarks.load_app_module, which forgets the previously loaded app
+(and polishcore, whose modules read the environment at import time) first; load_shared_module
+does the same for a polishcore module. Backends that aren't installed are replaced with the
+stubs from benchmarks/stubs.py.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import stubs  # noqa: E402
+from run_benchmarks import disable_result_cache, load_app_module, load_shared_module  # noqa: E402
+
+stubs.install_import_shims()
+
+
+@pytest.fixture
+def load_app():
+    return load_app_module
+
+
+@pytest.fixture
+def load_shared():
+    return load_shared_module
+
+
+@pytest.fixture
+def stub_app(monkeypatch):
+    # Loads an app module with the given environment, stub backends and no result cache
+    def load(app, module_name='text_polish', **environ):
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        module = load_app_module(app, module_name)
+        stubs.install_stub_backends(module)
+        disable_result_cache(module)
+        return module
+    return load
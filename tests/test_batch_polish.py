@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+PIPELINE = '''
+calls = []
+
+
+class Registry:
+    def warm_up(self):
+        pass
+
+    def status(self):
+        return {}
+
+
+registry = Registry()
+
+
+def polish(text):
+    calls.append(text)
+    return text.upper()
+'''
+
+
+@pytest.fixture
+def batch(load_shared, monkeypatch, tmp_path):
+    # Runs from tmp_path, where a pipeline module "fake_pipeline" upper-cases each text
+    (tmp_path / 'fake_pipeline.py').write_text(PIPELINE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    sys.modules.pop('fake_pipeline', None)
+    module = load_shared('batch_polish')
+
+    def run(paths, workers=0, **kwargs):
+        return module.run_batch(paths, 'out.jsonl', 'fake_pipeline', 'polish', workers=workers,
+                                progress_seconds=60, **kwargs)
+    run.module = module
+    return run
+
+
+def read_output():
+    with open('out.jsonl', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def write_corpus(count):
+    os.makedirs('corpus', exist_ok=True)
+    with open('corpus/notes.jsonl', 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps(f'note {i}') + '\n')
+
+
+def test_resume_skips_finished_items_and_drops_a_cut_off_line(batch):
+    write_corpus(4)
+    with open('out.jsonl', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 'corpus/notes.jsonl:1', 'source': 'corpus/notes.jsonl', 'result': 'NOTE 0'}) + '\n')
+        f.write(json.dumps({'id': 'corpus/notes.jsonl:2', 'source': 'corpus/notes.jsonl', 'error': 'boom'}) + '\n')
+        f.write('{"id": "corpus/notes.jsonl:3", "sou')  # killed mid-write
+
+    summary = batch(['corpus'])
+
+    assert sys.modules['fake_pipeline'].calls == ['note 1', 'note 2', 'note 3']
+    assert summary['resumed'] == 1 and summary['items'] == 3 and summary['errors'] == 0
+    results = {record['id']: record['result'] for record in read_output() if 'result' in record}
+    assert results == {f'corpus/notes.jsonl:{i + 1}': f'NOTE {i}' for i in range(4)}
+
+
+def test_ids_do_not_depend_on_how_the_path_was_written(batch, tmp_path):
+    write_corpus(2)
+    batch(['./corpus/notes.jsonl'])
+
+    for spelling in ['corpus', 'corpus/../corpus/notes.jsonl', str(tmp_path / 'corpus')]:
+        summary = batch([spelling])
+        assert summary['items'] == 0 and summary['resumed'] == 2
+    assert [record['id'] for record in read_output()] == ['corpus/notes.jsonl:1', 'corpus/notes.jsonl:2']
+
+
+def test_worker_pool_polishes_every_item_once(batch):
+    write_corpus(50)
+
+    summary = batch(['corpus'], workers=2)
+
+    assert summary['items'] == 50 and summary['errors'] == 0
+    assert sorted(record['result'] for record in read_output()) == sorted(f'NOTE {i}' for i in range(50))
+
+
+def test_items_are_read_only_a_window_ahead(batch):
+    slots = threading.Semaphore(2)
+    stopped = threading.Event()
+    read = []
+
+    def items():
+        for i in range(10):
+            read.append(i)
+            yield str(i), 'source', 'text'
+
+    feed = batch.module._bounded(items(), slots, stopped)
+    assert [next(feed)[0], next(feed)[0]] == ['0', '1']
+
+    # The third item waits for a result to free a slot, and gives up once the run stops
+    waiter = threading.Thread(target=lambda: read.append(list(feed)))
+    waiter.start()
+    waiter.join(0.3)
+    assert waiter.is_alive()
+    stopped.set()
+    waiter.join(5)
+    assert read == [0, 1, 2, []]
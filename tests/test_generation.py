@@ -0,0 +1,47 @@
+import pytest
+
+import stubs
+
+ENGINE_APPS = ['grammarapp', 'tpprithvifinal', 'livepolishing', 'lv_seshbuffpol']
+SHORT = "They watched cats."
+LONG = "They watched cats and dogs and birds and fish while we played cards all afternoon long."
+
+
+class RamblingModel(stubs.StubModel):
+    # Never stops early: every row runs to max_new_tokens, repeating its source
+    def generate(self, input_ids=None, attention_mask=None, max_new_tokens=None, **kwargs):
+        rows = []
+        for row in input_ids:
+            source = [token for token in row if token != 0]
+            rows.append([source[i % len(source)] for i in range(max_new_tokens)])
+        return stubs.StubIds(rows)
+
+
+@pytest.mark.parametrize('app', ENGINE_APPS)
+def test_output_does_not_depend_on_batch_neighbours(stub_app, app):
+    text_polish = stub_app(app)
+    text_polish.registry.override("model", RamblingModel())
+    tokenizer = text_polish.registry.get("tokenizer")
+    short_ids, long_ids = (tokenizer(text, add_special_tokens=False)['input_ids'] for text in (SHORT, LONG))
+
+    alone = text_polish.generate_from_ids([short_ids])
+    batched = text_polish.generate_from_ids([short_ids, long_ids])
+
+    assert batched[0] == alone[0]
+    assert batched[1] == text_polish.generate_from_ids([long_ids])[0]
+
+
+@pytest.mark.parametrize('app', ['lv_seshbuffpol'])
+def test_micro_batched_output_matches_unbatched(stub_app, app):
+    text_polish = stub_app(app)
+    text_polish.registry.override("model", RamblingModel())
+    tokenizer = text_polish.registry.get("tokenizer")
+    short_ids, long_ids = (tokenizer(text, add_special_tokens=False)['input_ids'] for text in (SHORT, LONG))
+    alone = text_polish.generate_from_ids([short_ids])
+
+    batcher = text_polish.enable_micro_batching(window_ms=50, max_batch=16)
+    try:
+        # One request carrying both sequences runs as a single generate call
+        assert text_polish.generate_from_ids([short_ids, long_ids])[0] == alone[0]
+    finally:
+        batcher.close()
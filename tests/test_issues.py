@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_TEMPLATE_APPS = ['tpprithvifinal', 'livepolishing', 'lv_seshbuffpol']
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def issues(request, load_shared, monkeypatch):
+    module = load_shared('issues')
+    if request.param == 'orjson':
+        if module.orjson is None:
+            pytest.skip('orjson is not installed')
+    else:
+        monkeypatch.setattr(module, 'orjson', None)
+    return module
+
+
+def sample_result(issues):
+    first = [issues.Issue("Possible typo: 'teh'", 0, 3, ('the', 'ten')),
+             issues.Issue("'They was' → 'They were'", 4, 8, ('were',), is_pos_issue=True)]
+    second = [issues.Issue('Use “an” <before> a vowel & more', 10, 1, ())]
+    details = [
+        {'sentence_number': 1, 'original': 'teh They was.', 'polished': 'The they were.', 'token_count': 5,
+         'issues': first},
+        {'sentence_number': 2, 'original': 'A apple.', 'polished': 'An apple.', 'token_count': 3, 'issues': second},
+        {'sentence_number': 3, 'original': 'Fine.', 'polished': 'Fine.', 'token_count': 2, 'issues': []},
+    ]
+    return {'polished_text': 'The they were. An apple. Fine.', 'details': details,
+            'issues': issues.IssueChain(detail['issues'] for detail in details)}
+
+
+def test_issue_fields_survive_dumps_and_load_result(issues):
+    result = sample_result(issues)
+
+    text = issues.dumps(result)
+    loaded = issues.load_result(text)
+
+    assert loaded['issues'] == list(result['issues'])
+    assert [type(issue) for issue in loaded['issues']] == [issues.Issue] * 3
+    assert json.loads(text)['details'][0]['issues'][1] == {
+        'message': "'They was' → 'They were'", 'offset': 4, 'length': 8, 'replacements': ['were'],
+        'is_pos_issue': True}
+    assert issues.Issue(**json.loads(text)['issues'][2]).replacements == []
+
+
+def test_orjson_and_json_render_the_same_text(load_shared, monkeypatch):
+    module = load_shared('issues')
+    if module.orjson is None:
+        pytest.skip('orjson is not installed')
+    result = sample_result(module)
+    with_orjson = module.dumps(result)
+    monkeypatch.setattr(module, 'orjson', None)
+
+    assert module.dumps(result) == with_orjson
+
+
+def app_template(app):
+    jinja2 = pytest.importorskip('jinja2')
+    environment = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.join(ROOT, app, 'templates')),
+                                     autoescape=True)
+    return environment.get_template('index.html')
+
+
+@pytest.mark.parametrize('app', RESULT_TEMPLATE_APPS)
+def test_template_renders_records_and_their_json_alike(issues, app):
+    template = app_template(app)
+    result = sample_result(issues)
+
+    # A fresh result renders Issue records; a cached one renders what the cache's JSON loads back to
+    from_records = template.render(result=result)
+    from_json = template.render(result=issues.load_result(issues.dumps(result)))
+
+    assert from_records == from_json
+    assert "Possible typo: &#39;teh&#39; (Suggestions: the, ten)" in from_records
+    assert "&lt;before&gt; a vowel &amp; more" in from_records
+
+
+def test_pos_template_renders_records_and_their_json_alike(issues):
+    template = app_template('txtpolishwithpos')
+    records = sample_result(issues)['details'][0]['issues']
+
+    from_records = template.render(original='teh They was.', polished='The they were.', issues=records)
+    from_json = template.render(original='teh They was.', polished='The they were.',
+                                issues=issues.loads(issues.dumps(records)))
+
+    assert from_records == from_json
+    assert 'Offset: 4, Length: 8' in from_records
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+
+class FailingUpload:
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise OSError("disk full")
+
+
+def test_failed_upload_save_leaves_no_job_behind(load_app, tmp_path):
+    jobs = load_app('docpolish', 'jobs')
+    manager = jobs.JobManager(lambda *args: None, str(tmp_path), max_pending=1)
+
+    with pytest.raises(OSError):
+        manager.submit(FailingUpload(), 'report.docx')
+
+    assert manager._jobs == {}
+    assert os.listdir(tmp_path) == []
+    # The pending slot is free again
+    with pytest.raises(OSError):
+        manager.submit(FailingUpload(), 'report.docx')
@@ -0,0 +1,94 @@
+import queue
+import sys
+import threading
+import types
+
+import pytest
+
+
+class FakeOutput:
+    # The few ScrolledText methods append_output uses
+    def __init__(self):
+        self.lines = []
+
+    def insert(self, index, text):
+        self.lines.append(text)
+
+    def index(self, index):
+        return '1.0'
+
+    def see(self, index):
+        pass
+
+
+@pytest.fixture
+def keylogging(stub_app, monkeypatch, tmp_path):
+    pynput = types.ModuleType('pynput')
+    pynput.keyboard = types.SimpleNamespace(Key=None, Listener=None)
+    monkeypatch.setitem(sys.modules, 'pynput', pynput)
+    module = stub_app('grammarapp', 'keylogging')
+    monkeypatch.setattr(module, 'LOG_FILE', str(tmp_path / 'keylog.txt'))
+    monkeypatch.setattr(module, 'DEBOUNCE_SECONDS', 0.01)
+    module.start_worker()
+    return module
+
+
+def polished(text):
+    return {'details': [{'original': text, 'polished': text}]}
+
+
+def logged(keylogging):
+    keylogging.flush_log()
+    with open(keylogging.LOG_FILE, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_batch_finishing_after_stop_writes_nowhere(keylogging, monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_polish(text):
+        if not entered.is_set():
+            entered.set()
+            release.wait(5)
+        return polished(text)
+    monkeypatch.setattr(keylogging, 'polish_full_text', slow_polish)
+
+    keylogging.enqueue_sentence("Typed before stop.")
+    assert entered.wait(5)
+    output = FakeOutput()
+    keylogging.stop_keylogger(output)
+    release.set()
+
+    keylogging.enqueue_sentence("Typed after restart.")
+    message = keylogging.ui_queue.get(timeout=5)
+
+    assert "Typed after restart." in message
+    assert keylogging.ui_queue.empty()
+    assert logged(keylogging) == ["Typed after restart."]
+    assert not any("before stop" in line for line in output.lines)
+
+
+def test_failed_polish_still_logs_the_originals(keylogging, monkeypatch):
+    def failing_polish(text):
+        raise RuntimeError("model unavailable")
+    monkeypatch.setattr(keylogging, 'polish_full_text', failing_polish)
+
+    keylogging.enqueue_sentence("First sentence here.")
+    message = keylogging.ui_queue.get(timeout=5)
+
+    assert "Polishing failed" in message
+    assert logged(keylogging) == ["First sentence here."]
+
+
+def test_dropped_count_is_reported_once(keylogging, monkeypatch):
+    monkeypatch.setattr(keylogging, 'polish_full_text', polished)
+    with keylogging.dropped_lock:
+        keylogging.dropped_sentences = 3
+
+    keylogging.enqueue_sentence("Another sentence.")
+    messages = [keylogging.ui_queue.get(timeout=5), keylogging.ui_queue.get(timeout=5)]
+
+    assert "3 sentence(s) skipped" in messages[0]
+    assert keylogging.take_dropped_count() == 0
+    with pytest.raises(queue.Empty):
+        keylogging.ui_queue.get(timeout=0.1)
@@ -0,0 +1,59 @@
+import sys
+import threading
+
+import pytest
+
+# A "server" that accepts the --port argument but never listens on it
+NEVER_READY = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+
+@pytest.fixture
+def latex_strip(load_app):
+    return load_app('txtpolishwithpos', 'latex_strip')
+
+
+@pytest.mark.parametrize('source, expected', [
+    ("see~\\cite{x}.", "see."),
+    ("as shown \\cite{a}, and", "as shown, and"),
+    ("Fig.~\\ref{f} shows", "Fig. shows"),
+    ("a \\label{x} b", "a b"),
+])
+def test_dropped_commands_leave_no_space_before_punctuation(latex_strip, source, expected):
+    stripped = latex_strip.strip_builtin(source)
+
+    assert stripped.text == expected
+    assert len(stripped.starts) == len(stripped.text)
+
+
+
+@pytest.mark.parametrize('source, expected', [
+    ("ends with \\", "ends with \\"),
+    ("path C:\\", "path C:\\"),
+    ("50\\% off", "50% off"),
+    ("a\\,b", "a b"),
+])
+def test_backslash_before_a_non_letter_or_at_the_end(latex_strip, source, expected):
+    stripped = latex_strip.strip_builtin(source)
+
+    assert stripped.text == expected
+    assert len(stripped.starts) == len(stripped.text)
+    assert stripped.ends[-1] <= len(source)
+
+
+def test_pandoc_start_timeout_falls_back_without_deadlock(latex_strip, monkeypatch):
+    monkeypatch.setattr(latex_strip, 'PANDOC_START_SECONDS', 1)
+    server = latex_strip.PandocServer(command=NEVER_READY)
+    monkeypatch.setattr(latex_strip, '_pandoc', server)
+    results = []
+
+    def strip_twice():
+        for _ in range(2):
+            results.append(latex_strip.strip_latex("Some \\emph{text}.", stripper='pandoc').text)
+    worker = threading.Thread(target=strip_twice, daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+
+    assert not worker.is_alive(), "strip_latex blocked after the pandoc start timeout"
+    assert results == ["Some text."] * 2
+    assert server._process is None
+    server.close()
@@ -0,0 +1,132 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubServer:
+    # A LanguageTool HTTP server in a thread: /v2/check answers with the port that served it
+    instances = []
+
+    def __init__(self, language, host=None, config=None):
+        self.ping_ok = True
+        self.release = threading.Event()
+        self.release.set()  # clear() to hold checks until set() again
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._reply(200 if stub.ping_ok else 500, [])
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                stub.release.wait(5)
+                self._reply(200, {'matches': [{'port': stub.port}]})
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer((host, 0), Handler)
+        self._http.daemon_threads = True
+        self.port = self._http.server_address[1]
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        StubServer.instances.append(self)
+
+    def close(self):
+        self.release.set()
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture
+def lt_pool(load_shared, monkeypatch):
+    module = load_shared('lt_pool')
+    StubServer.instances = []
+    monkeypatch.setattr(sys.modules['language_tool_python'], 'LanguageTool', StubServer, raising=False)
+    monkeypatch.setattr(module, '_match_factory', lambda: lambda match, text: match)
+    return module
+
+
+def serves(server, stub):
+    return server.check_url == f'http://127.0.0.1:{stub.port}/v2/check'
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_checks_go_to_the_least_loaded_server(lt_pool):
+    pool = lt_pool.LanguageToolPool('en-US', size=2, health_interval=60)
+    try:
+        for stub in StubServer.instances:
+            stub.release.clear()
+        held = threading.Thread(target=pool.check, args=('held',))
+        held.start()
+        assert wait_for(lambda: any(server.inflight for server in pool._servers))
+        loaded = next(server for server in pool._servers if server.inflight)
+        other = next(stub for stub in StubServer.instances if not serves(loaded, stub))
+        other.release.set()
+
+        # While one server holds a check, every new one goes to the other
+        assert {pool.check('text')[0]['port'] for _ in range(4)} == {other.port}
+        for stub in StubServer.instances:
+            stub.release.set()
+        held.join(5)
+    finally:
+        pool.close()
+
+
+def test_dead_server_is_restarted_and_its_check_retried(lt_pool):
+    pool = lt_pool.LanguageToolPool('en-US', size=2, health_interval=60)
+    try:
+        dead = StubServer.instances[0]
+        server = next(server for server in pool._servers if serves(server, dead))
+        dead.close()
+        ports = {pool.check('text')[0]['port'] for _ in range(4)}
+
+        assert dead.port not in ports
+        assert wait_for(lambda: server.restarts == 1)
+        assert server.healthy and server.failures == 1
+        assert serves(server, StubServer.instances[-1])
+    finally:
+        pool.close()
+
+
+def test_health_loop_restarts_a_server_that_stops_answering(lt_pool):
+    pool = lt_pool.LanguageToolPool('en-US', size=1, health_interval=0.05)
+    try:
+        StubServer.instances[0].ping_ok = False
+
+        assert wait_for(lambda: pool._servers[0].restarts == 1)
+        assert pool.check('text')[0]['port'] == StubServer.instances[-1].port
+    finally:
+        pool.close()
+
+
+def test_stuck_check_restarts_its_server_before_the_request_timeout(lt_pool):
+    pool = lt_pool.LanguageToolPool('en-US', size=1, request_timeout=2, health_interval=0.05,
+                                    wedge_seconds=60)
+    try:
+        assert pool.wedge_seconds < pool.request_timeout
+        StubServer.instances[0].release.clear()
+        held = threading.Thread(target=pool.check, args=('held',))
+        held.start()
+
+        assert wait_for(lambda: pool._servers[0].restarts == 1, timeout=1.8)
+        held.join(5)
+        assert pool.check('text')[0]['port'] == StubServer.instances[-1].port
+    finally:
+        pool.close()
@@ -0,0 +1,92 @@
+import os
+import pickle
+import threading
+import time
+from multiprocessing import Pipe
+
+import pytest
+
+
+@pytest.fixture
+def model_host(load_shared, monkeypatch, tmp_path):
+    module = load_shared('model_host')
+    monkeypatch.delenv('POLISH_HOST_AUTHKEY', raising=False)
+    monkeypatch.setattr(module, 'HOST_AUTHKEY_FILE', str(tmp_path / 'authkey'))
+    return module
+
+
+def test_workers_refuse_to_start_without_a_key(model_host):
+    with pytest.raises(model_host.HostAuthkeyError):
+        model_host.HostClient(['127.0.0.1:6001'])
+
+
+def test_host_writes_a_private_random_key_that_workers_share(model_host):
+    key = model_host.host_authkey(create=True)
+
+    assert len(key) == 64
+    assert os.stat(model_host.HOST_AUTHKEY_FILE).st_mode & 0o777 == 0o600
+    assert model_host.host_authkey() == key
+    assert model_host.host_authkey(create=True) == key
+
+
+def test_key_file_readable_by_others_is_refused(model_host):
+    with open(model_host.HOST_AUTHKEY_FILE, 'w') as f:
+        f.write('secret')
+    os.chmod(model_host.HOST_AUTHKEY_FILE, 0o644)
+
+    with pytest.raises(model_host.HostAuthkeyError):
+        model_host.host_authkey()
+
+
+def start_host(model_host, address, module_name, calls):
+    host = model_host.ModelHost(module_name, address, workers=1, authkey=b'k', calls=calls)
+    threading.Thread(target=host.serve_forever, daemon=True).start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(address) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_host_serves_only_whitelisted_calls(model_host, tmp_path):
+    address = str(tmp_path / 'host.sock')
+    start_host(model_host, address, 'json', {'dumps'})
+
+    client = model_host.HostClient([address], authkey=b'k')
+    assert client.call('dumps', [1]) == '[1]'
+    with pytest.raises(AttributeError):
+        client.call('loads', '1')
+    with pytest.raises(AttributeError):
+        client.call('decoder.re.compile', '.')
+
+    intruder = model_host.HostClient([address], authkey=b'wrong')
+    with pytest.raises(model_host.HostUnavailable):
+        intruder.call('dumps', [1])
+
+
+def test_unpicklable_result_fails_the_call_and_keeps_the_connection(model_host, tmp_path):
+    address = str(tmp_path / 'host.sock')
+    start_host(model_host, address, 'threading', {'Lock', 'active_count'})
+
+    client = model_host.HostClient([address], authkey=b'k')
+    with pytest.raises(pickle.PicklingError):
+        client.call('Lock')
+    assert client.call('active_count') > 0
+    assert len(client._hosts[0].idle) == 1
+
+
+def test_stale_idle_connections_are_dropped_and_the_call_retried(model_host, tmp_path):
+    address = str(tmp_path / 'host.sock')
+    start_host(model_host, address, 'json', {'dumps'})
+    client = model_host.HostClient([address], authkey=b'k')
+
+    # What a host restart leaves behind: pooled connections whose other end is closed
+    stale = []
+    for _ in range(2):
+        ours, theirs = Pipe()
+        theirs.close()
+        stale.append(ours)
+    client._hosts[0].idle.extend(stale)
+
+    assert client.call('dumps', [1]) == '[1]'
+    assert all(conn.closed for conn in stale)
+    assert client._hosts[0].inflight == 0
+    assert len(client._hosts[0].idle) == 1
@@ -0,0 +1,22 @@
+import pytest
+
+TEXT = "They watched cats. We played cards. She baked cakes."
+
+
+@pytest.mark.parametrize('pipelined', [True, False])
+def test_streamed_timings_include_the_tokenization_pass(stub_app, pipelined):
+    text_polish = stub_app('lv_seshbuffpol')
+
+    details = list(text_polish.stream_polish_sentences(TEXT, pipelined=pipelined, timings=True))
+
+    # One tokenizer pass for the document, reported once, on the first sentence
+    assert ['tokenization' in detail['timings']['stages_ms'] for detail in details] == [True, False, False]
+
+
+def test_session_sentence_timings_include_the_tokenization_pass(stub_app):
+    text_polish = stub_app('lv_seshbuffpol')
+
+    results = list(text_polish.polish_sentences(["They watched cats.", "We played cards."], timings=True))
+
+    assert ['tokenization' in result['timings']['stages_ms'] for result in results] == [True, False]
+
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import stubs
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'corpus',
+                      'sentences.txt')
+CONTEXTS = ('past', 'present', 'future', 'unknown')
+# Rules the shipped ones don't exercise: no index key (NOT_IN only), a second rule rewriting the
+# token another one rewrites, and lexical rules that never fire but share index buckets
+EXTRA_RULES = [
+    {
+        "name": "not-a-determiner-was",
+        "pattern": [{"TAG": {"NOT_IN": ["DT", "NN"]}}, {"LOWER": "was"}],
+        "action": {"FORMS": {"they": "were", "we": "were"}, "KEY": 0, "TARGET": 1},
+        "message": "'{1}' → '{new}'",
+        "span": "target",
+    },
+] + [
+    {
+        "name": f"lexical-{k}",
+        "pattern": [{"LEMMA" if k % 2 else "LOWER": f"word{k}"}, {"TAG": {"IN": ["VBP", "VB"]}}],
+        "action": {"INFLECT": "VBZ", "TARGET": 1},
+        "message": "'{0} {1}' → '{0} {new}'",
+    }
+    for k in range(20)
+]
+
+
+@pytest.fixture
+def pos_rules(load_app):
+    return load_app('txtpolishwithpos', 'pos_rules')
+
+
+def corpus_docs():
+    with open(CORPUS, encoding='utf-8') as f:
+        sentences = [line.strip() for line in f if line.strip()]
+    return [(stubs.StubDoc(sentence), context) for sentence in sentences for context in CONTEXTS]
+
+
+def run(rule_set, docs):
+    results = []
+    for doc, context in docs:
+        issues, corrected = rule_set.apply(doc, context)
+        results.append(([issue.to_dict() for issue in issues], corrected))
+    return results
+
+
+@pytest.mark.parametrize('extra', [False, True])
+def test_index_finds_the_same_issues_as_evaluating_every_rule(pos_rules, extra):
+    definitions = pos_rules.POS_RULES + (EXTRA_RULES if extra else [])
+    docs = corpus_docs()
+
+    indexed = run(pos_rules.RuleSet(definitions), docs)
+    linear = run(pos_rules.RuleSet(definitions, indexed=False), docs)
+
+    assert indexed == linear
+    assert sum(len(issues) for issues, _ in indexed) > 0
+
+
+def test_later_rule_wins_a_token_both_rewrite(pos_rules):
+    rule_set = pos_rules.RuleSet(pos_rules.POS_RULES + EXTRA_RULES)
+
+    issues, corrected = rule_set.apply(stubs.StubDoc("They was happy."), 'unknown')
+
+    assert [issue.message for issue in issues] == ["'They was' → 'They are'", "'was' → 'were'"]
+    assert corrected == ['They', 'were', 'happy', '.']
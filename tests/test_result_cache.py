@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def result_cache(load_shared):
+    return load_shared('result_cache')
+
+
+def stored_keys(path):
+    with sqlite3.connect(path) as db:
+        return {key for key, in db.execute('SELECT key FROM results')}
+
+
+def test_put_defers_the_commit_to_the_writer(result_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'COMMIT_SECONDS', 60)
+    path = str(tmp_path / 'results.sqlite3')
+    cache = result_cache.ResultCache('model', 'en-US', 'v1', db_path=path)
+
+    cache.put("A sentence.", {'polished': "A sentence."})
+
+    assert stored_keys(path) == set()
+    assert cache.stats()['pending_writes'] == 1
+    cache.flush()
+    assert stored_keys(path) == {cache.key("A sentence.")}
+
+    reopened = result_cache.ResultCache('model', 'en-US', 'v1', db_path=path)
+    assert reopened.get("A sentence.") == {'polished': "A sentence."}
+    assert reopened.stats()['disk_hits'] == 1
+
+
+def test_lookups_do_not_wait_for_a_commit(result_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'COMMIT_SECONDS', 60)
+    cache = result_cache.ResultCache('model', 'en-US', 'v1', max_entries=0,
+                                     db_path=str(tmp_path / 'results.sqlite3'))
+    cache.put("Queued.", {'polished': "Queued."})
+
+    # Held by a slow commit; the queued entry (already evicted from memory) is still served
+    with cache._db_lock:
+        found = []
+        reader = threading.Thread(target=lambda: found.append(cache.get("Queued.")))
+        reader.start()
+        reader.join(timeout=5)
+        assert found == [{'polished': "Queued."}]
+
+
+def test_batch_wakes_the_writer(result_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'COMMIT_SECONDS', 60)
+    monkeypatch.setattr(result_cache, 'COMMIT_BATCH', 2)
+    path = str(tmp_path / 'results.sqlite3')
+    cache = result_cache.ResultCache('model', 'en-US', 'v1', db_path=path)
+
+    cache.put("One.", {'polished': "One."})
+    cache.put("Two.", {'polished': "Two."})
+    expected = {cache.key("One."), cache.key("Two.")}
+    deadline = time.monotonic() + 5
+    while stored_keys(path) != expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert stored_keys(path) == expected
+
+
+def test_unusable_disk_tier_is_logged_and_memory_still_works(result_cache, tmp_path, caplog):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+
+    cache = result_cache.ResultCache('model', 'en-US', 'v1', db_path=str(blocker / 'results.sqlite3'))
+    cache.put("A sentence.", {'polished': "A sentence."})
+
+    assert [record.levelname for record in caplog.records if record.name == result_cache.__name__] == ['WARNING']
+    assert "disk tier disabled" in caplog.text
+    assert cache.get("A sentence.") == {'polished': "A sentence."}
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+# Typing fragments around the tricky boundaries: abbreviations, initials, closers, "?!" and "..."
+FRAGMENTS = ["Hello world", ". ", "Dr. Smith", " said", " e.g. this", "?! ", "... ", '." ', "J. R. R. Tolkien",
+             " wrote (a book.) ", "\n", "  ", "ok", "!", "'Quoted?' ", "U.S. ", "x"]
+
+
+@pytest.fixture
+def segmenter(load_shared):
+    return load_shared('segmenter')
+
+
+def whole(segmenter, text):
+    return [text[start:end] for start, end in segmenter.sentence_spans(text)]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_typing_and_backspace_segment_like_the_whole_text(segmenter, seed):
+    rng = random.Random(seed)
+    incremental = segmenter.IncrementalSegmenter()
+    emitted, text = [], ""
+    for _ in range(300):
+        pending = incremental.pending
+        if pending and rng.random() < 0.3:
+            # Backspace stays within the unfinished sentence: emitted ones stay emitted
+            count = rng.randint(1, len(pending))
+            incremental.delete(count)
+            text = text[:-count]
+        else:
+            fragment = rng.choice(FRAGMENTS)
+            # Pasted as one chunk or typed a character at a time
+            chunks = [fragment] if rng.random() < 0.5 else list(fragment)
+            for chunk in chunks:
+                emitted.extend(incremental.append(chunk))
+            text += fragment
+
+        assert emitted + whole(segmenter, incremental.pending) == whole(segmenter, text)
+
+    assert emitted + incremental.flush() == whole(segmenter, text)
+    assert incremental.pending == ""
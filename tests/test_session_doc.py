@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+EDIT_TEXTS = ["Hello world. ", "Dr. Smith came", " e.g. this", "? ", "!", ".", " ", "\n", "J. ", "ok"]
+
+
+def echo(sentences):
+    return [{'polished': sentence, 'issues': [], 'token_count': 0} for sentence in sentences]
+
+
+def test_get_evicts_a_session_past_its_ttl(load_app, monkeypatch):
+    session_doc = load_app('lv_seshbuffpol', 'session_doc')
+    store = session_doc.SessionStore(echo, ttl_seconds=60)
+    session = store.create()
+    now = session.touched
+
+    monkeypatch.setattr(session_doc.time, 'time', lambda: now + 30)
+    assert store.get(session.id) is session
+
+    # Reading the session counted as activity, so the TTL runs from the last get
+    monkeypatch.setattr(session_doc.time, 'time', lambda: now + 80)
+    assert store.get(session.id) is session
+
+    monkeypatch.setattr(session_doc.time, 'time', lambda: now + 200)
+    assert store.get(session.id) is None
+    assert not store.delete(session.id)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_edits_segment_like_the_whole_document(load_app, load_shared, seed):
+    session_doc = load_app('lv_seshbuffpol', 'session_doc')
+    sentence_spans = load_shared('segmenter').sentence_spans
+    rng = random.Random(seed)
+    session = session_doc.SessionDocument('s', echo)
+    text = ""
+    for _ in range(200):
+        # Mostly typing at the end, sometimes backspace or an edit further up
+        if rng.random() < 0.7:
+            start = end = len(text)
+        else:
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.randint(0, 4))
+        edit = {'start': start, 'end': end, 'text': rng.choice(EDIT_TEXTS) if rng.random() < 0.8 else ''}
+        session.apply(edits=[edit], base_version=session.version)
+        text = session_doc.apply_edit(text, edit)
+
+        assert [entry['original'] for entry in session.sentences] == \
+            [text[start:end] for start, end in sentence_spans(text)]
+
+
+def test_failed_polish_leaves_the_segmentation_of_the_current_text(load_app):
+    session_doc = load_app('lv_seshbuffpol', 'session_doc')
+    calls = []
+
+    def flaky(sentences):
+        calls.append(sentences)
+        if len(calls) == 2:
+            raise RuntimeError("model down")
+        return echo(sentences)
+
+    session = session_doc.SessionDocument('s', flaky)
+    session.apply(text="One. Two")
+    with pytest.raises(RuntimeError):
+        session.apply(edits=[{'start': 8, 'text': '. Three. '}], base_version=1)
+    session.apply(edits=[{'start': 8, 'text': '! Four'}], base_version=1)
+
+    assert [entry['original'] for entry in session.sentences] == ["One.", "Two!", "Four"]
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+
+EOS = 1
+VOCAB = 40
+
+
+def copy_model(torch):
+    # A decoder that mostly copies its source and sometimes deviates from it, so drafts are partly
+    # accepted. The tokens decoded so far live in a legacy (key, value, cross key, cross value)
+    # cache; a wrongly cropped cache changes the prefix and with it the predictions.
+    class CopyModel(torch.nn.Module):
+        generation_config = SimpleNamespace(decoder_start_token_id=0, eos_token_id=EOS, num_beams=1)
+        config = SimpleNamespace(decoder_start_token_id=0)
+
+        def get_encoder(self):
+            return lambda input_ids: SimpleNamespace(source=input_ids[0].tolist())
+
+        @staticmethod
+        def next_token(source, prefix):
+            n = len(prefix) - 1
+            if n >= len(source) - 1:
+                return EOS
+            token = source[n]
+            return token if (sum(prefix) + n) % 4 else 2 + (token + 1) % (VOCAB - 2)
+
+        def forward(self, encoder_outputs, decoder_input_ids, past_key_values=None, use_cache=True):
+            fed = decoder_input_ids[0].tolist()
+            prefix = past_key_values[0][0][0, 0, :, 0].long().tolist() if past_key_values else []
+            logits = torch.zeros(1, len(fed), VOCAB)
+            for i in range(len(fed)):
+                logits[0, i, self.next_token(encoder_outputs.source, prefix + fed[:i + 1])] = 1
+            cache = torch.tensor(prefix + fed, dtype=torch.float).view(1, 1, -1, 1)
+            return SimpleNamespace(logits=logits, past_key_values=((cache, cache, None, None),))
+
+    return CopyModel()
+
+
+@pytest.fixture
+def speculative(load_shared):
+    return load_shared('speculative')
+
+
+def test_draft_continues_the_most_recent_source_match(speculative):
+    source = [5, 6, 7, 8, 6, 7, 9, 10, 11]
+
+    assert speculative._draft(source, [0], 3, 4) == [5, 6, 7, 8]  # nothing generated: copy the start
+    assert speculative._draft(source, [0, 6, 7], 3, 2) == [9, 10]  # the later "6 7" wins
+    assert speculative._draft(source, [0, 4, 8], 3, 3) == [6, 7, 9]  # falls back to the last token
+    assert speculative._draft(source, [0, 12], 3, 3) == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_prompt_lookup_matches_greedy_decoding(speculative, seed):
+    torch = pytest.importorskip('torch')
+    if not hasattr(torch, 'nn'):
+        pytest.skip('torch is not installed')
+    model = copy_model(torch)
+    generator = torch.Generator().manual_seed(seed)
+    source = torch.randint(2, VOCAB, (30,), generator=generator).tolist()
+    source = source[:10] + source[:6] + source[10:] + [EOS]  # a repeated stretch to draft from
+
+    greedy = [0]
+    while greedy[-1] != EOS and len(greedy) - 1 < 64:
+        greedy.append(model.next_token(source, greedy))
+    stats = {}
+    speculated = speculative.prompt_lookup_decode(model, source, max_new_tokens=64, stats=stats)
+
+    assert speculated == greedy
+    assert 0 < stats['accepted'] < stats['drafted']
+    assert stats['forward_passes'] < len(greedy) - 1
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_prompt_lookup_matches_greedy_generate(speculative, seed):
+    transformers = pytest.importorskip('transformers')
+    torch = pytest.importorskip('torch')
+    torch.manual_seed(seed)
+    config = transformers.T5Config(vocab_size=48, d_model=16, d_kv=8, d_ff=32, num_layers=2, num_heads=2,
+                                   decoder_start_token_id=0, pad_token_id=0, eos_token_id=1)
+    model = transformers.T5ForConditionalGeneration(config).eval()
+    assert speculative.supports_prompt_lookup(model)
+    # Repeated n-grams, so drafts are proposed from several places in the source
+    source = [3, 4, 5, 6, 3, 4, 7, 8, 9, 3, 4, 5, 10, 11, 1]
+
+    with torch.no_grad():
+        greedy = model.generate(torch.tensor([source]), max_new_tokens=24, num_beams=1, do_sample=False)[0].tolist()
+    stats = {}
+    speculated = speculative.prompt_lookup_decode(model, source, max_new_tokens=24, stats=stats)
+
+    assert speculated == greedy
+    assert stats['forward_passes'] <= len(speculated) - 1
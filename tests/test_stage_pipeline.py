@@ -0,0 +1,75 @@
+import random
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def stage_pipeline(load_shared):
+    return load_shared('stage_pipeline')
+
+
+def jitter(stage):
+    # Stages that take a random, uneven time per item
+    rng = random.Random(stage.__name__)
+
+    def run(item):
+        time.sleep(rng.random() / 500)
+        return stage(item)
+    return run
+
+
+def test_results_keep_input_order_through_every_stage(stage_pipeline):
+    def double(x):
+        return x * 2
+
+    def label(x):
+        return f'#{x}'
+
+    results = list(stage_pipeline.run_pipelined(range(200), [jitter(double), jitter(label)], max_queue=2))
+
+    assert results == [f'#{x * 2}' for x in range(200)]
+
+
+def test_stage_error_surfaces_after_the_items_before_it(stage_pipeline):
+    def fail_on_five(x):
+        if x == 5:
+            raise ValueError('bad item 5')
+        return x
+
+    pipeline = stage_pipeline.run_pipelined(range(10), [fail_on_five, str])
+    results = []
+    with pytest.raises(ValueError, match='bad item 5'):
+        for result in pipeline:
+            results.append(result)
+
+    # The failed item skips the later stages and nothing after it is yielded
+    assert results == ['0', '1', '2', '3', '4']
+
+
+def test_input_error_is_raised_by_the_generator(stage_pipeline):
+    def items():
+        yield 1
+        raise RuntimeError('input broke')
+
+    pipeline = stage_pipeline.run_pipelined(items(), [str])
+    assert next(pipeline) == '1'
+    with pytest.raises(RuntimeError, match='input broke'):
+        next(pipeline)
+
+
+def test_closing_the_generator_stops_the_workers(stage_pipeline):
+    def endless():
+        while True:
+            yield 1
+
+    before = threading.active_count()
+    pipeline = stage_pipeline.run_pipelined(endless(), [str, str], max_queue=1)
+    assert next(pipeline) == '1'
+    pipeline.close()
+
+    deadline = time.monotonic() + 5
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == before
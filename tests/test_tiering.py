@@ -0,0 +1,43 @@
+import pytest
+
+GENERATING_APPS = ['grammarapp', 'tpprithvifinal', 'livepolishing', 'lv_seshbuffpol']
+# Clean for the stub LanguageTool and the stub spaCy detectors (see benchmarks/stubs.py)
+CLEAN_TEXT = "They watched cats. We played cards. She baked cakes."
+TEXT_WITH_ISSUE = "They watched cats. Then i played cards. She baked cakes."
+
+
+def count_generated(module):
+    model = module.registry.get("model")
+    calls = []
+    generate = model.generate
+
+    def counting(input_ids=None, **kwargs):
+        calls.append(len(input_ids))
+        return generate(input_ids=input_ids, **kwargs)
+    model.generate = counting
+    return calls
+
+
+@pytest.mark.parametrize('app', GENERATING_APPS)
+def test_rules_tier_never_reaches_the_model(stub_app, app):
+    text_polish = stub_app(app, POLISH_TIERED='1')
+    calls = count_generated(text_polish)
+
+    result = text_polish.polish_full_text(CLEAN_TEXT, timings=True)
+
+    assert [detail['tier'] for detail in result['details']] == ["rules"] * 3
+    assert calls == []
+    assert result['timings']['tokens_out'] == 0
+    assert text_polish.tier_stats()['skipped_fraction'] == 1.0
+
+
+@pytest.mark.parametrize('app', GENERATING_APPS)
+def test_only_generation_tier_is_generated(stub_app, app):
+    text_polish = stub_app(app, POLISH_TIERED='1')
+    calls = count_generated(text_polish)
+
+    result = text_polish.polish_full_text(TEXT_WITH_ISSUE)
+
+    assert [detail['tier'] for detail in result['details']] == ["rules", "generation", "rules"]
+    assert sum(calls) == 1
+    assert result['details'][1]['polished'] == "Then I played cards."
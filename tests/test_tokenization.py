@@ -0,0 +1,54 @@
+import pytest
+
+tokenizers = pytest.importorskip('tokenizers')
+
+PIECES = "▁Hi ▁there ▁Bob ▁went ▁home ▁and ▁then ▁he ▁to ▁sle ep . , ▁".split()
+
+
+class SentencePieceTokenizer:
+    # A Metaspace + Unigram tokenizer (the T5 layout), called like a transformers fast tokenizer.
+    # Its offsets include the space before a word: "▁Bob" in "Hi there. Bob went." is (9, 13).
+    def __init__(self):
+        from tokenizers import Tokenizer, models, pre_tokenizers
+        vocab = [("<unk>", 0.0)] + [(piece, -1.0) for piece in PIECES]
+        self._tokenizer = Tokenizer(models.Unigram(vocab, unk_id=0))
+        self._tokenizer.pre_tokenizer = pre_tokenizers.Metaspace()
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False, verbose=True):
+        encoding = self._tokenizer.encode(text, add_special_tokens=add_special_tokens)
+        return {'input_ids': encoding.ids, 'offset_mapping': encoding.offsets}
+
+    def tokens(self, ids):
+        return [self._tokenizer.id_to_token(i) for i in ids]
+
+    def decode(self, ids):
+        return ''.join(self.tokens(ids)).replace('▁', ' ').strip()
+
+
+@pytest.fixture(scope='module')
+def tokenizer():
+    return SentencePieceTokenizer()
+
+
+def test_leading_space_token_stays_with_its_sentence(load_shared, tokenizer):
+    tokenization = load_shared('tokenization')
+    text = "Hi there. Bob went."
+    plans, total = tokenization.plan_sentences(tokenizer, text, tokenization.sentence_spans(text), 512)
+
+    assert [plan['original'] for plan in plans] == ["Hi there.", "Bob went."]
+    assert [tokenizer.tokens(plan['chunks'][0]['ids']) for plan in plans] == [
+        ['▁Hi', '▁there', '.'], ['▁Bob', '▁went', '.']]
+    assert [plan['token_count'] for plan in plans] == [3, 3]
+    assert sum(plan['token_count'] for plan in plans) == total
+
+
+def test_long_sentence_is_chunked_at_word_boundaries(load_shared, tokenizer):
+    tokenization = load_shared('tokenization')
+    text = "Bob went home and then he went to sleep."
+    plans, _ = tokenization.plan_sentences(tokenizer, text, [(0, len(text))], 3)
+
+    chunks = plans[0]['chunks']
+    assert [chunk['text'] for chunk in chunks] == ["Bob went home", "and then he", "went to", "sleep."]
+    for chunk in chunks:
+        assert tokenizer.decode(chunk['ids']) == chunk['text']
+        assert text[chunk['offset']:chunk['offset'] + len(chunk['text'])] == chunk['text']
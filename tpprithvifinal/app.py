@@ -1,19 +1,53 @@
-from flask import Flask, render_template, request
-from text_polish import polish_full_text
+from flask import Flask, render_template, request, jsonify, Response
+from polishcore.metrics import instrument_flask, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
 
 app = Flask(__name__)
 
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+text_polish = load_pipeline("text_polish")
+registry = text_polish.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm
+registry.start_warmup()
+instrument_flask(app)
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     result = None
     if request.method == 'POST':
         user_input = request.form.get('user_text', '')
         try:
-            result = polish_full_text(user_input)
+            result = text_polish.polish_full_text(user_input)
         except ValueError as e:
             result = {"error": str(e)}
 
     return render_template('index.html', result=result)
 
+@app.route('/cache-stats')
+def cache_stats_route():
+    return jsonify(text_polish.cache_stats())
+
+@app.route('/tier-stats')
+def tier_stats_route():
+    return jsonify(text_polish.tier_stats())
+
+@app.route('/host-stats')
+def host_stats_route():
+    return jsonify(host_stats(text_polish))
+
+@app.route('/metrics')
+def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    ready = registry.is_ready()
+    return jsonify({"ready": ready, "components": registry.status()}), (200 if ready else 503)
+
 if __name__ == '__main__':
     app.run(host="0.0.0.0")
@@ -1,79 +1,33 @@
-import re
-from typing import Tuple, List, Dict
-import language_tool_python
-from language_tool_python.utils import correct
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+from polishcore.polish_engine import PolishEngine
 
-# === Load grammar model and tools ===
+# === Configuration of the polishing engine for this app (see polishcore/polish_engine.py) ===
+# LanguageTool and the seq2seq model, no spaCy checks
 model_id = "prithivida/grammar_error_correcter_v1"
-tokenizer = AutoTokenizer.from_pretrained(model_id)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_id)
-corrector = pipeline("text2text-generation", model=model, tokenizer=tokenizer)
-_tool = language_tool_python.LanguageTool('en-US')
-MAX_TOKENS = tokenizer.model_max_length
-
-# === Utility functions ===
-def count_tokens(text: str) -> int:
-    return len(tokenizer.tokenize(text))
-
-def clean_spacing(text: str) -> str:
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-    return re.sub(r'\s{2,}', ' ', text).strip()
-
-def polish_text(text: str) -> Dict[str, object]:
-    if count_tokens(text) > MAX_TOKENS:
-        raise ValueError(f"Input text exceeds max token limit of {MAX_TOKENS} tokens.")
-
-    matches = _tool.check(text)
-    lt_corrected = correct(text, matches) if matches else text
-
-    lt_issues = [{
-        'message': m.message,
-        'offset': str(m.offset),
-        'length': str(m.errorLength),
-        'replacements': ', '.join(m.replacements),
-        'is_pos_issue': 'False'
-    } for m in matches]
-
-    result = corrector(lt_corrected, max_length=MAX_TOKENS)[0]['generated_text']
-    polished = clean_spacing(result)
-
-    return {
-        "original": text,
-        "polished": polished,
-        "issues": lt_issues,
-        "token_count": count_tokens(text)
-    }
-
-def split_into_sentences(text: str) -> List[str]:
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-    return [s.strip() for s in sentences if s.strip()]
-
-def polish_full_text(input_text: str) -> Dict[str, object]:
-    sentences_list = split_into_sentences(input_text)
-    final_polished_text = ""
-    all_issues = []
-    all_details = []
-
-    for idx, sentence in enumerate(sentences_list, 1):
-        result = polish_text(sentence)
-        final_polished_text += result['polished'] + " "
-        all_issues.extend(result['issues'])
-        all_details.append({
-            "sentence_number": idx,
-            "original": result['original'],
-            "polished": result['polished'],
-            "issues": result['issues'],
-            "token_count": result['token_count']
-        })
-
-    return {
-        "polished_text": final_polished_text.strip(),
-        "details": all_details,
-        "total_tokens": count_tokens(input_text),
-        "total_sentences": len(sentences_list),
-        "issues": all_issues
-    }
+LT_LANGUAGE = 'en-US'
+# Keys the sentence result cache: bump it whenever polishing output changes
+PIPELINE_VERSION = "lt+gec/6"
+
+engine = PolishEngine(model_id, LT_LANGUAGE, PIPELINE_VERSION)
+registry = engine.registry
+
+# === The engine's entry points and helpers, as this module's functions ===
+polish_text = engine.polish_text
+polish_full_text = engine.polish_full_text
+stream_polish_sentences = engine.stream_polish_sentences
+polish_sentences = engine.polish_sentences
+split_into_sentences = engine.split_into_sentences
+plan_document = engine.plan_document
+check_with_languagetool = engine.check_with_languagetool
+generate_from_ids = engine.generate_from_ids
+generate_batch = engine.generate_batch
+enable_micro_batching = engine.enable_micro_batching
+batching_stats = engine.batching_stats
+cache_stats = engine.cache_stats
+tier_stats = engine.tier_stats
+count_tokens = engine.count_tokens
+clean_spacing = engine.clean_spacing
+max_tokens = engine.max_tokens
+token_budget = engine.token_budget
 
 # === Optional: Run as script ===
 if __name__ == "__main__":
@@ -93,7 +47,7 @@ if __name__ == "__main__":
             print("Issues:")
             if detail['issues']:
                 for i, issue in enumerate(detail['issues'], 1):
-                    print(f"  {i}. {issue['message']} | Suggestions: {issue['replacements']}")
+                    print(f"  {i}. {issue.message} | Suggestions: {', '.join(issue.replacements)}")
             else:
                 print("  ✅ No issues found.")
 
@@ -1,27 +1,21 @@
-import subprocess
-from flask import Flask, render_template, request
-from text_processor import polish_text
+import os
+from flask import Flask, render_template, request, jsonify, Response
+from latex_strip import strip_latex
+from polishcore.metrics import StageTrace, instrument_flask, render_metrics
+from polishcore.model_host import host_stats, load_pipeline
 
 app = Flask(__name__)
 
-def strip_latex(raw: str) -> str:
-    """
-    Uses pandoc to convert LaTeX input to plain text, removing LaTeX syntax.
-    Requires pandoc to be installed and available on the system PATH.
-    """
-    try:
-        result = subprocess.run(
-            ['pandoc', '--from=latex', '--to=plain'],
-            input=raw,
-            text=True,
-            capture_output=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"Pandoc error: {e}")
-        # Return raw input if pandoc fails
-        return raw.strip()
+# The pipeline module itself, or a proxy to shared model-host processes (POLISH_MODEL_HOSTS, see polishcore/model_host.py)
+text_processor = load_pipeline("text_processor")
+registry = text_processor.registry
+
+# Models load in the background so the port binds immediately; /readyz reports when they are warm.
+# Under the debug reloader the file-watcher process imports this module too, so only the serving
+# process (or a WSGI server importing the app) starts the warm-up.
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    registry.start_warmup()
+instrument_flask(app)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -34,11 +28,14 @@ def index():
 
         if raw_input:
             try:
-                # Optional: Strip LaTeX formatting (comment out if not needed)
-                stripped_text = strip_latex(raw_input)
+                # Optional: Strip LaTeX formatting in-process (LATEX_STRIPPER=pandoc uses a pandoc server)
+                with StageTrace().stage("latex_strip"):
+                    stripped = strip_latex(raw_input)
 
                 # Polish the text: returns original, corrected text, and issues list
-                original, polished, issues = polish_text(stripped_text)
+                original, polished, issues = text_processor.polish_text(stripped.text)
+                # Issue offsets refer to the stripped text; add their positions in the LaTeX input
+                issues = [stripped.locate(issue) for issue in issues]
 
             except Exception as e:
                 print(f"Error processing input: {e}")
@@ -51,5 +48,26 @@ def index():
         issues=issues
     )
 
+@app.route('/cache-stats')
+def cache_stats_route():
+    return jsonify(text_processor.cache_stats())
+
+@app.route('/host-stats')
+def host_stats_route():
+    return jsonify(host_stats(text_processor))
+
+@app.route('/metrics')
+def metrics_route():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    ready = registry.is_ready()
+    return jsonify({"ready": ready, "components": registry.status()}), (200 if ready else 503)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,420 @@
+import atexit
+import json
+import os
+import re
+import shlex
+import socket
+import subprocess
+import threading
+import time
+import unicodedata
+import urllib.error
+import urllib.request
+from typing import Dict, Iterator, List, Optional, Tuple
+from polishcore.issues import Issue
+
+# === LaTeX to plain text, with an offset map back into the source ===
+# One left-to-right pass over the LaTeX: text runs are copied, display math and verbatim-like
+# environments are skipped, inline math becomes one placeholder word (so "the value $x$ is" still
+# reads as a sentence to the grammar checker), commands are dropped (text-bearing arguments such as \emph{...} stay, arguments like
+# \label{...} or \cite{...} go), escapes, accents and quote/dash ligatures become their characters
+# and whitespace collapses the way TeX would typeset it. Every output character remembers the
+# source range it came from, so an issue found in the plain text can be reported at its position
+# in the user's LaTeX (StrippedText.to_source / locate).
+#
+# LATEX_STRIPPER=pandoc converts through one long-running `pandoc server` process instead (no
+# process per request). Pandoc output carries no offset map, so issues then keep plain-text offsets
+# only; if pandoc can't be started or fails, the built-in stripper is used.
+
+LATEX_STRIPPER = os.environ.get("LATEX_STRIPPER", "builtin")
+PANDOC_SERVER_COMMAND = shlex.split(os.environ.get("PANDOC_SERVER_COMMAND", "pandoc server"))
+PANDOC_TIMEOUT_SECONDS = 10
+PANDOC_START_SECONDS = 10
+INLINE_MATH_PLACEHOLDER = "X"
+
+MATH_ENVIRONMENTS = {"equation", "align", "alignat", "flalign", "gather", "multline", "eqnarray",
+                     "math", "displaymath", "dmath"}
+# Environments whose body is code or drawing commands rather than prose
+VERBATIM_ENVIRONMENTS = {"verbatim", "Verbatim", "lstlisting", "minted", "comment", "tikzpicture"}
+# Mandatory arguments after \begin{...} that are layout, not text (e.g. a tabular column spec)
+ENVIRONMENT_ARGS = {"tabular": 1, "tabular*": 2, "tabularx": 2, "array": 1, "minipage": 1,
+                    "multicols": 1, "wrapfigure": 2, "thebibliography": 1}
+# Leading mandatory arguments dropped with the command; any later {...} group is kept as text
+COMMAND_ARGS = {
+    "label": 1, "ref": 1, "eqref": 1, "pageref": 1, "autoref": 1, "cref": 1, "Cref": 1,
+    "cite": 1, "citep": 1, "citet": 1, "nocite": 1, "footnote": 1, "url": 1, "href": 1,
+    "includegraphics": 1, "input": 1, "include": 1, "bibliography": 1, "bibliographystyle": 1,
+    "documentclass": 1, "usepackage": 1, "pagestyle": 1, "thispagestyle": 1, "vspace": 1,
+    "hspace": 1, "color": 1, "textcolor": 1, "colorbox": 1, "setcounter": 2, "setlength": 2,
+    "newcommand": 2, "renewcommand": 2, "providecommand": 2, "newenvironment": 3, "hypersetup": 1,
+}
+SYMBOLS = {"LaTeX": "LaTeX", "TeX": "TeX", "ldots": "…", "dots": "…", "textendash": "–",
+           "textemdash": "—", "S": "§", "P": "¶", "ss": "ß", "ae": "æ", "AE": "Æ", "oe": "œ",
+           "OE": "Œ", "o": "ø", "O": "Ø", "aa": "å", "AA": "Å", "l": "ł", "L": "Ł", "i": "ı",
+           "copyright": "©", "textregistered": "®", "texttrademark": "™", "euro": "€"}
+# Control sequences that typeset as a space (or nothing) between words
+SPACES = {"\\\\": " ", "\\ ": " ", "\\,": " ", "\\;": " ", "\\:": " ", "\\>": " ", "\\!": "",
+          "\\quad": " ", "\\qquad": " ", "\\newline": " ", "\\par": "\n\n", "\\item": " ",
+          "\\linebreak": " ", "\\noindent": "", "\\centering": ""}
+ESCAPED = set("%$&#_{}")
+ACCENTS = {"'": "\u0301", "`": "\u0300", "^": "\u0302", '"': "\u0308", "~": "\u0303", "=": "\u0304",
+           ".": "\u0307", "c": "\u0327", "v": "\u030c", "u": "\u0306", "H": "\u030b", "k": "\u0328"}
+# Punctuation that attaches to the previous word, so a space left by a dropped command goes
+CLOSING_PUNCTUATION = set(".,;:!?)]")
+LIGATURES = {"---": "—", "--": "–", "``": "“", "''": "”", "`": "‘", "~": " ", "&": " "}
+
+_CONTROL_RE = re.compile(r"\\(?:[A-Za-z@]+\*?|.)", re.S)
+_TEXT_RE = re.compile(r"[^\\$%{}~&\s`'\-]+|'|-")
+_SPACE_RE = re.compile(r"\s+")
+_LIGATURE_RE = re.compile(r"---|--|``|''|`|~|&")
+
+
+class LatexIssue(Issue):
+    # An issue together with its position in the LaTeX input
+    __slots__ = ("latex_offset", "latex_length")
+
+    def __init__(self, issue: Issue, latex_offset: int, latex_length: int):
+        super().__init__(issue.message, issue.offset, issue.length, issue.replacements, issue.is_pos_issue)
+        self.latex_offset = latex_offset
+        self.latex_length = latex_length
+
+    def to_dict(self) -> Dict[str, object]:
+        return dict(super().to_dict(), latex_offset=self.latex_offset, latex_length=self.latex_length)
+
+
+class StrippedText:
+    def __init__(self, source: str, text: str, starts: Optional[List[int]] = None,
+                 ends: Optional[List[int]] = None):
+        self.source = source
+        self.text = text
+        # starts[i]:ends[i] is the source range output character i came from (None: no map)
+        self.starts = starts
+        self.ends = ends
+
+    @property
+    def mapped(self) -> bool:
+        return self.starts is not None
+
+    def to_source(self, offset: int, length: int) -> Tuple[int, int]:
+        # (offset, length) in the plain text -> (offset, length) in the LaTeX source
+        if not self.text:
+            return 0, 0
+        offset = min(max(offset, 0), len(self.text))
+        if offset == len(self.text):
+            return self.ends[-1], 0
+        start = self.starts[offset]
+        if length <= 0:
+            return start, 0
+        last = min(offset + length, len(self.text)) - 1
+        return start, max(self.ends[last], start) - start
+
+    def locate(self, issue: Issue) -> Issue:
+        # A LatexIssue copy when there is an offset map (cached issues are shared), else the issue
+        if not self.mapped:
+            return issue
+        return LatexIssue(issue, *self.to_source(issue.offset, issue.length))
+
+
+class _Scanner:
+    def __init__(self, source: str):
+        self.source = source
+
+    # === Helpers: each takes a position and returns the position after what it skipped ===
+    def _skip_spaces(self, pos: int) -> int:
+        match = _SPACE_RE.match(self.source, pos)
+        return match.end() if match else pos
+
+    def _skip_spaces_inline(self, pos: int) -> int:
+        while pos < len(self.source) and self.source[pos] in " \t":
+            pos += 1
+        return pos
+
+    def _skip_balanced(self, pos: int, opening: str, closing: str) -> int:
+        # pos is just past the opening delimiter; braces nest inside [...] too
+        source, depth, braces = self.source, 0, 0
+        while pos < len(source):
+            char = source[pos]
+            if char == "\\":
+                pos += 2
+                continue
+            if char == "{" and opening != "{":
+                braces += 1
+            elif char == "}" and opening != "{":
+                braces -= 1
+            elif char == opening:
+                depth += 1
+            elif char == closing and braces <= 0:
+                if depth == 0:
+                    return pos + 1
+                depth -= 1
+            pos += 1
+        return len(source)
+
+    def _skip_optional(self, pos: int) -> int:
+        while pos < len(self.source) and self.source[pos] == "[":
+            pos = self._skip_balanced(pos + 1, "[", "]")
+        return pos
+
+    def _skip_argument(self, pos: int) -> int:
+        # A {...} group, or a single token as TeX allows for undelimited arguments
+        pos = self._skip_optional(self._skip_spaces(pos))
+        if pos >= len(self.source):
+            return pos
+        if self.source[pos] == "{":
+            return self._skip_balanced(pos + 1, "{", "}")
+        control = _CONTROL_RE.match(self.source, pos)
+        return control.end() if control else pos + 1
+
+    def _read_name(self, pos: int) -> Tuple[Optional[str], int]:
+        # The {name} after \begin or \end
+        pos = self._skip_spaces(pos)
+        if not self.source.startswith("{", pos):
+            return None, pos
+        end = self.source.find("}", pos)
+        if end < 0:
+            return None, pos
+        return self.source[pos + 1:end].strip(), end + 1
+
+    def _find_unescaped(self, needle: str, pos: int) -> int:
+        # Start of the next needle not preceded by an odd number of backslashes, or -1
+        while True:
+            pos = self.source.find(needle, pos)
+            if pos < 0:
+                return -1
+            backslashes = 0
+            while pos - backslashes > 0 and self.source[pos - backslashes - 1] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return pos
+            pos += 1
+
+    def _skip_environment_body(self, name: str, pos: int) -> int:
+        end = self.source.find(f"\\end{{{name}}}", pos)
+        return len(self.source) if end < 0 else end + len(f"\\end{{{name}}}")
+
+    # === The scan: yields (text, source start, source end) pieces ===
+    def pieces(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, int, int]]:
+        source = self.source
+        stop = len(source) if stop is None else stop
+        pos = start
+        while pos < stop:
+            char = source[pos]
+
+            if char.isspace():
+                end = _SPACE_RE.match(source, pos).end()
+                yield source[pos:end], pos, end
+                pos = end
+
+            elif char == "%":
+                # A comment eats the rest of the line, its newline and the next line's indentation
+                newline = source.find("\n", pos)
+                pos = stop if newline < 0 else self._skip_spaces_inline(newline + 1)
+
+            elif char in "{}":
+                pos += 1  # plain groups are transparent
+
+            elif char == "$":
+                delimiter = "$$" if source.startswith("$$", pos) else "$"
+                close = self._find_unescaped(delimiter, pos + len(delimiter))
+                if close < 0:
+                    yield char, pos, pos + 1  # a lone dollar sign is text
+                    pos += 1
+                else:
+                    if delimiter == "$":
+                        yield INLINE_MATH_PLACEHOLDER, pos, close + 1
+                    pos = close + len(delimiter)
+
+            elif char == "\\":
+                pos = yield from self._control(pos)
+
+            else:
+                ligature = _LIGATURE_RE.match(source, pos)
+                if ligature:
+                    yield LIGATURES[ligature.group()], pos, ligature.end()
+                    pos = ligature.end()
+                else:
+                    end = _TEXT_RE.match(source, pos).end()
+                    yield source[pos:end], pos, end
+                    pos = end
+
+    def _control(self, pos: int):
+        source = self.source
+        control = _CONTROL_RE.match(source, pos)
+        if control is None:
+            # A backslash ending the input is plain text
+            yield "\\", pos, pos + 1
+            return pos + 1
+        token = control.group()
+        name = token[1:]
+        end = control.end()
+
+        if name in ESCAPED:
+            yield name, pos, end
+            return end
+        if token in SPACES:
+            yield SPACES[token], pos, end
+            return self._skip_optional(end) if token == "\\item" else end
+        if name in ("(", "["):
+            close = source.find("\\)" if name == "(" else "\\]", end)
+            end = len(source) if close < 0 else close + 2
+            if name == "(":
+                yield INLINE_MATH_PLACEHOLDER, pos, end
+            return end
+        if name in ACCENTS:
+            # \'e, \'{e}, \c{c}: base letter plus a combining mark
+            arg_start = self._skip_spaces(end) if name.isalpha() else end
+            arg_end = self._skip_argument(arg_start)
+            base = source[arg_start:arg_end].strip("{} ")
+            if base:
+                yield unicodedata.normalize("NFC", base + ACCENTS[name]), pos, arg_end
+            return arg_end
+        if name in SYMBOLS:
+            yield SYMBOLS[name], pos, end
+            return end
+
+        bare = name.rstrip("*")
+        if bare in ("begin", "end"):
+            environment, after = self._read_name(end)
+            if environment is None:
+                return end
+            kind = environment.rstrip("*")
+            if bare == "begin":
+                if kind in MATH_ENVIRONMENTS or kind in VERBATIM_ENVIRONMENTS:
+                    return self._skip_environment_body(environment, after)
+                after = self._skip_optional(after)
+                for _ in range(ENVIRONMENT_ARGS.get(environment, 0)):
+                    after = self._skip_argument(after)
+            # Environment boundaries separate words (list items, table cells, paragraphs)
+            yield " ", pos, after
+            return after
+        if bare in ("verb", "lstinline"):
+            # \verb|code|: the delimiter is whatever character follows
+            if end < len(source):
+                close = source.find(source[end], end + 1)
+                return len(source) if close < 0 else close + 1
+            return end
+
+        end = self._skip_optional(end)
+        for _ in range(COMMAND_ARGS.get(bare, 0)):
+            end = self._skip_optional(self._skip_argument(end))
+        # Any other command vanishes; a following {...} group is scanned as text (\emph{word} -> word).
+        # The empty piece tells strip_builtin that something sat between the surrounding text.
+        yield "", pos, end
+        return end
+
+
+def strip_builtin(source: str) -> StrippedText:
+    # \begin{document} ... \end{document} when the input is a whole file, else everything
+    body_start, body_stop = 0, len(source)
+    begin = source.find("\\begin{document}")
+    if begin >= 0:
+        body_start = begin + len("\\begin{document}")
+        end = source.find("\\end{document}", body_start)
+        body_stop = len(source) if end < 0 else end
+
+    chars, starts, ends = [], [], []
+    pending = None  # whitespace waiting for the next visible piece: [paragraph break?, start, end]
+    dropped = False  # a command vanished after the pending whitespace ("see~\cite{x}.")
+
+    for text, start, end in _Scanner(source).pieces(body_start, body_stop):
+        if not text:
+            dropped = dropped or pending is not None
+            continue
+        if text.isspace():
+            paragraph = text.count("\n") >= 2 or (pending is not None and pending[0])
+            pending = [paragraph, pending[1] if pending else start, end]
+            continue
+        if dropped and pending is not None and not pending[0] and text[0] in CLOSING_PUNCTUATION:
+            # The space belonged in front of the dropped citation/label, not before the punctuation
+            pending = None
+        dropped = False
+        if pending is not None and chars:
+            separator = "\n\n" if pending[0] else " "
+            chars.append(separator)
+            starts.extend([pending[1]] * len(separator))
+            ends.extend([pending[2]] * len(separator))
+        pending = None
+        chars.append(text)
+        if end - start == len(text):
+            # Copied verbatim: character-exact positions
+            starts.extend(range(start, end))
+            ends.extend(range(start + 1, end + 1))
+        else:
+            starts.extend([start] * len(text))
+            ends.extend([end] * len(text))
+
+    return StrippedText(source, "".join(chars), starts, ends)
+
+
+class PandocServer:
+    # One `pandoc server` process reused for every conversion, restarted if it dies
+    def __init__(self, command: List[str] = PANDOC_SERVER_COMMAND, timeout: float = PANDOC_TIMEOUT_SECONDS):
+        self.command = command
+        self.timeout = timeout
+        self._process = None
+        self._url = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_started(self) -> str:
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return self._url
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                port = probe.getsockname()[1]
+            self._process = subprocess.Popen(self.command + ["--port", str(port)],
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self._url = f"http://127.0.0.1:{port}/"
+            deadline = time.monotonic() + PANDOC_START_SECONDS
+            while time.monotonic() < deadline:
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"{' '.join(self.command)} exited with {self._process.returncode}")
+                try:
+                    with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                        return self._url
+                except OSError:
+                    time.sleep(0.05)
+            # Still holding the lock: stop the process here rather than through close()
+            self._stop()
+            raise RuntimeError("pandoc server did not start")
+
+    def convert(self, source: str) -> str:
+        url = self._ensure_started()
+        body = json.dumps({"text": source, "from": "latex", "to": "plain"}).encode()
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json",
+                                                                  "Accept": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            result = json.loads(response.read().decode("utf-8"))
+        return result["output"] if isinstance(result, dict) else result
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _stop(self) -> None:
+        # Caller holds self._lock
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+        self._process = None
+
+
+_pandoc = None
+_pandoc_lock = threading.Lock()
+
+
+def _pandoc_server() -> PandocServer:
+    global _pandoc
+    with _pandoc_lock:
+        if _pandoc is None:
+            _pandoc = PandocServer()
+        return _pandoc
+
+
+def strip_latex(source: str, stripper: str = LATEX_STRIPPER) -> StrippedText:
+    if stripper == "pandoc":
+        try:
+            return StrippedText(source, _pandoc_server().convert(source).strip())
+        except (OSError, RuntimeError, ValueError, KeyError, urllib.error.URLError) as e:
+            print(f"Pandoc error, using the built-in LaTeX stripper: {e}")
+    return strip_builtin(source)
@@ -0,0 +1,203 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from polishcore.issues import Issue
+
+# === Declarative POS agreement rules ===
+# A rule is data: a token pattern in the spirit of spaCy's Matcher, plus an action that rewrites
+# one matched token. The pattern is a list of token specs; the first one is anchored on the token
+# being checked, every later one on the token next to the previous match ("REL": "next", the
+# default) or on its syntactic head ("REL": "head"). A spec constrains TEXT, LOWER, LEMMA, TAG, POS
+# or DEP with a value, {"IN": [...]} or {"NOT_IN": [...]}.
+#
+# Actions:
+#   {"INFLECT": "VBZ", "TARGET": 1}                   - lemminflect the matched token TARGET
+#   {"FORMS": {"he": "is", ...}, "KEY": 0, "TARGET": 1} - replace TARGET by the form that the LOWER
+#                                                        text of token KEY maps to
+# "context" limits a rule to one inferred temporal context ("past", "present", "future", "unknown").
+# "message" is formatted with the matched token texts ({0}, {1}, ...) and the replacement ({new});
+# "span" is "match" (first matched token, length of the texts joined by spaces) or "target".
+#
+# RuleSet compiles the rules into an index keyed by the most selective (attribute, value) pair of
+# their first spec, so a token only evaluates rules that can fire on it; per-token cost depends on
+# the few rules sharing its tag/dep/lemma, not on how many rules exist.
+
+ATTRIBUTES = {
+    "TEXT": lambda token: token.text,
+    "LOWER": lambda token: token.lower_,
+    "LEMMA": lambda token: token.lemma_,
+    "TAG": lambda token: token.tag_,
+    "POS": lambda token: token.pos_,
+    "DEP": lambda token: token.dep_,
+}
+# Preferred index attribute when several constrain the first token equally tightly
+INDEX_PREFERENCE = ("LOWER", "TEXT", "LEMMA", "TAG", "DEP", "POS")
+
+POS_RULES = [
+    {
+        "name": "singular-subject-verb",
+        "pattern": [{"DEP": "nsubj", "TAG": {"IN": ["NN", "NNP"]}}, {"TAG": {"IN": ["VBP", "VB"]}}],
+        "action": {"INFLECT": "VBZ", "TARGET": 1},
+        "message": "'{0} {1}' → '{0} {new}'",
+        "span": "match",
+    },
+    {
+        "name": "modal-past-tense",
+        "pattern": [{"TAG": "MD"}, {"TAG": "VBD"}],
+        "action": {"INFLECT": "VB", "TARGET": 1},
+        "message": "Modal '{0}' with past tense '{1}' → '{new}'",
+        "span": "target",
+    },
+    {
+        "name": "pronoun-be",
+        "pattern": [{"DEP": "nsubj", "TAG": "PRP"}, {"LEMMA": "be"}],
+        "action": {"FORMS": {"he": "is", "she": "is", "it": "is", "i": "am",
+                             "we": "are", "you": "are", "they": "are"}, "KEY": 0, "TARGET": 1},
+        "message": "'{0} {1}' → '{0} {new}'",
+        "span": "match",
+    },
+    {
+        "name": "tense-past-context",
+        "context": "past",
+        "pattern": [{"POS": "VERB", "TAG": {"IN": ["VB", "VBP", "VBZ"]}}],
+        "action": {"INFLECT": "VBD", "TARGET": 0},
+        "message": "Tense mismatch: '{0}' should be '{new}'",
+        "span": "target",
+    },
+    {
+        "name": "tense-present-context",
+        "context": "present",
+        "pattern": [{"POS": "VERB", "TAG": "VBD"}],
+        "action": {"INFLECT": "VBZ", "TARGET": 0},
+        "message": "Tense mismatch: '{0}' should be '{new}'",
+        "span": "target",
+    },
+]
+
+
+def _compile_spec(spec: Dict[str, object]) -> Tuple[Optional[str], List[Tuple[object, str, object]]]:
+    # Returns (relation to the previous token, [(getter, operator, value), ...])
+    checks = []
+    for attribute, value in spec.items():
+        if attribute == "REL":
+            continue
+        getter = ATTRIBUTES[attribute]
+        if isinstance(value, dict):
+            (operator, values), = value.items()
+            if operator not in ("IN", "NOT_IN"):
+                raise ValueError(f"Unknown operator {operator} in {spec}")
+            checks.append((getter, operator, frozenset(values)))
+        else:
+            checks.append((getter, "==", value))
+    return spec.get("REL", "next"), checks
+
+
+def _index_keys(spec: Dict[str, object]) -> Optional[Tuple[str, Iterable[str]]]:
+    # The tightest equality/IN constraint of the first spec, or None (rule goes to the wildcard list)
+    candidates = []
+    for attribute, value in spec.items():
+        if attribute == "REL" or (isinstance(value, dict) and "IN" not in value):
+            continue
+        values = value["IN"] if isinstance(value, dict) else [value]
+        candidates.append((len(values), INDEX_PREFERENCE.index(attribute), attribute, values))
+    if not candidates:
+        return None
+    _, _, attribute, values = min(candidates)
+    return attribute, values
+
+
+class Rule:
+    def __init__(self, order: int, definition: Dict[str, object]):
+        self.order = order
+        self.name = definition["name"]
+        self.context = definition.get("context")
+        self.specs = [_compile_spec(spec) for spec in definition["pattern"]]
+        self.action = definition["action"]
+        self.message = definition["message"]
+        self.span = definition.get("span", "match")
+        self.index = _index_keys(definition["pattern"][0])
+
+    def match(self, doc, token) -> Optional[list]:
+        tokens = []
+        current = None
+        for relation, checks in self.specs:
+            if current is None:
+                current = token
+            elif relation == "head":
+                current = current.head
+            else:
+                current = doc[current.i + 1] if current.i + 1 < len(doc) else None
+                if current is None:
+                    return None
+            for getter, operator, value in checks:
+                actual = getter(current)
+                if operator == "==":
+                    if actual != value:
+                        return None
+                elif (actual in value) != (operator == "IN"):
+                    return None
+            tokens.append(current)
+        return tokens
+
+    def replacement(self, tokens: list) -> Optional[str]:
+        target = tokens[self.action["TARGET"]]
+        if "INFLECT" in self.action:
+            inflected = target._.inflect(self.action["INFLECT"])
+            return inflected if inflected and inflected != target.text else None
+        form = self.action["FORMS"].get(tokens[self.action["KEY"]].text.lower())
+        return form if form and form != target.text.lower() else None
+
+    def issue(self, tokens: list, new: str) -> Issue:
+        texts = [token.text for token in tokens]
+        target = tokens[self.action["TARGET"]]
+        if self.span == "match":
+            offset, length = tokens[0].idx, len(" ".join(texts))
+        else:
+            offset, length = target.idx, len(target.text)
+        return Issue(self.message.format(*texts, new=new), offset, length, (new,), is_pos_issue=True)
+
+
+class RuleSet:
+    def __init__(self, definitions: Sequence[Dict[str, object]] = POS_RULES, indexed: bool = True):
+        # indexed=False evaluates every rule on every token (the baseline the benchmark compares to)
+        self.rules = [Rule(order, definition) for order, definition in enumerate(definitions)]
+        self.indexed = indexed
+        self._indexes = {}
+
+    def _index(self, context: str) -> Tuple[Dict[Tuple[str, str], List[Rule]], List[Rule], list]:
+        # One index per temporal context, built on first use; rules for other contexts never show up
+        if context not in self._indexes:
+            by_key, wildcard = {}, []
+            for rule in self.rules:
+                if rule.context not in (None, context):
+                    continue
+                if rule.index is None or not self.indexed:
+                    wildcard.append(rule)
+                    continue
+                attribute, values = rule.index
+                for value in values:
+                    by_key.setdefault((attribute, value), []).append(rule)
+            attributes = sorted({attribute for attribute, _ in by_key})
+            self._indexes[context] = (by_key, wildcard, [(a, ATTRIBUTES[a]) for a in attributes])
+        return self._indexes[context]
+
+    def candidates(self, token, context: str) -> List[Rule]:
+        by_key, wildcard, attributes = self._index(context)
+        found = list(wildcard)
+        for attribute, getter in attributes:
+            found.extend(by_key.get((attribute, getter(token)), ()))
+        # Declaration order decides which rule wins when two rewrite the same token
+        return sorted(found, key=lambda rule: rule.order) if len(found) > 1 else found
+
+    def apply(self, doc, context: str) -> Tuple[List[Issue], List[str]]:
+        # Returns (issues, corrected token texts)
+        corrected_tokens = [token.text for token in doc]
+        issues = []
+        for token in doc:
+            for rule in self.candidates(token, context):
+                tokens = rule.match(doc, token)
+                if tokens is None:
+                    continue
+                new = rule.replacement(tokens)
+                if new is not None:
+                    corrected_tokens[tokens[rule.action["TARGET"]].i] = new
+                    issues.append(rule.issue(tokens, new))
+        return issues, corrected_tokens
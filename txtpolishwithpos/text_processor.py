@@ -1,19 +1,54 @@
 import re
-import spacy
-import lemminflect  # registers ._.inflect
-import language_tool_python
 from language_tool_python.utils import correct
-from typing import Tuple, List, Dict
-
-# Initialize tools
-nlp = spacy.load("en_core_web_trf")  # You can change model here if needed
-_tool = language_tool_python.LanguageTool('en-US')
+from typing import Callable, Tuple, List, Dict
+from polishcore.components import ComponentRegistry, WARMUP_SENTENCE
+from polishcore.issues import Issue, dumps, load_result
+from polishcore.result_cache import ResultCache
+from polishcore.lt_pool import LanguageToolPool
+from polishcore.metrics import StageTrace
+from pos_rules import POS_RULES, RuleSet
+from polishcore.stage_graph import Stage, StageGraph
+
+# Tools are loaded lazily and warmed in the background (see registry.start_warmup)
+SPACY_MODEL = "en_core_web_trf"  # You can change model here if needed
+LT_LANGUAGE = 'en-US'
+
+def _load_nlp():
+    import spacy
+    import lemminflect  # registers ._.inflect
+    return spacy.load(SPACY_MODEL)
+
+def _load_tool():
+    # LT_POOL_SIZE servers x LT_CHECK_THREADS concurrent checks each (see polishcore/lt_pool.py)
+    return LanguageToolPool(LT_LANGUAGE)
+
+registry = ComponentRegistry()
+registry.register("nlp", _load_nlp, lambda nlp: nlp(WARMUP_SENTENCE))
+registry.register("languagetool", _load_tool, lambda tool: tool.check(WARMUP_SENTENCE))
+
+# Sentence result cache (bump PIPELINE_VERSION whenever polishing output changes)
+PIPELINE_VERSION = "lt+pos-agreement/4"
+_cache = ResultCache(SPACY_MODEL, LT_LANGUAGE, PIPELINE_VERSION, dumps=dumps, loads=load_result)
 
 # Temporal context hints
 PAST_HINTS = {"yesterday", "last", "ago", "earlier", "previously", "once"}
 PRESENT_HINTS = {"today", "now", "currently", "at present"}
 FUTURE_HINTS = {"tomorrow", "next", "later", "soon"}
 
+def _hint_alternation(hints) -> str:
+    # Longest first, so multi-word hints win over their prefixes; any whitespace between words
+    return "|".join(r"\s+".join(map(re.escape, hint.split())) for hint in sorted(hints, key=len, reverse=True))
+
+# One pass over the text, whole words only ("last" no longer matches "blast", nor "now" "know")
+TEMPORAL_HINTS_RE = re.compile(
+    rf"\b(?:(?P<past>{_hint_alternation(PAST_HINTS)})|(?P<future>{_hint_alternation(FUTURE_HINTS)})"
+    rf"|(?P<present>{_hint_alternation(PRESENT_HINTS)}))\b",
+    re.IGNORECASE
+)
+
+# POS agreement rules are data (see pos_rules.py), compiled once into a per-token index
+pos_rules = RuleSet(POS_RULES)
+
 def clean_spacing(text: str) -> str:
     """
     Cleans up unnecessary spaces around punctuation.
@@ -25,118 +60,110 @@ def detect_temporal_context(text: str) -> str:
     """
     Infers temporal context (past, present, future) from keywords.
     """
-    lowered = text.lower()
-    if any(word in lowered for word in PAST_HINTS):
-        return "past"
-    elif any(word in lowered for word in FUTURE_HINTS):
-        return "future"
-    elif any(word in lowered for word in PRESENT_HINTS):
-        return "present"
+    found = {match.lastgroup for match in TEMPORAL_HINTS_RE.finditer(text)}
+    for context in ("past", "future", "present"):
+        if context in found:
+            return context
     return "unknown"
 
-def analyze_pos_agreement(text: str) -> Tuple[List[Dict[str, str]], str]:
-    """
-    Applies rule-based POS agreement and tense corrections.
-    """
-    doc = nlp(text)
-    corrected_tokens = [token.text for token in doc]
-    issues = []
-    context = detect_temporal_context(text)
-
-    for i, token in enumerate(doc):
-        next_token = doc[i + 1] if i + 1 < len(doc) else None
-
-        # Rule 1: Singular subject with base/plural verb → needs 3rd person singular
-        if token.dep_ == "nsubj" and token.tag_ in {"NN", "NNP"}:
-            if next_token and next_token.tag_ in {"VBP", "VB"}:
-                inflected = next_token._.inflect("VBZ")
-                if inflected and inflected != next_token.text:
-                    corrected_tokens[next_token.i] = inflected
-                    issues.append({
-                        'message': f"'{token.text} {next_token.text}' → '{token.text} {inflected}'",
-                        'offset': str(token.idx),
-                        'length': str(len(f"{token.text} {next_token.text}")),
-                        'replacements': inflected,
-                        'is_pos_issue': 'True'
-                    })
-
-        # Rule 2: Modal + past tense → use base verb
-        if token.tag_ == "MD" and next_token and next_token.tag_ == "VBD":
-            inflected = next_token._.inflect("VB")
-            if inflected and inflected != next_token.text:
-                corrected_tokens[next_token.i] = inflected
-                issues.append({
-                    'message': f"Modal '{token.text}' with past tense '{next_token.text}' → '{inflected}'",
-                    'offset': str(next_token.idx),
-                    'length': str(len(next_token.text)),
-                    'replacements': inflected,
-                    'is_pos_issue': 'True'
-                })
-
-        # Rule 3: Pronoun + incorrect "be" verb
-        if token.dep_ == "nsubj" and token.tag_ == "PRP":
-            if next_token and next_token.lemma_ == "be":
-                subj, verb = token.text.lower(), next_token.text.lower()
-                correct_form = (
-                    "is" if subj in {"he", "she", "it"} else
-                    "am" if subj == "i" else
-                    "are" if subj in {"we", "you", "they"} else
-                    None
-                )
-                if correct_form and correct_form != verb:
-                    corrected_tokens[next_token.i] = correct_form
-                    issues.append({
-                        'message': f"'{token.text} {next_token.text}' → '{token.text} {correct_form}'",
-                        'offset': str(token.idx),
-                        'length': str(len(f"{token.text} {next_token.text}")),
-                        'replacements': correct_form,
-                        'is_pos_issue': 'True'
-                    })
-
-        # Rule 4: Verb tense mismatch based on inferred context
-        if token.pos_ == "VERB" and token.tag_ not in {"MD"}:
-            desired_tag = None
-            if context == "past" and token.tag_ in {"VB", "VBP", "VBZ"}:
-                desired_tag = "VBD"
-            elif context == "present" and token.tag_ == "VBD":
-                desired_tag = "VBZ"
-
-            if desired_tag:
-                inflected = token._.inflect(desired_tag)
-                if inflected and inflected != token.text:
-                    corrected_tokens[token.i] = inflected
-                    issues.append({
-                        'message': f"Tense mismatch: '{token.text}' should be '{inflected}'",
-                        'offset': str(token.idx),
-                        'length': str(len(token.text)),
-                        'replacements': inflected,
-                        'is_pos_issue': 'True'
-                    })
+def _corrected_to_input(matches) -> Callable[[int, bool], int]:
+    """
+    Maps offsets in the LanguageTool-corrected text back to the checked text, following the edits
+    correct() makes (first replacement of every match with one, left to right).
+    """
+    edits = []  # (start, end) in the corrected text, (start, end) in the checked text
+    shift = 0
+    for m in matches:
+        if not m.replacements:
+            continue
+        start, end = m.offset, m.offset + m.errorLength
+        edits.append((start + shift, start + shift + len(m.replacements[0]), start, end))
+        shift += len(m.replacements[0]) - m.errorLength
+
+    def to_input(position: int, is_end: bool = False) -> int:
+        delta = 0
+        for corrected_start, corrected_end, start, end in edits:
+            if position < corrected_start or (is_end and position == corrected_start):
+                break
+            if position < corrected_end or (is_end and position == corrected_end):
+                return end if is_end else start  # inside a replacement: the whole replaced span
+            delta = end - corrected_end
+        return position + delta
+
+    return to_input
+
+def cache_stats() -> Dict[str, int]:
+    """
+    Hit/miss/eviction counters of the polish_text result cache.
+    """
+    return _cache.stats()
 
+def analyze_pos_agreement(text: str) -> Tuple[List[Issue], str]:
+    """
+    Applies rule-based POS agreement and tense corrections (the rules in pos_rules.POS_RULES).
+    """
+    doc = registry.get("nlp")(text)
+    issues, corrected_tokens = pos_rules.apply(doc, detect_temporal_context(text))
     corrected_text = " ".join(corrected_tokens)
     return issues, corrected_text
 
-def polish_text(text: str) -> Tuple[str, str, List[Dict[str, str]]]:
+def _languagetool_stage(text: str, trace: StageTrace) -> Tuple[list, str, List[Issue]]:
     """
-    Applies grammar corrections (LanguageTool) and POS/tenses fixes (SpaCy + lemminflect).
-    Returns original text, final polished version, and all correction metadata.
+    Step 1: Grammar fixes via LanguageTool.
     """
-    # Step 1: Grammar fixes via LanguageTool
-    matches = _tool.check(text)
+    with trace.stage("languagetool"):
+        matches = registry.get("languagetool").check(text)
     lt_corrected = correct(text, matches) if matches else text
 
-    lt_issues = [{
-        'message': m.message,
-        'offset': str(m.offset),
-        'length': str(m.errorLength),
-        'replacements': ', '.join(m.replacements),
-        'is_pos_issue': 'False'
-    } for m in matches]
-
-    # Step 2: POS & tense fixes
-    pos_issues, pos_corrected = analyze_pos_agreement(lt_corrected)
-
-    # Step 3: Cleanup
-    polished_text = clean_spacing(pos_corrected)
+    lt_issues = [Issue.from_match(m) for m in matches]
+    return matches, lt_corrected, lt_issues
 
-    return text, polished_text, lt_issues + pos_issues
+def _pos_agreement_stage(lt_corrected: str, matches: list, trace: StageTrace) -> Tuple[List[Issue], str]:
+    """
+    Step 2: POS & tense fixes on the LanguageTool-corrected text.
+    """
+    with trace.stage("pos_agreement"):
+        pos_issues, pos_corrected = analyze_pos_agreement(lt_corrected)
+
+    # POS offsets refer to the LanguageTool-corrected text; report them against the input like LT's
+    if matches:
+        to_input = _corrected_to_input(matches)
+        for issue in pos_issues:
+            start = to_input(issue.offset)
+            issue.length = to_input(issue.offset + issue.length, is_end=True) - start
+            issue.offset = start
+    return pos_issues, pos_corrected
+
+def _cleanup_stage(text: str, pos_corrected: str, lt_issues: List[Issue],
+                   pos_issues: List[Issue]) -> Dict[str, object]:
+    """
+    Step 3: Cleanup, then the result goes into the cache.
+    """
+    result = {'polished': clean_spacing(pos_corrected), 'issues': lt_issues + pos_issues}
+    _cache.put(text, result)
+    return result
+
+# The pipeline as a stage graph (see polishcore/stage_graph.py); here every stage needs the previous one
+POLISH_STAGES = StageGraph([
+    Stage("languagetool", _languagetool_stage, ("text", "trace"), ("matches", "lt_corrected", "lt_issues")),
+    Stage("pos_agreement", _pos_agreement_stage, ("lt_corrected", "matches", "trace"), ("pos_issues", "pos_corrected")),
+    Stage("cleanup", _cleanup_stage, ("text", "pos_corrected", "lt_issues", "pos_issues"), ("result",)),
+])
+
+def polish_text(text: str) -> Tuple[str, str, List[Issue]]:
+    """
+    Applies grammar corrections (LanguageTool) and POS/tenses fixes (SpaCy + lemminflect).
+    Returns original text, final polished version, and all correction metadata.
+    All issue offsets refer to the input text.
+    Results are served from the two-tier cache when the same text was polished before.
+    Stage durations are recorded for the /metrics endpoint.
+    """
+    trace = StageTrace()
+    trace.count("sentences")
+    with trace.stage("cache_lookup"):
+        cached = _cache.get(text)
+    if cached is not None:
+        return text, cached['polished'], cached['issues']
+
+    result = POLISH_STAGES.run({"text": text, "trace": trace}, ["result"])["result"]
+    return text, result['polished'], result['issues']